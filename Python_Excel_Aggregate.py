@@ -0,0 +1,172 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, aggregates fall back to plain Python
+    np = None
+
+# Aggregate functions and the Excel function writing the same aggregate as a formula
+FUNCTIONS = {"sum": "SUM", "mean": "AVERAGE", "min": "MIN", "max": "MAX", "count": "COUNT"}
+
+
+class ColumnValues:
+    """
+    Numbers of one column for aggregation: cell values converted by to_number (None where
+    the cell holds no number), with what the conversion found
+    """
+    __slots__ = ("numbers", "all_int", "text_numbers")
+
+    def __init__(self, values, coerce=True):
+        self.numbers = []
+        append = self.numbers.append
+        all_int = True
+        text_numbers = 0
+        for value in values:
+            cls = value.__class__
+            if cls is int:
+                append(value)
+            elif cls is float:
+                if value - value == 0:
+                    all_int = False
+                    append(value)
+                else:
+                    # NaN and infinities
+                    append(None)
+            elif cls is str and coerce:
+                # Inlined to_number: float() accepts surrounding spaces, like int()
+                try:
+                    number = float(value)
+                except ValueError:
+                    append(None)
+                    continue
+                if number - number == 0:
+                    text_numbers += 1
+                    if all_int and not number.is_integer():
+                        all_int = False
+                    append(number)
+                else:
+                    append(None)
+            elif value is None or cls is str:
+                append(None)
+            else:
+                number = to_number(value, coerce)
+                if number is not None and not isinstance(number, int):
+                    all_int = False
+                append(number)
+        # Every number is whole: sums, minima and maxima are returned as ints
+        self.all_int = all_int
+        # Numbers stored as text ("2.5"), which Excel's SUM ignores
+        self.text_numbers = text_numbers
+
+
+def to_number(value, coerce=True):
+    """
+    Number held by a cell: ints and floats as they are, numeric text ("2.5", " 12 ") when
+    coerce is set, None for anything else (empty cells, booleans, dates, other text, NaN)
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value if math.isfinite(value) else None
+    if coerce and isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+        return number if math.isfinite(number) else None
+    if np is not None and isinstance(value, np.number) and not isinstance(value, np.bool_):
+        return to_number(value.item(), coerce)
+    return None
+
+
+def _typed(value, all_int):
+    """Python value of an aggregate: int for whole results of int columns, None for NaN"""
+    if value is None:
+        return None
+    value = float(value)
+    if value != value:
+        return None
+    if all_int and value.is_integer():
+        return int(value)
+    return value
+
+
+def aggregate(column, functions):
+    """{function: value} of the numbers of a ColumnValues (None for mean/min/max of no numbers)"""
+    numbers = column.numbers
+    if np is not None:
+        array = np.fromiter((math.nan if number is None else number for number in numbers),
+                            dtype=np.float64, count=len(numbers))
+        array = array[~np.isnan(array)]
+        count = len(array)
+        computed = {"sum": lambda: array.sum(), "mean": lambda: array.mean() if count else None,
+                    "min": lambda: array.min() if count else None, "max": lambda: array.max() if count else None}
+    else:
+        present = [number for number in numbers if number is not None]
+        count = len(present)
+        computed = {"sum": lambda: math.fsum(present), "mean": lambda: math.fsum(present) / count if count else None,
+                    "min": lambda: min(present, default=None), "max": lambda: max(present, default=None)}
+    results = {}
+    for function in functions:
+        if function == "count":
+            results[function] = count
+        else:
+            results[function] = _typed(computed[function](), column.all_int and function != "mean")
+    return results
+
+
+def group_aggregate(keys, columns, functions):
+    """
+    {group key: {column name: {function: value}}} of the ColumnValues columns ({name: column})
+    grouped by keys (one key per row, groups in order of first appearance)
+    """
+    groups = {}
+    codes = [groups.setdefault(key, len(groups)) for key in keys]
+    size = len(groups)
+    results = {key: {} for key in groups}
+    for name, column in columns.items():
+        if np is not None:
+            values = np.fromiter((math.nan if number is None else number for number in column.numbers),
+                                 dtype=np.float64, count=len(column.numbers))
+            present = ~np.isnan(values)
+            group_codes = np.asarray(codes, dtype=np.int64)[present]
+            values = values[present]
+            counts = np.bincount(group_codes, minlength=size)
+            sums = np.bincount(group_codes, weights=values, minlength=size)
+            minima = maxima = None
+            if "min" in functions:
+                minima = np.full(size, np.inf)
+                np.minimum.at(minima, group_codes, values)
+            if "max" in functions:
+                maxima = np.full(size, -np.inf)
+                np.maximum.at(maxima, group_codes, values)
+        else:
+            counts, sums = [0] * size, [[] for _ in range(size)]
+            for code, number in zip(codes, column.numbers):
+                if number is not None:
+                    counts[code] += 1
+                    sums[code].append(number)
+            minima = [min(numbers, default=None) for numbers in sums]
+            maxima = [max(numbers, default=None) for numbers in sums]
+            sums = [math.fsum(numbers) for numbers in sums]
+        for key, code in groups.items():
+            count = int(counts[code])
+            values = {}
+            for function in functions:
+                if function == "count":
+                    values[function] = count
+                elif function == "sum":
+                    values[function] = _typed(sums[code], column.all_int)
+                elif not count:
+                    values[function] = None
+                elif function == "mean":
+                    values[function] = _typed(sums[code] / count, False)
+                else:
+                    values[function] = _typed((minima if function == "min" else maxima)[code], column.all_int)
+            results[key][name] = values
+    return results
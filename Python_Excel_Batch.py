@@ -0,0 +1,180 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Style import Excel_Style
+from Python_Excel_Template import ExcelTemplate
+
+# One Excel_Style per process, so interned style objects are shared by all jobs of a worker
+_style_manager = None
+
+# Excel_Style factory used for each style key of a format spec
+_STYLE_FACTORIES = {
+    "font": "create_font",
+    "pattern_fill": "create_pattern_fill",
+    "border": "create_border",
+    "alignment": "create_alignment",
+}
+
+
+def _get_style_manager():
+    global _style_manager
+    if _style_manager is None:
+        _style_manager = Excel_Style()
+    return _style_manager
+
+
+def _build_style(style_spec):
+    """
+    Turn a picklable style spec ({"font": {"bold": True}, "number_format": "0.0", ...})
+    into format_cells keywords holding openpyxl style objects
+    """
+    style_manager = _get_style_manager()
+    style = {}
+    for key, value in style_spec.items():
+        if key in _STYLE_FACTORIES:
+            value = getattr(style_manager, _STYLE_FACTORIES[key])(**value)
+        style[key] = value
+    return style
+
+
+def _sheet_rows(sheet_spec):
+    """Return the rows of a sheet spec: inline "rows" or a picklable "source" callable"""
+    if "rows" in sheet_spec:
+        return sheet_spec["rows"]
+    source = sheet_spec.get("source")
+    if source is None:
+        return []
+    if isinstance(source, tuple):
+        func, *args = source
+        return func(*args)
+    return source()
+
+
+def _counting(rows, counter):
+    """Yield rows unchanged while counting them in counter[0]"""
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def build_report(job):
+    """
+    Build and save one workbook from a job spec in the current process.
+
+    job = {
+        "path": "report.xlsx",
+        "mode": "normal",                         # or "stream"
+        "compact": False,                         # normal mode: values in arrays, not cells
+        "sheets": [{
+            "name": "ASPHALT",
+            "rows": [[...], ...],                 # or "source": (top_level_function, arg1, ...)
+            "start_row": 1, "start_column": 1,
+            "column_widths": {"A": 15},
+            "row_heights": {1: 30},
+            "freeze_panes": "G2",
+            "auto_filter": "A1:W1",
+            "merge_cells": ["I72:J72"],
+            "formats": [("A1:W2", {"font": {"bold": True}, "pattern_fill": {"start_color": "92D050"}})],
+        }],
+    }
+    With "template": "layout.template.xlsx" (written by ExcelTemplate.save) the workbook is
+    stamped from the template instead: each sheet only gives its "rows" (or "source"), filled
+    from the top-left cell of the sheet's first data range, or "blocks": {top_left: rows}.
+    Returns the number of rows written.
+    """
+    if job.get("template"):
+        return _stamp_report(job)
+    sheets = job["sheets"]
+    mode = job.get("mode", "normal")
+    # Failures raise typed exceptions carrying their cause instead of a bare False
+    excel = Excel_WorkBook(job["path"], sheets[0]["name"], mode=mode, strict=True, compact=job.get("compact", False))
+    rows_written = [0]
+    try:
+        for sheet_spec in sheets:
+            name = sheet_spec["name"]
+            if name not in excel.get_sheet_names():
+                excel.create_sheet(name)
+            for column, width in sheet_spec.get("column_widths", {}).items():
+                excel.set_column_width(name, column, width)
+            for row, height in sheet_spec.get("row_heights", {}).items():
+                excel.set_row_height(name, row, height)
+            if sheet_spec.get("freeze_panes"):
+                excel.freeze_panes(name, sheet_spec["freeze_panes"])
+            if sheet_spec.get("auto_filter"):
+                excel.add_sort_filter(name, sheet_spec["auto_filter"])
+
+            formats = [(cell_range, _build_style(style_spec)) for cell_range, style_spec in sheet_spec.get("formats", [])]
+            # Stream mode needs the styles before the rows are streamed, normal mode styles written cells
+            if mode == "stream" and formats and not excel.format_ranges(name, formats):
+                raise RuntimeError(f"Formatting sheet '{name}' failed.")
+
+            rows = _counting(_sheet_rows(sheet_spec), rows_written)
+            if not excel.write_rows(name, sheet_spec.get("start_row", 1), rows, sheet_spec.get("start_column", 1)):
+                raise RuntimeError(f"Writing sheet '{name}' failed.")
+
+            if mode != "stream" and formats and not excel.format_ranges(name, formats):
+                raise RuntimeError(f"Formatting sheet '{name}' failed.")
+            for cell_range in sheet_spec.get("merge_cells", []):
+                excel.merge_cells(name, cell_range)
+        if not excel.save():
+            raise RuntimeError(f"Saving '{job['path']}' failed.")
+    finally:
+        excel.close()
+    return rows_written[0]
+
+
+def _stamp_report(job):
+    """Stamp one workbook from a template; the compiled template is reused by the worker's next jobs"""
+    template = ExcelTemplate.load(job["template"], strict=True)
+    rows_written = [0]
+    data = {}
+    for sheet_spec in job["sheets"]:
+        if "blocks" in sheet_spec:
+            data[sheet_spec["name"]] = {top_left: list(_counting(rows, rows_written))
+                                        for top_left, rows in sheet_spec["blocks"].items()}
+        else:
+            data[sheet_spec["name"]] = _counting(_sheet_rows(sheet_spec), rows_written)
+    template.stamp(job["path"], data)
+    return rows_written[0]
+
+
+def _run_job(job):
+    """Worker entry point: build one report and never raise, so every job reports back"""
+    start = time.perf_counter()
+    result = {"path": job.get("path"), "ok": True, "error": None, "error_type": None, "rows": 0, "pid": os.getpid()}
+    try:
+        result["rows"] = build_report(job)
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = traceback.format_exc()
+        result["error_type"] = type(e).__name__
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def generate_reports(jobs, workers=None):
+    """
+    Build and save many workbooks in parallel with a process pool.
+    jobs is a list of picklable job specs (see build_report), workers defaults to os.cpu_count().
+    Returns one result per job, in job order: {"path", "ok", "error", "error_type", "rows", "seconds", "pid"};
+    error_type (e.g. "SheetNotFoundError") allows counting failures by cause.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [_run_job(job) for job in jobs]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        futures = [executor.submit(_run_job, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The job never ran: unpicklable spec or a crashed worker process
+                results.append({"path": job.get("path"), "ok": False, "error": f"{type(e).__name__}: {e}",
+                                "error_type": type(e).__name__, "rows": 0, "seconds": 0.0, "pid": None})
+    return results
@@ -0,0 +1,590 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import platform
+import tempfile
+import traceback
+import importlib.util
+import multiprocessing
+from queue import Empty
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple
+
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Reference import range_size
+from Python_Excel_Style import Excel_Style
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the current process in MB (None if unknown)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measured_child(queue, func, args):
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        queue.put(("ok", {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb(), "result": result}))
+    except BaseException:
+        queue.put(("error", traceback.format_exc()))
+
+
+def measure(func, *args):
+    """
+    Run func(*args) in a fresh process so peak RSS is not polluted by earlier runs.
+    Raises RuntimeError, with the child's traceback, when func fails or the process dies
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measured_child, args=(queue, func, args))
+    process.start()
+    try:
+        while True:
+            try:
+                status, payload = queue.get(timeout=1)
+                break
+            except Empty:
+                if not process.is_alive():
+                    # The child may have put its result just before exiting
+                    try:
+                        status, payload = queue.get(timeout=1)
+                        break
+                    except Empty:
+                        raise RuntimeError(f"{func.__name__} exited with code {process.exitcode} "
+                                           "without a result.") from None
+    finally:
+        process.join()
+    if status == "error":
+        raise RuntimeError(f"{func.__name__} failed in the measured process:\n{payload}")
+    return payload
+
+
+def build_report(path, rows, cols, mode="normal", compact=False):
+    """
+    Build a main.py-like report: styled header, column widths, freeze panes and data rows
+    """
+    excel = Excel_WorkBook(path, "REPORT", mode=mode, compact=compact)
+    style_manager = Excel_Style()
+    header_font = style_manager.create_font(bold=True, color="FFFFFF")
+    header_fill = style_manager.create_pattern_fill(fill_type="solid", start_color="92D050")
+    header_alignment = style_manager.create_alignment(horizontal="center", vertical="center")
+
+    # Layout first: in stream mode it must be known before the first row is streamed
+    for col in range(1, cols + 1):
+        excel.set_column_width("REPORT", col, 15)
+    excel.freeze_panes("REPORT", "A2")
+    excel.format_cells("REPORT", f"A1:{get_column_letter(cols)}1", font=header_font,
+                       pattern_fill=header_fill, alignment=header_alignment)
+
+    excel.write_row("REPORT", 1, [f"COLUMN {col}" for col in range(1, cols + 1)])
+    for row in range(2, rows + 2):
+        excel.write_row("REPORT", row, [row * col * 0.5 if col % 2 else f"R{row}C{col}" for col in range(1, cols + 1)])
+    excel.save()
+    excel.close()
+    return os.path.getsize(path)
+
+
+def benchmark_stream_write(rows=200000, cols=20):
+    """
+    Compare peak RSS and wall time of the normal and the stream write path
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for mode in ("normal", "stream"):
+            path = os.path.join(folder, f"{mode}.xlsx")
+            measurement = measure(build_report, path, rows, cols, mode)
+            results[mode] = {
+                "seconds": round(measurement["seconds"], 3),
+                "peak_rss_mb": round(measurement["peak_rss_mb"], 1) if measurement["peak_rss_mb"] else None,
+                "file_size_mb": round(measurement["result"] / (1024 * 1024), 2),
+            }
+    return results
+
+
+def _sheet_memory(rows, cols, compact):
+    """Bytes allocated by the values of a rows x cols sheet held in memory (tracemalloc)"""
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory() as folder:
+        tracemalloc.start()
+        excel = Excel_WorkBook(os.path.join(folder, "memory.xlsx"), "DATA", compact=compact)
+        excel.write_rows("DATA", 1, synthetic_rows(rows, cols))
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        excel.close()
+    return allocated
+
+
+def benchmark_compact_memory(rows=200000, cols=20):
+    """
+    Compare the normal (openpyxl cells) and compact (typed column arrays) sheet storage:
+    bytes per cell held in memory, and peak RSS / wall time of a full build_report + save
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, compact in (("cells", False), ("compact", True)):
+            path = os.path.join(folder, f"{name}.xlsx")
+            measurement = measure(build_report, path, rows, cols, "normal", compact)
+            allocated = measure(_sheet_memory, rows, cols, compact)["result"]
+            results[name] = {
+                "bytes_per_cell": round(allocated / (rows * cols), 1),
+                "seconds": round(measurement["seconds"], 3),
+                "peak_rss_mb": round(measurement["peak_rss_mb"], 1) if measurement["peak_rss_mb"] else None,
+                "file_size_mb": round(measurement["result"] / (1024 * 1024), 2),
+            }
+    return results
+
+
+def benchmark_bulk_write(rows=10000, cols=50):
+    """
+    Compare cells/sec of a write_row loop with a single write_rows call
+    """
+    block = [[row * cols + col for col in range(cols)] for row in range(rows)]
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        excel = Excel_WorkBook(os.path.join(folder, "loop.xlsx"), "DATA")
+        start = time.perf_counter()
+        for row, values in enumerate(block, start=1):
+            excel.write_row("DATA", row, values)
+        results["write_row loop"] = rows * cols / (time.perf_counter() - start)
+
+        excel = Excel_WorkBook(os.path.join(folder, "bulk.xlsx"), "DATA")
+        start = time.perf_counter()
+        excel.write_rows("DATA", 1, block)
+        results["write_rows"] = rows * cols / (time.perf_counter() - start)
+    return results
+
+
+def _format_cells_per_attribute(sheet, cell_range, pattern_fill=None, font=None, border=None, alignment=None, number_format=None):
+    """Reference implementation: assign every style attribute cell by cell"""
+    for row in sheet[cell_range]:
+        for cell in row:
+            if pattern_fill:
+                cell.fill = pattern_fill
+            if font:
+                cell.font = font
+            if border:
+                cell.border = border
+            if alignment:
+                cell.alignment = alignment
+            if number_format:
+                cell.number_format = number_format
+
+
+def benchmark_format(rows=100000, cols=23):
+    """
+    Style a main.py-like sheet (header + overlapping data/number-format ranges) three ways:
+    per-attribute cell loop, one format_cells call per range, one format_ranges batch
+    """
+    style_manager = Excel_Style()
+    border = style_manager.create_border(left_style="thin", right_style="thin", top_style="thin", bottom_style="thin")
+    alignment = style_manager.create_alignment(horizontal="center", vertical="center")
+    last_col = get_column_letter(cols)
+    last_row = rows + 2
+    operations = [
+        (f"A1:{last_col}2", {"font": style_manager.create_font(bold=True, color="FFFFFF"),
+                             "pattern_fill": style_manager.create_pattern_fill(start_color="92D050"),
+                             "border": border, "alignment": alignment}),
+        (f"A3:{last_col}{last_row}", {"border": border, "alignment": alignment}),
+    ] + [(f"{col}3:{col}{last_row}", {"number_format": "0.0"}) for col in "IJKMOQ"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ("per-attribute loop", "format_cells", "format_ranges"):
+            excel = Excel_WorkBook(os.path.join(folder, "format.xlsx"), "DATA")
+            excel.write_rows("DATA", 3, ([row] * cols for row in range(rows)))
+            start = time.perf_counter()
+            if name == "per-attribute loop":
+                for cell_range, style in operations:
+                    _format_cells_per_attribute(excel.get_sheet("DATA"), cell_range, **style)
+            elif name == "format_cells":
+                for cell_range, style in operations:
+                    excel.format_cells("DATA", cell_range, **style)
+            else:
+                excel.format_ranges("DATA", operations)
+            results[name] = time.perf_counter() - start
+            excel.close()
+            del excel
+    return results
+
+
+def _write_cell_legacy(sheet, cell_ref, content):
+    """Reference implementation: validate with a raw regex, then let openpyxl parse the reference again"""
+    if re.match(r'^[A-Z]+[1-9][0-9]*$', cell_ref.upper()):
+        sheet[cell_ref].value = content
+
+
+def benchmark_cell_refs(rows=1000, cols=23):
+    """
+    Refs/sec of parsing A1 references (regex + openpyxl vs the cached parser) and of a hot
+    write_cell loop revisiting the same cells (legacy path, A1 references, (row, col) tuples).
+    The default 23,000 references fit the parser cache.
+    """
+    from Python_Excel_Reference import parse_cell
+
+    refs = [f"{get_column_letter(col)}{row}" for row in range(1, rows + 1) for col in range(1, cols + 1)]
+    results = {}
+    start = time.perf_counter()
+    for ref in refs:
+        if re.match(r'^[A-Z]+[1-9][0-9]*$', ref.upper()):
+            coordinate_to_tuple(ref)
+    results["parse: regex + coordinate_to_tuple"] = len(refs) / (time.perf_counter() - start)
+    parse_cell.cache_clear()
+    for label in ("parse: parse_cell (cold)", "parse: parse_cell (warm)"):
+        start = time.perf_counter()
+        for ref in refs:
+            parse_cell(ref)
+        results[label] = len(refs) / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as folder:
+        excel = Excel_WorkBook(os.path.join(folder, "refs.xlsx"), "DATA")
+        sheet = excel.get_sheet("DATA")
+        tuples = [parse_cell(ref) for ref in refs]
+        for label in ("write_cell: legacy path", "write_cell: A1", "write_cell: (row, col)"):
+            start = time.perf_counter()
+            for value in range(2):
+                if label == "write_cell: legacy path":
+                    for ref in refs:
+                        _write_cell_legacy(sheet, ref, value)
+                else:
+                    for ref in (refs if label == "write_cell: A1" else tuples):
+                        excel.write_cell("DATA", ref, value)
+            results[label] = 2 * len(refs) / (time.perf_counter() - start)
+    return results
+
+
+def synthetic_rows(rows, cols):
+    """Top-level (picklable) data source for batch jobs"""
+    for row in range(rows):
+        yield [row * col * 0.5 if col % 2 else f"R{row}C{col}" for col in range(cols)]
+
+
+def benchmark_batch(jobs=8, rows=20000, cols=20, workers=None):
+    """
+    Time generate_reports on identical CPU-bound jobs sequentially and with a process pool
+    """
+    from Python_Excel_Batch import generate_reports
+
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for count in sorted({1, workers}):
+            specs = [{
+                "path": os.path.join(folder, f"report_{count}_{index}.xlsx"),
+                "sheets": [{
+                    "name": "REPORT",
+                    "source": (synthetic_rows, rows, cols),
+                    "column_widths": {get_column_letter(col): 15 for col in range(1, cols + 1)},
+                    "freeze_panes": "A2",
+                    "formats": [(f"A1:{get_column_letter(cols)}1", {"font": {"bold": True}})],
+                }],
+            } for index in range(jobs)]
+            start = time.perf_counter()
+            reports = generate_reports(specs, workers=count)
+            results[f"{count} worker(s)"] = {
+                "seconds": time.perf_counter() - start,
+                "failed": sum(not report["ok"] for report in reports),
+            }
+    return results
+
+
+# Sheet shapes of the suite: (data rows, columns) at scale 1.0
+SHAPES = {"narrow": (20000, 5), "wide": (1000, 200), "tall": (50000, 20)}
+
+
+def generate_rows(rows, cols, seed=0):
+    """
+    Reproducible report-like rows: column by column an id/int, floats, text from a small
+    vocabulary and dates (the same seed always gives the same data)
+    """
+    rng = random.Random(seed)
+    words = [f"ITEM {index}" for index in range(50)]
+    start = date(2024, 1, 1)
+    for row in range(rows):
+        values = []
+        for col in range(cols):
+            kind = col % 5
+            if kind == 0:
+                values.append(row + 1 if col == 0 else rng.randrange(1000))
+            elif kind in (1, 3):
+                values.append(round(rng.uniform(0, 1000), 2))
+            elif kind == 2:
+                values.append(rng.choice(words))
+            else:
+                values.append(start + timedelta(days=rng.randrange(365)))
+        yield values
+
+
+def _write_png(path, size=32):
+    """Write a size x size RGB gradient PNG without Pillow"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    raw = b"".join(b"\x00" + bytes(channel for x in range(size) for channel in (x * 255 // size, y * 255 // size, 128))
+                   for y in range(size))
+    with open(path, "wb") as stream:
+        stream.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+                     + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+def suite_scenarios(scale=1.0):
+    """
+    Scenarios of the suite, {name: spec}: every shape unstyled and styled, plus formulas and
+    images on a narrow sheet. scale multiplies the row counts
+    """
+    scenarios = {}
+    for shape, (rows, cols) in SHAPES.items():
+        rows = max(1, int(rows * scale))
+        scenarios[shape] = {"rows": rows, "cols": cols}
+        scenarios[f"{shape}-styled"] = {"rows": rows, "cols": cols, "styled": True}
+    scenarios["formulas"] = {"rows": max(1, int(SHAPES["narrow"][0] * scale)), "cols": 5, "formulas": True}
+    scenarios["images"] = {"rows": max(1, int(1000 * scale)), "cols": 5, "images": 20}
+    return scenarios
+
+
+def run_scenario(path, spec, seed=0):
+    """
+    Build one synthetic sheet (spec: rows, cols, styled, formulas, images), save it, load it
+    again and read it back, timing each phase. Returns {"phases": {phase: {"seconds", "cells",
+    "cells_per_sec"}}, "file_size_mb"}; phases that cannot run here hold {"skipped": reason}
+    """
+    rows, cols = spec["rows"], spec["cols"]
+    data = list(generate_rows(rows, cols, seed))
+    last_row, last_letter = rows + 1, get_column_letter(cols + 1)
+    cells = last_row * (cols + 1)
+    phases = {}
+
+    def timed(name, count, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        phases[name] = {"seconds": round(seconds, 4), "cells": count,
+                        "cells_per_sec": round(count / seconds) if count and seconds else None}
+        return result
+
+    excel = Excel_WorkBook(path, "DATA", strict=True)
+
+    def write_rows():
+        excel.write_row("DATA", 1, [f"COLUMN {col}" for col in range(1, cols + 1)] + ["ID"])
+        for row, values in enumerate(data, start=2):
+            excel.write_row("DATA", row, values)
+    timed("write_row", (rows + 1) * cols, write_rows)
+    timed("write_column", rows, excel.write_column, "DATA", cols + 1, [f"ID-{row}" for row in range(rows)], 2)
+
+    if spec.get("styled"):
+        style_manager = Excel_Style()
+        border = style_manager.create_border(left_style="thin", right_style="thin", top_style="thin",
+                                             bottom_style="thin")
+        operations = [
+            (f"A1:{last_letter}1", {"font": style_manager.create_font(bold=True, color="FFFFFF"),
+                                    "pattern_fill": style_manager.create_pattern_fill(start_color="92D050"),
+                                    "alignment": style_manager.create_alignment(horizontal="center")}),
+            (f"A2:{last_letter}{last_row}", {"border": border}),
+        ]
+        for col in range(1, cols + 1):
+            number_format = {1: "0.00", 3: "0.00", 4: "yyyy-mm-dd"}.get((col - 1) % 5)
+            if number_format:
+                letter = get_column_letter(col)
+                operations.append((f"{letter}2:{letter}{last_row}", {"number_format": number_format}))
+
+        def format_cells():
+            for cell_range, style in operations:
+                excel.format_cells("DATA", cell_range, **style)
+        timed("format_cells", sum(range_size(cell_range) for cell_range, _ in operations), format_cells)
+
+    if spec.get("formulas"):
+        def set_formulas():
+            for row in range(2, last_row + 1):
+                excel.set_formula("DATA", (row, cols + 2), f"=B{row}+D{row}*2")
+        timed("set_formula", rows, set_formulas)
+        timed("calculate", rows, excel.calculate, "DATA")
+        cells += rows
+
+    if spec.get("images"):
+        if importlib.util.find_spec("PIL") is None:
+            phases["insert_image"] = {"skipped": "Pillow is not installed"}
+        else:
+            image = os.path.join(os.path.dirname(path), "image.png")
+            _write_png(image)
+
+            def insert_images():
+                for index in range(spec["images"]):
+                    excel.insert_image("DATA", f"{get_column_letter(cols + 3)}{index * 5 + 1}", image)
+            timed("insert_image", 0, insert_images)
+
+    timed("save", cells, excel.save)
+    excel.close()
+
+    def load():
+        workbook = Excel_WorkBook(path, "DATA", strict=True)
+        # Sheets are parsed on first access
+        workbook.read_cell("DATA", "A1")
+        return workbook
+    excel = timed("load", cells, load)
+    timed("read_range", cells, excel.read_range, "DATA", "A1", f"{last_letter}{last_row}")
+    timed("check_last_data_cell", cells, excel.check_last_data_cell, "DATA")
+    excel.close()
+    return {"phases": phases, "file_size_mb": round(os.path.getsize(path) / (1024 * 1024), 3)}
+
+
+def run_suite(scale=1.0, names=None, output=None, repeat=1, seed=0):
+    """
+    Run the suite scenarios (all, or those in names), each in a fresh process so peak RSS is
+    per scenario; with repeat > 1 the fastest time of each phase is kept. Returns
+    {"meta": {...}, "scenarios": {name: {"spec", "seconds", "peak_rss_mb", "file_size_mb", "phases"}}}
+    and writes it as JSON to output if given. A scenario that fails is recorded as
+    {"spec", "error"} (the traceback of the failure) and the suite goes on
+    """
+    scenarios = suite_scenarios(scale)
+    unknown = set(names or ()) - set(scenarios)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))} (expected {', '.join(scenarios)}).")
+    results = {
+        "meta": {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "openpyxl": openpyxl.__version__,
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                 "scale": scale, "repeat": repeat, "seed": seed},
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        for name, spec in scenarios.items():
+            if names and name not in names:
+                continue
+            result = None
+            for attempt in range(repeat):
+                path = os.path.join(folder, f"{name}-{attempt}.xlsx")
+                try:
+                    measurement = measure(run_scenario, path, spec, seed)
+                except Exception as e:
+                    result = {"error": str(e)}
+                    break
+                run = measurement["result"]
+                run["seconds"] = round(measurement["seconds"], 4)
+                run["peak_rss_mb"] = round(measurement["peak_rss_mb"], 1) if measurement["peak_rss_mb"] else None
+                if result is None:
+                    result = run
+                    continue
+                result["seconds"] = min(result["seconds"], run["seconds"])
+                if run["peak_rss_mb"] is not None:
+                    result["peak_rss_mb"] = max(result["peak_rss_mb"] or 0, run["peak_rss_mb"])
+                for phase, stats in run["phases"].items():
+                    if stats.get("seconds", float("inf")) < result["phases"][phase].get("seconds", float("inf")):
+                        result["phases"][phase] = stats
+            results["scenarios"][name] = {"spec": spec, **result}
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as stream:
+            json.dump(results, stream, indent=2)
+    return results
+
+
+def compare_results(baseline, current, min_seconds=0.01):
+    """
+    Compare two run_suite results, scenario by scenario: [{"scenario", "metric", "baseline",
+    "current", "change"}] for every phase time, total time and peak RSS found in both, change
+    being the relative increase (0.25: 25% slower or bigger), largest first. Times below
+    min_seconds in both runs are left out, their ratio is mostly noise
+    """
+    comparisons = []
+    for name, result in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None or previous.get("spec") != result.get("spec") or "error" in previous or "error" in result:
+            # A scenario of another size, or one that failed, is not comparable
+            continue
+        metrics = [("seconds", previous.get("seconds"), result.get("seconds")),
+                   ("peak_rss_mb", previous.get("peak_rss_mb"), result.get("peak_rss_mb"))]
+        metrics += [(f"{phase}.seconds", previous["phases"].get(phase, {}).get("seconds"), stats.get("seconds"))
+                    for phase, stats in result["phases"].items()]
+        for metric, old, new in metrics:
+            if metric.endswith("seconds") and old is not None and new is not None and max(old, new) < min_seconds:
+                continue
+            if old and new is not None:
+                comparisons.append({"scenario": name, "metric": metric, "baseline": old, "current": new,
+                                    "change": round(new / old - 1, 4)})
+    comparisons.sort(key=lambda comparison: comparison["change"], reverse=True)
+    return comparisons
+
+
+def _print_suite(results):
+    for name, result in results["scenarios"].items():
+        if "error" in result:
+            print(f"{name}: FAILED\n{result['error']}")
+            continue
+        print(f"{name} ({result['spec']['rows']} x {result['spec']['cols']}): {result['seconds']:.2f} s, "
+              f"peak RSS {result['peak_rss_mb']} MB, file {result['file_size_mb']} MB")
+        for phase, stats in result["phases"].items():
+            if "skipped" in stats:
+                print(f"  {phase:>22}: skipped ({stats['skipped']})")
+            else:
+                rate = f", {stats['cells_per_sec']:,} cells/s" if stats["cells_per_sec"] else ""
+                print(f"  {phase:>22}: {stats['seconds']:.3f} s{rate}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    if len(sys.argv) > 1 and sys.argv[1] == "suite":
+        parser = argparse.ArgumentParser(prog="Python_Excel_Benchmark.py suite",
+                                         description="Run the benchmark suite and store its results as JSON.")
+        parser.add_argument("--scale", type=float, default=1.0, help="multiplies the row counts (default 1.0)")
+        parser.add_argument("--only", help="comma-separated scenario names")
+        parser.add_argument("--repeat", type=int, default=1, help="runs per scenario, fastest phase times kept")
+        parser.add_argument("--output", default="benchmark_results.json")
+        parser.add_argument("--baseline", help="results of an earlier run to compare with")
+        parser.add_argument("--tolerance", type=float, default=0.10,
+                            help="relative slowdown reported as a regression (default 0.10)")
+        args = parser.parse_args(sys.argv[2:])
+        results = run_suite(scale=args.scale, names=args.only.split(",") if args.only else None,
+                            output=args.output, repeat=args.repeat)
+        _print_suite(results)
+        print(f"Results written to {args.output}")
+        failed = [name for name, result in results["scenarios"].items() if "error" in result]
+        if failed:
+            print(f"FAILED scenarios: {', '.join(failed)}")
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as stream:
+                regressions = [comparison for comparison in compare_results(json.load(stream), results)
+                               if comparison["change"] > args.tolerance]
+            for comparison in regressions:
+                print(f"REGRESSION {comparison['scenario']} {comparison['metric']}: {comparison['baseline']} -> "
+                      f"{comparison['current']} (+{comparison['change']:.0%})")
+            if not regressions:
+                print(f"No regression above {args.tolerance:.0%}.")
+            sys.exit(1 if regressions or failed else 0)
+        sys.exit(1 if failed else 0)
+
+    parser = argparse.ArgumentParser(description="Run the individual benchmarks; the 'suite' subcommand runs "
+                                                 "the benchmark suite (see 'suite --help').")
+    parser.add_argument("rows", nargs="?", type=int, default=200000,
+                        help="rows of the stream and compact benchmarks (default 200000)")
+    rows = parser.parse_args().rows
+    for mode, result in benchmark_stream_write(rows=rows).items():
+        print(f"{mode:>6}: {result['seconds']} s, peak RSS {result['peak_rss_mb']} MB, file {result['file_size_mb']} MB")
+    for name, result in benchmark_compact_memory(rows=rows).items():
+        print(f"{name:>7}: {result['bytes_per_cell']} B/cell, {result['seconds']} s, "
+              f"peak RSS {result['peak_rss_mb']} MB, file {result['file_size_mb']} MB")
+    for name, cells_per_second in benchmark_bulk_write().items():
+        print(f"{name:>14}: {cells_per_second:,.0f} cells/s")
+    for name, seconds in benchmark_format().items():
+        print(f"{name:>18}: {seconds:.2f} s")
+    for name, refs_per_second in benchmark_cell_refs().items():
+        print(f"{name:>36}: {refs_per_second:,.0f} refs/s")
+    for name, result in benchmark_batch().items():
+        print(f"{name:>12}: {result['seconds']:.2f} s, {result['failed']} failed")
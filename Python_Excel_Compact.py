@@ -0,0 +1,331 @@
+from array import array
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import quoteattr
+
+from openpyxl.cell import Cell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles.cell_style import StyleArray
+
+from Python_Excel_Package import cell_xml
+from Python_Excel_Reference import column_letter
+
+# Kind of the value stored for a cell, kept in one byte per row of a column
+EMPTY, INT, FLOAT, TEXT, BOOL, DATETIME, DATE, TIME, OBJECT = range(9)
+
+_EPOCH = datetime(1899, 12, 30)
+_EPOCH_DATE = _EPOCH.date()
+_MICROSECOND = timedelta(microseconds=1)
+# Ints a double holds exactly
+_MAX_EXACT_INT = 2 ** 53
+# Other values a cell can hold, stored as they are
+_OBJECT_TYPES = (int, float, Decimal, timedelta, datetime, time)
+# Python type of the values of each date kind, which picks their default number format
+_KIND_TYPES = {DATETIME: datetime, DATE: date, TIME: time}
+
+
+def style_bands(spans):
+    """
+    Split the rows covered by style spans [(min_col, min_row, max_col, max_row, style ids, create)]
+    into bands where the set of covering spans does not change, and merge the styles of each
+    column of a band once: yields (first row, row after the band, [(col, style ids, create)])
+    """
+    edges = sorted({span[1] for span in spans} | {span[3] + 1 for span in spans})
+    for start, stop in zip(edges, edges[1:]):
+        merged = {}
+        for min_col, min_row, max_col, max_row, ids, create in spans:
+            if min_row <= start <= max_row:
+                for col in range(min_col, max_col + 1):
+                    column = merged.setdefault(col, [{}, False])
+                    column[0].update(ids)
+                    column[1] = column[1] or create
+        yield start, stop, [(col, list(ids.items()), create) for col, (ids, create) in sorted(merged.items())]
+
+
+def style_cells(sheet, spans):
+    """Apply style spans to the cells of an openpyxl worksheet, creating the missing ones where create is set"""
+    cells = sheet._cells
+    for start, stop, columns in style_bands(spans):
+        for row in range(start, stop):
+            for col, ids, create in columns:
+                cell = cells.get((row, col))
+                if cell is None:
+                    if not create:
+                        continue
+                    cell = cells[(row, col)] = Cell(sheet, row=row, column=col)
+                style_array = cell._style
+                if style_array is None:
+                    style_array = cell._style = StyleArray()
+                for index, value in ids:
+                    style_array[index] = value
+
+
+class _Column:
+    """
+    Values of one column: a kind byte and an 8-byte payload per row (index row - 1),
+    up to the last row holding a value
+    """
+    __slots__ = ("kinds", "data")
+
+    def __init__(self):
+        self.kinds = array("b")
+        # Number, string id, bool, or date/time as days/microseconds from the Excel epoch
+        self.data = array("d")
+
+
+class CompactSheet:
+    """
+    Value storage of a worksheet without openpyxl Cell objects: typed column arrays, a table
+    of the distinct strings and the style spans of format_ranges. Costs about 9 bytes per
+    cell instead of several hundred; materialize() turns it into regular cells, write_xml()
+    serializes it without creating any. Also stands in for the used-range index of the
+    sheet (last_row, last_col, last_data_cell), which the arrays answer without a per-row set.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.strings = []
+        self.string_ids = {}
+        # Values that do not fit the arrays (big ints, Decimal, timedelta...): {(row, col): value}
+        self.objects = {}
+        # [(min_col, min_row, max_col, max_row, style ids, create)] in the order they were applied
+        self.spans = []
+
+    def set(self, row, col, value):
+        """Store value in (row, col), None clears the cell. Raises ValueError like openpyxl for invalid values"""
+        if row < 1 or col < 1:
+            # A negative index would wrap to the end of the arrays
+            raise ValueError("Row or column values must be at least 1")
+        column = self.columns.get(col)
+        if column is None:
+            if value is None:
+                return
+            column = self.columns[col] = _Column()
+        kinds, data = column.kinds, column.data
+        size = len(kinds)
+        if row > size:
+            if value is None:
+                return
+            if row > size + 1:
+                kinds.frombytes(bytes(row - 1 - size))
+                data.frombytes(bytes(8 * (row - 1 - size)))
+            kinds.append(EMPTY)
+            data.append(0.0)
+        index = row - 1
+        if kinds[index] == OBJECT:
+            del self.objects[(row, col)]
+        kind, payload = self.__encode(value)
+        if kind == OBJECT:
+            self.objects[(row, col)] = value
+        kinds[index] = kind
+        data[index] = payload
+        if kind == EMPTY and row == size:
+            # Keep the arrays ending on a value, their lengths give the used range
+            while kinds and not kinds[-1]:
+                kinds.pop()
+                data.pop()
+            if not kinds:
+                del self.columns[col]
+
+    def __encode(self, value):
+        cls = value.__class__
+        if value is None:
+            return EMPTY, 0.0
+        if cls is str:
+            string_id = self.string_ids.get(value)
+            if string_id is None:
+                if ILLEGAL_CHARACTERS_RE.search(value):
+                    raise ValueError(f"{value!r} holds characters that cannot be used in worksheets.")
+                string_id = self.string_ids[value] = len(self.strings)
+                self.strings.append(value)
+            return TEXT, string_id
+        if cls is float:
+            return FLOAT, value
+        if cls is int:
+            return (INT, value) if -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT else (OBJECT, 0.0)
+        if cls is bool:
+            return BOOL, value
+        if cls is datetime and value.tzinfo is None:
+            return DATETIME, (value - _EPOCH) // _MICROSECOND
+        if cls is date:
+            return DATE, (value - _EPOCH_DATE).days
+        if cls is time and value.tzinfo is None:
+            return TIME, ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+        if isinstance(value, _OBJECT_TYPES) or isinstance(value, date):
+            return OBJECT, 0.0
+        if isinstance(value, str):
+            return self.__encode(str(value))
+        if hasattr(value, "dtype") and hasattr(value, "item"):
+            # NumPy scalars
+            return self.__encode(value.item())
+        raise ValueError(f"Cannot convert {value!r} to Excel")
+
+    def get(self, row, col):
+        """Value stored in (row, col), None for an empty cell"""
+        column = self.columns.get(col)
+        if column is None or row > len(column.kinds) or row < 1:
+            return None
+        return self.__decode(column.kinds[row - 1], column.data[row - 1], row, col)
+
+    def __decode(self, kind, payload, row, col):
+        if kind == EMPTY:
+            return None
+        if kind == INT:
+            return int(payload)
+        if kind == FLOAT:
+            return payload
+        if kind == TEXT:
+            return self.strings[int(payload)]
+        if kind == BOOL:
+            return bool(payload)
+        if kind == DATETIME:
+            return _EPOCH + timedelta(microseconds=payload)
+        if kind == DATE:
+            return _EPOCH_DATE + timedelta(days=payload)
+        if kind == TIME:
+            return (datetime.min + timedelta(microseconds=payload)).time()
+        return self.objects[(row, col)]
+
+    def column_cells(self, col):
+        """Yield (row, value) of the values stored in column col"""
+        column = self.columns.get(col)
+        if column is None:
+            return
+        decode, data = self.__decode, column.data
+        for index, kind in enumerate(column.kinds):
+            if kind:
+                yield index + 1, decode(kind, data[index], index + 1, col)
+
+    def update(self, row, col, value):
+        """Used-range hook of the write_* methods: set() already recorded the value"""
+
+    @property
+    def last_row(self):
+        return max((len(column.kinds) for column in self.columns.values()), default=0)
+
+    @property
+    def last_col(self):
+        return max(self.columns, default=0)
+
+    def last_data_cell(self):
+        """Return (last row, last column of that row, no data right of that column)"""
+        last_row = self.last_row
+        if not last_row:
+            return (0, 0, True)
+        last_col = max(col for col, column in self.columns.items()
+                       if len(column.kinds) >= last_row and column.kinds[last_row - 1])
+        return (last_row, last_col, last_col == self.last_col)
+
+    def nbytes(self):
+        """Approximate memory held by the arrays and the string table"""
+        arrays = sum(column.kinds.buffer_info()[1] + 8 * column.data.buffer_info()[1] for column in self.columns.values())
+        return arrays + sum(len(value) + 49 for value in self.strings)
+
+    def materialize(self, sheet):
+        """Create the openpyxl cells of every stored value and style span in sheet"""
+        cells = sheet._cells
+        for col in sorted(self.columns):
+            for row, value in self.column_cells(col):
+                cells[(row, col)] = Cell(sheet, row=row, column=col, value=value)
+        style_cells(sheet, self.spans)
+
+    def write_xml(self, stream, sheet, cell_styles, date_ids):
+        """
+        Write the <sheetData> element of sheet to the binary stream, row by row, straight from
+        the arrays. Cell formats are registered in cell_styles (the workbook's xf table), so
+        this must run before the stylesheet is written; date_ids {type: style ids} hold the
+        number formats given to dates and times without one (datetime, date, time, timedelta). Returns the dimension reference ("A1:D9")
+        """
+        dimensions = sheet.row_dimensions
+        bands = list(style_bands(self.spans))
+        columns = sorted(self.columns.items())
+        last_row = max([len(column.kinds) for _, column in columns] + [band[1] - 1 for band in bands]
+                       + list(dimensions.keys()), default=0)
+        letters = {}
+        xf_cache = {}
+        min_col = min_row = None
+        max_col = max_row = 0
+        decode = self.__decode
+
+        def style_attribute(ids, value_type):
+            key = (tuple(ids), value_type)
+            style = xf_cache.get(key)
+            if style is None:
+                merged = dict(ids)
+                if value_type in date_ids and 3 not in merged:
+                    merged.update(date_ids[value_type])
+                if merged:
+                    style_array = StyleArray()
+                    for index, value in merged.items():
+                        style_array[index] = value
+                    xf = cell_styles.add(style_array)
+                    style = f' s="{xf}"' if xf else ""
+                else:
+                    style = ""
+                xf_cache[key] = style
+            return style
+
+        parts = []
+        band_index = 0
+        band_columns = {}
+        band_stop = 0
+        for row in range(1, last_row + 1):
+            if row >= band_stop:
+                # Entering the next band, or a gap between bands
+                while band_index < len(bands) and bands[band_index][1] <= row:
+                    band_index += 1
+                if band_index < len(bands) and bands[band_index][0] <= row:
+                    band_columns = {col: (ids, create) for col, ids, create in bands[band_index][2]}
+                    band_stop = bands[band_index][1]
+                else:
+                    band_columns = {}
+                    band_stop = bands[band_index][0] if band_index < len(bands) else last_row + 1
+            row_cells = []
+            index = row - 1
+            for col, column in columns:
+                if index < len(column.kinds):
+                    kind = column.kinds[index]
+                    if kind:
+                        row_cells.append((col, kind, column.data[index]))
+            if band_columns:
+                filled = {col for col, _, _ in row_cells}
+                row_cells.extend((col, EMPTY, 0.0) for col, (_, create) in band_columns.items()
+                                 if create and col not in filled)
+                row_cells.sort()
+            dimension = dimensions.get(row)
+            if not row_cells and dimension is None:
+                continue
+            attributes = "".join(f" {name}={quoteattr(value)}" for name, value in dimension or ())
+            xml = []
+            for col, kind, payload in row_cells:
+                letter = letters.get(col)
+                if letter is None:
+                    letter = letters[col] = column_letter(col)
+                ids = band_columns.get(col, ((), False))[0]
+                value = decode(kind, payload, row, col)
+                value_type = _KIND_TYPES.get(kind)
+                if kind == OBJECT:
+                    # Durations, datetime subclasses and time-zone-aware values get a format too
+                    value_type = next((cls for cls in (datetime, date, time, timedelta) if isinstance(value, cls)), None)
+                style = style_attribute(ids, value_type) if ids or value_type in date_ids else ""
+                reference = f"{letter}{row}"
+                cell = cell_xml(reference, style, value) if kind else None
+                if cell is None:
+                    if not style:
+                        continue
+                    cell = f'<c r="{reference}"{style}/>'
+                xml.append(cell)
+                min_col = col if min_col is None else min(min_col, col)
+                max_col = max(max_col, col)
+            if xml:
+                min_row = row if min_row is None else min_row
+                max_row = row
+            parts.append(f'<row r="{row}"{attributes}>{"".join(xml)}</row>' if xml
+                         else f'<row r="{row}"{attributes}/>')
+            if len(parts) >= 1000:
+                stream.write("".join(parts).encode("utf-8"))
+                parts = []
+        stream.write("".join(parts).encode("utf-8"))
+        if min_row is None:
+            return "A1:A1"
+        return f"{column_letter(min_col)}{min_row}:{column_letter(max_col)}{max_row}"
@@ -0,0 +1,381 @@
+from bisect import bisect_left
+from difflib import SequenceMatcher
+
+from openpyxl.cell import Cell
+from openpyxl.formula.tokenizer import Token, Tokenizer
+
+from Python_Excel_Errors import UnsupportedOperationError
+from Python_Excel_Reference import column_letter, parse_range
+
+
+def row_signature(values):
+    """
+    Comparable form of a row of values: trailing empty cells dropped (rows read with different
+    widths compare equal) and booleans told apart from 1 and 0, which Python holds equal
+    """
+    values = list(values)
+    while values and values[-1] is None:
+        values.pop()
+    return tuple((value,) if value.__class__ is bool else value for value in values)
+
+
+def _match_keys(signatures, keys):
+    """
+    Key of each row for keyed diffs: the values of the key columns, numbered by occurrence so
+    that rows sharing a key are paired in order
+    """
+    seen = {}
+    matched = []
+    for signature in signatures:
+        key = tuple(signature[col - 1] if col <= len(signature) else None for col in keys)
+        count = seen[key] = seen.get(key, -1) + 1
+        matched.append((key, count))
+    return matched
+
+
+class SheetDiff:
+    """
+    Differences between an old and a new version of a sheet's rows, from first_row down:
+    - inserted: [(new row, old row it follows, values)], the old row being first_row - 1 at the top
+    - deleted: [(old row, values)]
+    - changed: [(old row, new row, {column: (old value, new value)})]
+    Columns are compared by position. With keys (column numbers), rows are paired by the values
+    of those columns instead of by position and row_keys holds the key of every old row the
+    diff refers to, which apply_diff uses to find the rows of a target sheet.
+    """
+    __slots__ = ("first_row", "keys", "inserted", "deleted", "changed", "row_keys")
+
+    def __init__(self, first_row=1, keys=None):
+        self.first_row = first_row
+        self.keys = list(keys) if keys else None
+        self.inserted = []
+        self.deleted = []
+        self.changed = []
+        self.row_keys = {}
+
+    def __bool__(self):
+        return bool(self.inserted or self.deleted or self.changed)
+
+    def summary(self):
+        """Counts of inserted, deleted and changed rows, and of changed cells"""
+        return {"inserted": len(self.inserted), "deleted": len(self.deleted), "changed": len(self.changed),
+                "changed_cells": sum(len(cells) for _, _, cells in self.changed)}
+
+    def cell_changes(self):
+        """Yield (cell reference in the new sheet, old value, new value) of every changed cell"""
+        for _, new_row, cells in self.changed:
+            for col, (old, new) in sorted(cells.items()):
+                yield f"{column_letter(col)}{new_row}", old, new
+
+    def locate(self, rows):
+        """
+        {old row: row of a target sheet} for the old rows this diff refers to, rows being the
+        values of the target from first_row down (keyed diffs). Unkeyed diffs use the old row
+        numbers as they are; old rows whose key the target lacks are left out
+        """
+        referenced = set(self.row_keys)
+        if self.keys is None:
+            referenced.update(row for row, _ in self.deleted)
+            referenced.update(row for row, _, _ in self.changed)
+            referenced.update(after for _, after, _ in self.inserted)
+            return {row: row for row in referenced}
+        wanted = {key: row for row, key in self.row_keys.items()}
+        located = {}
+        signatures = (row_signature(values) for values in rows)
+        for row, key in enumerate(_match_keys(signatures, self.keys), start=self.first_row):
+            old_row = wanted.get(key)
+            if old_row is not None:
+                located[old_row] = row
+        return located
+
+
+def _matching_rows(old, new):
+    """
+    (old index, new index) of the equal rows that align two lists of row signatures, in order.
+    Rows found once on each side anchor the alignment (patience diff: the longest run of
+    anchors in the same order on both sides), and difflib only aligns the short stretches
+    between anchors, which keeps the whole near-linear
+    """
+    occurrences = {}
+    for index, signature in enumerate(old):
+        entry = occurrences.get(signature)
+        if entry is None:
+            occurrences[signature] = [index, -1]
+        else:
+            entry[0] = None
+    anchors = []
+    for index, signature in enumerate(new):
+        entry = occurrences.get(signature)
+        if entry is not None and entry[0] is not None:
+            if entry[1] == -1:
+                entry[1] = len(anchors)
+                anchors.append((entry[0], index))
+            elif entry[1] is not None:
+                # Repeated in new: not an anchor
+                anchors[entry[1]] = None
+                entry[1] = None
+    anchors = [anchor for anchor in anchors if anchor is not None]
+    # Longest increasing run of old indexes, anchors being in new order
+    tails, tail_ids, previous = [], [], [None] * len(anchors)
+    for position, (old_index, _) in enumerate(anchors):
+        slot = bisect_left(tails, old_index)
+        if slot:
+            previous[position] = tail_ids[slot - 1]
+        if slot == len(tails):
+            tails.append(old_index)
+            tail_ids.append(position)
+        else:
+            tails[slot] = old_index
+            tail_ids[slot] = position
+    chain = []
+    position = tail_ids[-1] if tail_ids else None
+    while position is not None:
+        chain.append(anchors[position])
+        position = previous[position]
+    chain.reverse()
+
+    matches = []
+    old_start = new_start = 0
+    for old_index, new_index in chain + [(len(old), len(new))]:
+        if old_start < old_index and new_start < new_index:
+            matcher = SequenceMatcher(None, old[old_start:old_index], new[new_start:new_index])
+            for block in matcher.get_matching_blocks():
+                matches.extend((old_start + block.a + offset, new_start + block.b + offset)
+                               for offset in range(block.size))
+        if old_index < len(old):
+            matches.append((old_index, new_index))
+        old_start, new_start = old_index + 1, new_index + 1
+    return matches
+
+
+def _changed_cells(old, new):
+    """{column: (old value, new value)} of the cells that differ between two row signatures"""
+    cells = {}
+    for index in range(max(len(old), len(new))):
+        before = old[index] if index < len(old) else None
+        after = new[index] if index < len(new) else None
+        if before != after:
+            # Unwrap the booleans of row_signature
+            cells[index + 1] = (before[0] if isinstance(before, tuple) else before,
+                                after[0] if isinstance(after, tuple) else after)
+    return cells
+
+
+def diff_rows(old_rows, new_rows, keys=None, first_row=1):
+    """
+    SheetDiff between two sequences of rows of values starting at row first_row.
+    Rows are compared through their hashes, so the cost grows with the number of rows, not
+    with rows x rows: keyed diffs pair rows through a dict of keys, unkeyed diffs align the
+    rows (_matching_rows) and report a changed row where one row replaces another at the
+    same place between two aligned rows.
+    """
+    old = [row_signature(values) for values in old_rows]
+    new = [row_signature(values) for values in new_rows]
+    diff = SheetDiff(first_row, keys)
+    if keys:
+        old_keys = _match_keys(old, keys)
+        unmatched = {key: index for index, key in enumerate(old_keys)}
+        after = first_row - 1
+        for index, key in enumerate(_match_keys(new, keys)):
+            old_index = unmatched.pop(key, None)
+            if old_index is None:
+                diff.inserted.append((index + first_row, after, new[index]))
+                continue
+            after = old_index + first_row
+            if old[old_index] != new[index]:
+                diff.row_keys[after] = key
+                diff.changed.append((after, index + first_row, _changed_cells(old[old_index], new[index])))
+        for old_index in sorted(unmatched.values()):
+            diff.deleted.append((old_index + first_row, old[old_index]))
+            diff.row_keys[old_index + first_row] = old_keys[old_index]
+        # Anchors of the insertions are old rows too
+        for _, after, _ in diff.inserted:
+            if after >= first_row:
+                diff.row_keys[after] = old_keys[after - first_row]
+    else:
+        old_start = new_start = 0
+        for old_end, new_end in _matching_rows(old, new) + [(len(old), len(new))]:
+            # Unmatched rows between two aligned rows: changed where they face each other
+            paired = min(old_end - old_start, new_end - new_start)
+            for offset in range(paired):
+                old_index, new_index = old_start + offset, new_start + offset
+                diff.changed.append((old_index + first_row, new_index + first_row,
+                                     _changed_cells(old[old_index], new[new_index])))
+            for old_index in range(old_start + paired, old_end):
+                diff.deleted.append((old_index + first_row, old[old_index]))
+            after = old_start + paired - 1 + first_row
+            for new_index in range(new_start + paired, new_end):
+                diff.inserted.append((new_index + first_row, after, new[new_index]))
+            old_start, new_start = old_end + 1, new_end + 1
+    # Values of the signatures back to cell values
+    diff.inserted = [(row, after, _values(signature)) for row, after, signature in diff.inserted]
+    diff.deleted = [(row, _values(signature)) for row, signature in diff.deleted]
+    return diff
+
+
+def _values(signature):
+    return tuple(value[0] if isinstance(value, tuple) else value for value in signature)
+
+
+def _reaches(references, first_row, title=None, sheet=None):
+    """
+    Whether space-separated range references (of sheet title when they are not qualified)
+    reach row first_row or below on sheet; whole columns and names are left out
+    """
+    for reference in references.split():
+        try:
+            ref_sheet, _, _, max_row, _ = parse_range(reference)
+        except ValueError:
+            continue
+        if (ref_sheet or title) == sheet and max_row is not None and max_row >= first_row:
+            return True
+    return False
+
+
+def _formula_reaches(formula, first_row, title, sheet):
+    """Whether a formula of sheet title refers to a cell of sheet at row first_row or below"""
+    try:
+        tokens = Tokenizer(formula).items
+    except Exception:
+        # A formula openpyxl cannot read may refer to anything
+        return True
+    return any(token.type == Token.OPERAND and token.subtype == Token.RANGE
+               and _reaches(token.value, first_row, title, sheet) for token in tokens)
+
+
+def _structure_below(sheet, first_row):
+    """
+    Description of the first structure tied to rows from first_row down that apply_diff does
+    not move with the cells (merged cells, conditional formats, data validations, tables,
+    drawings, formula references and defined names), None if there is none
+    """
+    title = sheet.title
+    for merged in sheet.merged_cells.ranges:
+        if merged.max_row >= first_row:
+            return f"merged cells {merged.coord}"
+    for formatting in sheet.conditional_formatting:
+        if _reaches(str(formatting.sqref), first_row, title, title) or any(
+                _formula_reaches(f"={formula}", first_row, title, title)
+                for rule in formatting.rules for formula in rule.formula or ()):
+            return f"conditional formatting on {formatting.sqref}"
+    for validation in sheet.data_validations.dataValidation:
+        if _reaches(str(validation.sqref), first_row, title, title):
+            return f"a data validation on {validation.sqref}"
+    for table in sheet.tables.values():
+        if _reaches(table.ref, first_row, title, title):
+            return f"table '{table.displayName}'"
+    for drawing in sheet._images + sheet._charts:
+        anchor = drawing.anchor
+        if isinstance(anchor, str):
+            below = _reaches(anchor, first_row, title, title)
+        else:
+            marker = getattr(anchor, "to", None) or getattr(anchor, "_from", None)
+            below = marker is not None and marker.row + 1 >= first_row
+        if below:
+            return "an image or chart"
+    for worksheet in sheet.parent.worksheets:
+        for cell in worksheet._cells.values():
+            if cell.data_type == "f":
+                formula = getattr(cell.value, "text", cell.value)
+                if isinstance(formula, str) and _formula_reaches(formula, first_row, worksheet.title, title):
+                    return f"a formula referring to those rows in {worksheet.title}!{cell.coordinate}"
+    for name, defined in list(sheet.parent.defined_names.items()) + list(sheet.defined_names.items()):
+        if any(destination == title and _reaches(reference, first_row, title, title)
+               for destination, reference in defined.destinations):
+            return f"defined name '{name}'"
+    return None
+
+
+def apply_diff(sheet, diff, located):
+    """
+    Apply diff to an openpyxl worksheet in one pass over its cells: changed cells are
+    written, deleted rows removed and inserted rows added after the row they follow, the rows
+    below moving up or down with their styles and heights. located is SheetDiff.locate() of
+    the sheet. Returns {"changed", "inserted", "deleted", "missing", "conflicts"}, missing
+    counting the rows the sheet lacks and conflicts the changed cells whose value in the sheet
+    was not the old value of the diff (they are overwritten all the same).
+    Rows are only moved on sheets without structures tied to the moved rows (see
+    _structure_below): UnsupportedOperationError otherwise, before anything is written.
+    """
+    cells = sheet._cells
+    stats = {"changed": 0, "inserted": 0, "deleted": 0, "missing": 0, "conflicts": 0}
+    deleted = set()
+    for old_row, _ in diff.deleted:
+        row = located.get(old_row)
+        if row is None:
+            stats["missing"] += 1
+        else:
+            deleted.add(row)
+    # Inserted rows by the row of the sheet they follow; rows whose anchor is gone go last
+    last_row = max([row for row, _ in cells] + list(sheet.row_dimensions.keys()) + [diff.first_row - 1])
+    inserts = {}
+    for _, after, values in diff.inserted:
+        row = after if after < diff.first_row else located.get(after, last_row)
+        inserts.setdefault(row, []).append(values)
+    if deleted or inserts:
+        # Checked before any cell is written: the sheet is left as it was
+        first_moved = min(list(deleted) + [row + 1 for row in inserts])
+        structure = _structure_below(sheet, first_moved)
+        if structure is not None:
+            raise UnsupportedOperationError(
+                f"Sheet '{sheet.title}' has {structure} at or below row {first_moved}, which inserting or "
+                f"deleting rows would not move.")
+
+    for old_row, _, changes in diff.changed:
+        row = located.get(old_row)
+        if row is None:
+            stats["missing"] += 1
+            continue
+        for col, (old, new) in changes.items():
+            cell = cells.get((row, col))
+            if (cell.value if cell is not None else None) != old:
+                stats["conflicts"] += 1
+            stats["changed"] += 1
+            if cell is None:
+                if new is None:
+                    continue
+                cell = cells[(row, col)] = Cell(sheet, row=row, column=col)
+            cell.value = new
+    if not deleted and not inserts:
+        return stats
+
+    by_row = {}
+    for (row, col), cell in cells.items():
+        by_row.setdefault(row, []).append(cell)
+    dimensions = sheet.row_dimensions
+    moved_dimensions = {}
+    moved = {}
+    target = 0
+
+    def place(row):
+        # Keep the cells and height of an existing row at its new position
+        for cell in by_row.get(row, ()):
+            cell.row = target
+            moved[(target, cell.column)] = cell
+            if cell.hyperlink is not None:
+                cell.hyperlink.ref = cell.coordinate
+        if row in dimensions:
+            dimension = dimensions[row]
+            dimension.index = target
+            moved_dimensions[target] = dimension
+
+    # Row 0 only carries the rows inserted at the top of a sheet without header
+    for row in range(0, last_row + 1):
+        if row < diff.first_row:
+            target = row
+            place(row)
+        elif row in deleted:
+            stats["deleted"] += 1
+        else:
+            target += 1
+            place(row)
+        for values in inserts.get(row, ()):
+            target += 1
+            for col, value in enumerate(values, start=1):
+                if value is not None:
+                    moved[(target, col)] = Cell(sheet, row=target, column=col, value=value)
+            stats["inserted"] += 1
+    sheet._cells = moved
+    dimensions.clear()
+    dimensions.update(moved_dimensions)
+    return stats
@@ -0,0 +1,72 @@
+import logging
+
+# Messages of Excel_WorkBook and Excel_Style. Quiet by default: nothing is emitted until the
+# application configures logging (logging.basicConfig, configure_logging...)
+logger = logging.getLogger("Python_Excel")
+logger.addHandler(logging.NullHandler())
+
+
+class ExcelWorkbookError(Exception):
+    """Base class of the errors raised by Excel_WorkBook and Excel_Style in strict mode"""
+
+
+class SheetNotFoundError(ExcelWorkbookError, LookupError):
+    """The sheet does not exist"""
+
+
+class SheetExistsError(ExcelWorkbookError):
+    """A sheet with that name already exists"""
+
+
+class InvalidReferenceError(ExcelWorkbookError, ValueError):
+    """Invalid cell reference, range, row or column"""
+
+
+class UnsupportedOperationError(ExcelWorkbookError):
+    """The operation is not available in the workbook's mode, or comes too late in stream mode"""
+
+
+class StyleError(ExcelWorkbookError, ValueError):
+    """Unknown named style, or unsupported conditional formatting/color type"""
+
+
+class MissingDependencyError(ExcelWorkbookError, ImportError):
+    """An optional dependency (NumPy, pandas...) is not installed"""
+
+
+class OperationError(ExcelWorkbookError):
+    """Any other failure; the original exception is chained as __cause__"""
+
+
+def configure_logging(level=logging.INFO, handler=None, fmt="%(levelname)s %(name)s: %(message)s"):
+    """
+    Emit the messages of the library at level and above, to handler (stderr by default).
+    Returns the handler, to be removed with logger.removeHandler
+    """
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(fmt))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
+
+
+def report_error(strict, error, result=False):
+    """Raise error in strict mode, otherwise log it as a warning and return result"""
+    if strict:
+        raise error
+    logger.warning("%s", error)
+    return result
+
+
+def report_exception(strict, message, error, result=False):
+    """
+    Handle an exception caught by a method: in strict mode re-raise library errors and wrap
+    anything else in OperationError, otherwise log it and return result
+    """
+    if strict:
+        if isinstance(error, ExcelWorkbookError):
+            raise error
+        raise OperationError(f"{message}: {error}") from error
+    logger.error("%s: %s", message, error)
+    return result
@@ -0,0 +1,885 @@
+import math
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP, ROUND_DOWN, ROUND_UP
+from functools import lru_cache
+
+from openpyxl.utils.datetime import to_excel
+
+from Python_Excel_Reference import parse_range
+
+
+class ExcelError(Exception):
+    """An Excel error value (#DIV/0!, #N/A, ...): raised while evaluating, stored as the cell value"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return f"ExcelError({self.code!r})"
+
+    def __str__(self):
+        return self.code
+
+
+class CircularReferenceError(ExcelError):
+    """#REF! value of the formulas of a circular reference (Excel has no error code of its own for them)"""
+
+    def __init__(self):
+        super().__init__("#REF!")
+
+
+ERROR_CODES = ("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A")
+
+
+# --------------------------------------------------------------------------- parser
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<error>\#NULL!|\#DIV/0!|\#VALUE!|\#REF!|\#NAME\?|\#NUM!|\#N/A)
+  | (?P<func>(?:_xlfn\.)?[A-Za-z_][\w.]*)(?=\()
+  | (?:(?P<sheet>'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?
+    (?P<ref>\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?(?![\w(])
+          |\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}(?![\w(])
+          |\$?\d+:\$?\d+(?![\w(]))
+  | (?P<bool>TRUE|FALSE)(?![\w(])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<op><>|<=|>=|[-+*/^&=<>%(),])
+""", re.VERBOSE | re.IGNORECASE)
+
+# Binary operators by precedence level, lowest first
+_COMPARISON = ("=", "<>", "<", ">", "<=", ">=")
+
+
+def _tokenize(formula):
+    tokens = []
+    position = 0
+    while position < len(formula):
+        match = _TOKEN_RE.match(formula, position)
+        if match is None:
+            raise ExcelError("#NAME?")
+        position = match.end()
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        if kind == "ref":
+            sheet = match.group("sheet")
+            if sheet and sheet.startswith("'"):
+                sheet = sheet[1:-1].replace("''", "'")
+            tokens.append(("ref", (sheet, match.group("ref"))))
+        elif kind == "string":
+            tokens.append(("string", match.group(kind)[1:-1].replace('""', '"')))
+        elif kind == "bool":
+            tokens.append(("bool", match.group(kind).upper() == "TRUE"))
+        elif kind == "number":
+            text = match.group(kind)
+            tokens.append(("number", float(text) if any(c in text for c in ".eE") else int(text)))
+        elif kind == "func":
+            name = match.group(kind).upper()
+            tokens.append(("func", name[6:] if name.startswith("_XLFN.") else name))
+        else:
+            tokens.append((kind, match.group(kind).upper()))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser producing a tuple AST"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, value):
+        if self.take() != ("op", value):
+            raise ExcelError("#NAME?")
+
+    def parse(self):
+        node = self.comparison()
+        if self.position != len(self.tokens):
+            raise ExcelError("#NAME?")
+        return node
+
+    def binary(self, operators, operand):
+        node = operand()
+        while self.peek()[0] == "op" and self.peek()[1] in operators:
+            operator = self.take()[1]
+            node = ("op", operator, node, operand())
+        return node
+
+    def comparison(self):
+        return self.binary(_COMPARISON, self.concat)
+
+    def concat(self):
+        return self.binary(("&",), self.additive)
+
+    def additive(self):
+        return self.binary(("+", "-"), self.term)
+
+    def term(self):
+        return self.binary(("*", "/"), self.power)
+
+    def power(self):
+        return self.binary(("^",), self.unary)
+
+    def unary(self):
+        if self.peek() in (("op", "-"), ("op", "+")):
+            operator = self.take()[1]
+            operand = self.unary()
+            return ("neg", operand) if operator == "-" else operand
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("op", "/", node, ("value", 100))
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind in ("number", "string", "bool"):
+            return ("value", value)
+        if kind == "error":
+            return ("value", ExcelError(value))
+        if kind == "ref":
+            sheet, ref = value
+            try:
+                bounds = parse_range(ref)[1:]
+            except ValueError:
+                raise ExcelError("#REF!")
+            return ("ref", sheet, bounds)
+        if kind == "func":
+            self.expect("(")
+            args = []
+            if self.peek() != ("op", ")"):
+                while True:
+                    if self.peek() in (("op", ","), ("op", ")")):
+                        args.append(("value", None))
+                    else:
+                        args.append(self.comparison())
+                    if self.peek() != ("op", ","):
+                        break
+                    self.take()
+            self.expect(")")
+            return ("call", value, tuple(args))
+        if (kind, value) == ("op", "("):
+            node = self.comparison()
+            self.expect(")")
+            return node
+        raise ExcelError("#NAME?")
+
+
+@lru_cache(maxsize=4096)
+def parse_formula(formula):
+    """Parse '=SUM(A1:B2)*2' into a tuple AST (cached: the same text always gives the same tree)"""
+    return _Parser(_tokenize(formula[1:] if formula.startswith("=") else formula)).parse()
+
+
+def formula_references(node):
+    """Yield (sheet or None, bounds) of every cell/range referenced by an AST"""
+    if node[0] == "ref":
+        yield node[1], node[2]
+    elif node[0] == "op":
+        yield from formula_references(node[2])
+        yield from formula_references(node[3])
+    elif node[0] == "neg":
+        yield from formula_references(node[1])
+    elif node[0] == "call":
+        for arg in node[2]:
+            yield from formula_references(arg)
+
+
+# --------------------------------------------------------------------------- values
+
+class _Range:
+    """A rectangular block of cells passed to functions"""
+    __slots__ = ("engine", "sheet", "min_row", "min_col", "max_row", "max_col")
+
+    def __init__(self, engine, sheet, min_row, min_col, max_row, max_col):
+        self.engine = engine
+        self.sheet = sheet
+        self.min_row, self.min_col, self.max_row, self.max_col = min_row, min_col, max_row, max_col
+
+    def rows(self):
+        value = self.engine.cell_value
+        return [[value(self.sheet, row, col) for col in range(self.min_col, self.max_col + 1)]
+                for row in range(self.min_row, self.max_row + 1)]
+
+    def values(self):
+        value = self.engine.cell_value
+        for row in range(self.min_row, self.max_row + 1):
+            for col in range(self.min_col, self.max_col + 1):
+                yield value(self.sheet, row, col)
+
+
+def _check(value):
+    if isinstance(value, ExcelError):
+        raise value
+    if isinstance(value, _Range):
+        # A multi-cell range used as a single value
+        if value.min_row == value.max_row and value.min_col == value.max_col:
+            return _check(next(value.values()))
+        raise ExcelError("#VALUE!")
+    return value
+
+
+def to_number(value):
+    """Coerce a scalar the way Excel arithmetic does ("2.5" -> 2.5, TRUE -> 1, empty -> 0)"""
+    value = _check(value)
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, (datetime, date, time, timedelta)):
+        return to_excel(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            return float(text)
+        except ValueError:
+            raise ExcelError("#VALUE!")
+    raise ExcelError("#VALUE!")
+
+
+def to_text(value):
+    value = _check(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return format(value, ".15g")
+    return str(value)
+
+
+def to_bool(value):
+    value = _check(value)
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str) and value.upper() in ("TRUE", "FALSE"):
+        return value.upper() == "TRUE"
+    raise ExcelError("#VALUE!")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compare_key(value):
+    """Excel ordering: numbers < text < booleans, text compared case-insensitively"""
+    if isinstance(value, bool):
+        return (2, value)
+    if _is_number(value):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value.lower())
+    return (0, to_number(value))
+
+
+def _compare(operator, left, right):
+    left, right = _check(left), _check(right)
+    # An empty cell compares as 0, "" or FALSE depending on the other side
+    if left is None:
+        left = "" if isinstance(right, str) else False if isinstance(right, bool) else 0
+    if right is None:
+        right = "" if isinstance(left, str) else False if isinstance(left, bool) else 0
+    left, right = _compare_key(left), _compare_key(right)
+    if operator == "=":
+        return left == right
+    if operator == "<>":
+        return left != right
+    if operator == "<":
+        return left < right
+    if operator == ">":
+        return left > right
+    if operator == "<=":
+        return left <= right
+    return left >= right
+
+
+def _result(value):
+    """Turn a computed Python number into what Excel stores (NaN/inf -> #NUM!, 2.0 stays float)"""
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        raise ExcelError("#NUM!")
+    return value
+
+
+def _arithmetic(operator, left, right):
+    left, right = to_number(left), to_number(right)
+    if operator == "+":
+        return _result(left + right)
+    if operator == "-":
+        return _result(left - right)
+    if operator == "*":
+        return _result(left * right)
+    if operator == "/":
+        if right == 0:
+            raise ExcelError("#DIV/0!")
+        return _result(left / right)
+    try:
+        if isinstance(left, int) and isinstance(right, int) and right >= 0:
+            return left ** right
+        return _result(float(left) ** right)
+    except (OverflowError, ZeroDivisionError, ValueError):
+        raise ExcelError("#NUM!")
+
+
+# --------------------------------------------------------------------------- functions
+
+def _numbers(args, coerce_scalars=True):
+    """Numbers of the arguments: ranges contribute their numeric cells, scalars are coerced"""
+    for arg in args:
+        if isinstance(arg, _Range):
+            for value in arg.values():
+                if isinstance(value, ExcelError):
+                    raise value
+                if _is_number(value):
+                    yield value
+        elif arg is not None or coerce_scalars:
+            yield to_number(arg)
+
+
+def _flat(args):
+    for arg in args:
+        if isinstance(arg, _Range):
+            yield from arg.values()
+        else:
+            yield arg
+
+
+def _round(value, digits, rounding):
+    value, digits = to_number(value), int(to_number(digits))
+    result = Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-digits), rounding=rounding)
+    return int(result) if digits <= 0 else float(result)
+
+
+def _criteria(criteria):
+    """Build a predicate from a SUMIF/COUNTIF criteria (5, ">=5", "<>done", "a*")"""
+    if isinstance(criteria, str):
+        for operator in (">=", "<=", "<>", "=", ">", "<"):
+            if criteria.startswith(operator):
+                operand = criteria[len(operator):]
+                break
+        else:
+            operator, operand = "=", criteria
+        try:
+            operand = to_number(operand)
+        except ExcelError:
+            pass
+        if isinstance(operand, str) and operator in ("=", "<>") and any(c in operand for c in "*?"):
+            pattern = re.compile("^" + re.escape(operand).replace(r"\*", ".*").replace(r"\?", ".") + "$", re.I)
+            if operator == "=":
+                return lambda value: isinstance(value, str) and bool(pattern.match(value))
+            return lambda value: not (isinstance(value, str) and pattern.match(value))
+    else:
+        operator, operand = "=", _check(criteria)
+
+    def predicate(value):
+        if isinstance(value, ExcelError):
+            return False
+        if operator == "=" and operand == "":
+            return value is None or value == ""
+        if value is None or (_is_number(operand) != _is_number(value) and operator != "<>"):
+            return False
+        try:
+            return _compare(operator, value, operand)
+        except ExcelError:
+            return False
+    return predicate
+
+
+def _lookup_match(values, lookup, match_type):
+    """1-based position of lookup in values, MATCH semantics"""
+    lookup = _check(lookup)
+    if match_type == 0:
+        for position, value in enumerate(values, start=1):
+            if value is not None and not isinstance(value, ExcelError) and _compare("=", value, lookup):
+                return position
+        raise ExcelError("#N/A")
+    found = None
+    for position, value in enumerate(values, start=1):
+        if value is None or isinstance(value, ExcelError):
+            continue
+        if _compare_key(value)[0] != _compare_key(lookup)[0]:
+            continue
+        if (match_type > 0 and _compare(">", value, lookup)) or (match_type < 0 and _compare("<", value, lookup)):
+            break
+        found = position
+    if found is None:
+        raise ExcelError("#N/A")
+    return found
+
+
+def _sum(*args):
+    return _result(sum(_numbers(args)))
+
+
+def _average(*args):
+    numbers = list(_numbers(args))
+    if not numbers:
+        raise ExcelError("#DIV/0!")
+    return _result(sum(numbers) / len(numbers))
+
+
+def _count(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, _Range):
+            count += sum(1 for value in arg.values() if _is_number(value))
+        else:
+            try:
+                to_number(arg)
+                count += 1
+            except ExcelError:
+                pass
+    return count
+
+
+def _if(condition, when_true=True, when_false=False):
+    return when_true if to_bool(condition) else when_false
+
+
+def _iferror(value, fallback):
+    try:
+        return _check(value)
+    except ExcelError:
+        return fallback
+
+
+def _vlookup(lookup, table, column, approximate=True):
+    if not isinstance(table, _Range):
+        raise ExcelError("#VALUE!")
+    column = int(to_number(column))
+    if column < 1:
+        raise ExcelError("#VALUE!")
+    if column > table.max_col - table.min_col + 1:
+        raise ExcelError("#REF!")
+    rows = table.rows()
+    position = _lookup_match([row[0] for row in rows], lookup, 1 if to_bool(approximate) else 0)
+    return rows[position - 1][column - 1]
+
+
+def _hlookup(lookup, table, row, approximate=True):
+    if not isinstance(table, _Range):
+        raise ExcelError("#VALUE!")
+    row = int(to_number(row))
+    if row < 1:
+        raise ExcelError("#VALUE!")
+    if row > table.max_row - table.min_row + 1:
+        raise ExcelError("#REF!")
+    rows = table.rows()
+    position = _lookup_match(rows[0], lookup, 1 if to_bool(approximate) else 0)
+    return rows[row - 1][position - 1]
+
+
+def _match(lookup, values, match_type=1):
+    if not isinstance(values, _Range):
+        raise ExcelError("#N/A")
+    return _lookup_match(list(values.values()), lookup, int(to_number(match_type)))
+
+
+def _index(table, row, column=None):
+    if not isinstance(table, _Range):
+        raise ExcelError("#VALUE!")
+    rows = table.rows()
+    row = int(to_number(row))
+    column = int(to_number(column)) if column is not None else None
+    if column is None:
+        # INDEX over a single row or column takes one position
+        if len(rows) == 1:
+            row, column = 1, row
+        else:
+            column = 1
+    if not (1 <= row <= len(rows) and 1 <= column <= len(rows[0])):
+        raise ExcelError("#REF!")
+    return rows[row - 1][column - 1]
+
+
+def _sumif(values, criteria, sum_values=None):
+    if not isinstance(values, _Range):
+        raise ExcelError("#VALUE!")
+    predicate = _criteria(criteria)
+    targets = sum_values if isinstance(sum_values, _Range) else values
+    total = 0
+    for value, target in zip(values.values(), targets.values()):
+        if predicate(value) and _is_number(target):
+            total += target
+    return _result(total)
+
+
+def _countif(values, criteria):
+    if not isinstance(values, _Range):
+        raise ExcelError("#VALUE!")
+    predicate = _criteria(criteria)
+    return sum(1 for value in values.values() if predicate(value))
+
+
+def _mod(number, divisor):
+    number, divisor = to_number(number), to_number(divisor)
+    if divisor == 0:
+        raise ExcelError("#DIV/0!")
+    return _result(number - divisor * math.floor(number / divisor))
+
+
+def _sqrt(value):
+    value = to_number(value)
+    if value < 0:
+        raise ExcelError("#NUM!")
+    return math.sqrt(value)
+
+
+def _mid(text, start, length):
+    start, length = int(to_number(start)), int(to_number(length))
+    if start < 1 or length < 0:
+        raise ExcelError("#VALUE!")
+    return to_text(text)[start - 1:start - 1 + length]
+
+
+def _logical(args):
+    values = []
+    for value in _flat(args):
+        if isinstance(value, ExcelError):
+            raise value
+        if value is None or (isinstance(value, str) and value.upper() not in ("TRUE", "FALSE")):
+            continue
+        values.append(to_bool(value))
+    if not values:
+        raise ExcelError("#VALUE!")
+    return values
+
+
+FUNCTIONS = {
+    "SUM": _sum,
+    "AVERAGE": _average,
+    "MIN": lambda *args: min(_numbers(args), default=0),
+    "MAX": lambda *args: max(_numbers(args), default=0),
+    "COUNT": _count,
+    "COUNTA": lambda *args: sum(1 for value in _flat(args) if value is not None),
+    "COUNTBLANK": lambda values: sum(1 for value in _flat([values]) if value is None or value == ""),
+    "SUMIF": _sumif,
+    "COUNTIF": _countif,
+    "IF": _if,
+    "IFERROR": _iferror,
+    "AND": lambda *args: all(_logical(args)),
+    "OR": lambda *args: any(_logical(args)),
+    "NOT": lambda value: not to_bool(value),
+    "ROUND": lambda value, digits=0: _round(value, digits, ROUND_HALF_UP),
+    "ROUNDUP": lambda value, digits=0: _round(value, digits, ROUND_UP),
+    "ROUNDDOWN": lambda value, digits=0: _round(value, digits, ROUND_DOWN),
+    "ABS": lambda value: abs(to_number(value)),
+    "INT": lambda value: math.floor(to_number(value)),
+    "MOD": _mod,
+    "SQRT": _sqrt,
+    "VLOOKUP": _vlookup,
+    "HLOOKUP": _hlookup,
+    "MATCH": _match,
+    "INDEX": _index,
+    "CONCATENATE": lambda *args: "".join(to_text(arg) for arg in args),
+    "CONCAT": lambda *args: "".join(to_text(value) for value in _flat(args)),
+    "LEN": lambda text: len(to_text(text)),
+    "UPPER": lambda text: to_text(text).upper(),
+    "LOWER": lambda text: to_text(text).lower(),
+    "TRIM": lambda text: " ".join(to_text(text).split()),
+    "LEFT": lambda text, count=1: to_text(text)[:int(to_number(count))],
+    "RIGHT": lambda text, count=1: to_text(text)[-int(to_number(count)):] if int(to_number(count)) else "",
+    "MID": _mid,
+    "VALUE": to_number,
+    "ISBLANK": lambda value: value is None,
+    "ISNUMBER": lambda value: _is_number(value),
+    "ISTEXT": lambda value: isinstance(value, str),
+    "ISERROR": lambda value: isinstance(value, ExcelError),
+    "ISNA": lambda value: value == ExcelError("#N/A"),
+}
+
+_UNKNOWN_NAME = ExcelError("#NAME?")
+
+# Functions that receive error values instead of propagating them
+_ERROR_AWARE = {"IFERROR", "ISERROR", "ISNA", "IF"}
+
+
+# --------------------------------------------------------------------------- engine
+
+class FormulaEngine:
+    """
+    Evaluate the formulas of an openpyxl workbook. Formula cells and the cells/ranges they
+    reference form a dependency graph: a change invalidates only the formulas downstream of
+    it, which are recomputed on the next read or recalculate().
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formulas = {}           # (sheet, row, col) -> AST
+        self._values = {}             # (sheet, row, col) -> computed value
+        self._precedents = {}         # (sheet, row, col) -> [(sheet, bounds)]
+        self._cell_dependents = {}    # (sheet, row, col) -> set of formula keys
+        self._range_dependents = {}   # sheet -> {formula key: [bounds]}
+        self._computing = set()
+        self._stale_sheets = set(workbook.sheetnames)
+        # Sheets with values computed since changed_sheets was last cleared (their cached values must be saved)
+        self.changed_sheets = set()
+
+    # -- graph maintenance
+
+    def _register(self, key, formula):
+        try:
+            tree = parse_formula(formula)
+        except ExcelError as error:
+            tree = ("value", error)
+        except RecursionError:
+            tree = ("value", ExcelError("#NUM!"))
+        self._formulas[key] = tree
+        precedents = []
+        for sheet, bounds in formula_references(tree):
+            sheet = sheet or key[0]
+            precedents.append((sheet, bounds))
+            min_row, min_col, max_row, max_col = bounds
+            if min_row is not None and min_row == max_row and min_col is not None and min_col == max_col:
+                self._cell_dependents.setdefault((sheet, min_row, min_col), set()).add(key)
+            else:
+                self._range_dependents.setdefault(sheet, {}).setdefault(key, []).append(bounds)
+        self._precedents[key] = precedents
+
+    def _unregister(self, key):
+        self._formulas.pop(key, None)
+        self._values.pop(key, None)
+        for sheet, bounds in self._precedents.pop(key, ()):
+            min_row, min_col, max_row, max_col = bounds
+            dependents = self._cell_dependents.get((sheet, min_row, min_col))
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._cell_dependents[(sheet, min_row, min_col)]
+            ranges = self._range_dependents.get(sheet)
+            if ranges is not None:
+                ranges.pop(key, None)
+
+    def _scan(self, sheet):
+        """(Re)register every formula of a sheet"""
+        for key in [key for key in self._formulas if key[0] == sheet]:
+            self._unregister(key)
+        if sheet not in self.workbook.sheetnames:
+            return
+        for (row, col), cell in self.workbook[sheet]._cells.items():
+            if cell.data_type == "f" and isinstance(cell._value, str):
+                self._register((sheet, row, col), cell._value)
+
+    def _refresh(self):
+        if self._stale_sheets:
+            for sheet in self._stale_sheets:
+                self._scan(sheet)
+            for sheet in set(key[0] for key in self._formulas) - set(self.workbook.sheetnames):
+                self._scan(sheet)
+            self._stale_sheets.clear()
+            # Cross-sheet dependents of the rescanned sheets are unknown: recompute everything
+            self._values.clear()
+
+    def _invalidate(self, keys):
+        """Drop the computed values downstream of the changed cells keys"""
+        pending = list(keys)
+        while pending:
+            sheet, row, col = key = pending.pop()
+            dependents = set(self._cell_dependents.get(key, ()))
+            for dependent, ranges in self._range_dependents.get(sheet, {}).items():
+                for min_row, min_col, max_row, max_col in ranges:
+                    if ((min_row is None or min_row <= row <= max_row)
+                            and (min_col is None or min_col <= col <= max_col)):
+                        dependents.add(dependent)
+                        break
+            for dependent in dependents:
+                if dependent in self._values:
+                    del self._values[dependent]
+                    pending.append(dependent)
+
+    def sheet_changed(self, sheet):
+        """The cells of sheet were edited in an unknown way: rescan it before the next evaluation"""
+        self._stale_sheets.add(sheet)
+
+    def cell_changed(self, sheet, row, col):
+        """A value or formula was written to a cell"""
+        if sheet in self._stale_sheets:
+            return
+        self.range_changed(sheet, row, col, row, col)
+
+    def range_changed(self, sheet, min_row, min_col, max_row, max_col):
+        """Values or formulas were written to a block of cells"""
+        if sheet in self._stale_sheets:
+            return
+        cells = self.workbook[sheet]._cells
+        changed = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                key = (sheet, row, col)
+                if key in self._formulas:
+                    self._unregister(key)
+                cell = cells.get((row, col))
+                if cell is not None and cell.data_type == "f" and isinstance(cell._value, str):
+                    self._register(key, cell._value)
+                changed.append(key)
+        # Dependents are found through the rows and columns a range formula covers,
+        # so one pass over the range formulas of the sheet serves the whole block
+        block_dependents = set()
+        for dependent, ranges in self._range_dependents.get(sheet, {}).items():
+            for low_row, low_col, high_row, high_col in ranges:
+                if ((low_row is None or (low_row <= max_row and min_row <= high_row))
+                        and (low_col is None or (low_col <= max_col and min_col <= high_col))):
+                    block_dependents.add(dependent)
+                    break
+        for key in changed:
+            self._values.pop(key, None)
+            for dependent in self._cell_dependents.get(key, ()):
+                block_dependents.add(dependent)
+        for dependent in block_dependents:
+            if dependent in self._values:
+                del self._values[dependent]
+        self._invalidate(block_dependents)
+
+    # -- evaluation
+
+    def cell_value(self, sheet, row, col):
+        """Value of a cell: computed for formulas, stored otherwise"""
+        key = (sheet, row, col)
+        if key in self._formulas:
+            if key in self._values:
+                return self._values[key]
+            return self._compute(key)
+        if sheet not in self.workbook.sheetnames:
+            raise ExcelError("#REF!")
+        cell = self.workbook[sheet]._cells.get((row, col))
+        if cell is None or cell.data_type == "f":
+            return None
+        if cell.data_type == "e":
+            return ExcelError(cell._value)
+        return cell._value
+
+    def _compute(self, key):
+        if key in self._computing:
+            # Circular reference: an error for every formula of the cycle and downstream of it
+            raise CircularReferenceError()
+        self._computing.add(key)
+        try:
+            value = self._evaluate(self._formulas[key], key[0])
+            if isinstance(value, _Range):
+                value = _check(value)
+            if value is None:
+                value = 0
+        except ExcelError as error:
+            # Stored values are raised again by the formulas that use them: drop the engine frames
+            error.__context__ = None
+            value = error.with_traceback(None)
+        finally:
+            self._computing.discard(key)
+        self._values[key] = value
+        self.changed_sheets.add(key[0])
+        return value
+
+    def _evaluate(self, node, sheet):
+        kind = node[0]
+        if kind == "value":
+            if isinstance(node[1], ExcelError):
+                raise node[1]
+            return node[1]
+        if kind == "ref":
+            target = node[1] or sheet
+            if target not in self.workbook.sheetnames:
+                raise ExcelError("#REF!")
+            min_row, min_col, max_row, max_col = node[2]
+            if min_row is not None and min_row == max_row and min_col is not None and min_col == max_col:
+                return self.cell_value(target, min_row, min_col)
+            worksheet = self.workbook[target]
+            return _Range(self, target, min_row or 1, min_col or 1,
+                          max_row or worksheet.max_row, max_col or worksheet.max_column)
+        if kind == "op":
+            operator = node[1]
+            left, right = self._evaluate(node[2], sheet), self._evaluate(node[3], sheet)
+            if operator in _COMPARISON:
+                return _compare(operator, left, right)
+            if operator == "&":
+                return to_text(left) + to_text(right)
+            return _arithmetic(operator, left, right)
+        if kind == "neg":
+            return _result(-to_number(self._evaluate(node[1], sheet)))
+        name, args = node[1], node[2]
+        function = FUNCTIONS.get(name)
+        if function is None:
+            raise ExcelError("#NAME?")
+        values = []
+        for arg in args:
+            try:
+                values.append(self._evaluate(arg, sheet))
+            except ExcelError as error:
+                if name not in _ERROR_AWARE:
+                    raise
+                values.append(error)
+        try:
+            return function(*values)
+        except TypeError:
+            # Wrong number of arguments
+            raise ExcelError("#VALUE!")
+
+    def value(self, sheet, row, col):
+        """Computed value of a cell, bringing its precedents up to date first"""
+        self._refresh()
+        try:
+            return self.cell_value(sheet, row, col)
+        except RecursionError:
+            # A long chain of formulas: compute it bottom-up instead of recursively
+            self._computing.clear()
+            self.recalculate()
+            return self.cell_value(sheet, row, col)
+
+    def recalculate(self, sheet=None):
+        """Compute every formula without an up-to-date value, returns how many were computed"""
+        self._refresh()
+        stale = sorted(key for key in self._formulas if key not in self._values and (sheet is None or key[0] == sheet))
+        for key in stale:
+            if key not in self._values:
+                try:
+                    self._compute(key)
+                except RecursionError:
+                    self._computing.clear()
+                    # Precedents deeper than the recursion limit: resolve them in row order first
+                    for precedent in stale:
+                        if precedent not in self._values and precedent[0] == key[0] and precedent[1] < key[1]:
+                            self._compute(precedent)
+                    self._compute(key)
+        return len(stale)
+
+    def cached_values(self):
+        """
+        {sheet: {(row, col): computed value}} of the formulas computed so far, to be stored in
+        the file. #NAME? results (functions the engine does not know) and circular references
+        are left for Excel to compute.
+        """
+        values = {}
+        for (sheet, row, col), value in self._values.items():
+            if value != _UNKNOWN_NAME and not isinstance(value, CircularReferenceError):
+                values.setdefault(sheet, {})[(row, col)] = value
+        return values
@@ -0,0 +1,138 @@
+import hashlib
+import os
+from io import BytesIO
+
+from openpyxl.drawing.image import Image
+
+try:
+    from PIL import Image as PILImage
+except ImportError:  # Pillow is optional, openpyxl needs it to embed images
+    PILImage = None
+
+# Formats stored as they are; anything else is converted to PNG, as openpyxl does
+_NATIVE_FORMATS = ("png", "jpeg", "gif")
+
+
+class ImageEntry:
+    """Encoded bytes of an image with their format, pixel size and content hash"""
+    __slots__ = ("digest", "data", "format", "width", "height")
+
+    def __init__(self, data, image_format, width, height):
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.data = data
+        self.format = image_format
+        self.width = width
+        self.height = height
+
+
+class SharedImage(Image):
+    """
+    openpyxl Image over an ImageEntry: its media part is named after the content hash, so
+    every placement of the same bytes references one part (write_workbook keeps one copy)
+    """
+
+    def __init__(self, entry):
+        # No Pillow call: size and format come from the entry
+        self.ref = None
+        self.entry = entry
+        self.width, self.height = entry.width, entry.height
+        self.format = entry.format
+
+    def _data(self):
+        return self.entry.data
+
+    @property
+    def path(self):
+        return f"/xl/media/image_{self.entry.digest[:16]}.{self.format}"
+
+
+class ImageCache:
+    """
+    Images inserted by a workbook: each file is read and decoded once while unchanged, and
+    each (content, downscale size, quality) variant is encoded once
+    """
+
+    def __init__(self):
+        self.files = {}     # (real path, size, mtime) -> ImageEntry of the file
+        self.entries = {}   # content hash -> ImageEntry, one per distinct content
+        self.variants = {}  # (content hash, size, quality) -> ImageEntry
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path):
+        """ImageEntry of the image file at path"""
+        stat = os.stat(path)
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        entry = self.files.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        with open(path, "rb") as stream:
+            data = stream.read()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self.entries.get(digest)
+        if entry is None:
+            entry = self.__decode(data)
+            # Converted images are also found under the hash of their source file
+            self.entries[digest] = self.entries[entry.digest] = entry
+        self.files[key] = entry
+        return entry
+
+    def __decode(self, data):
+        with PILImage.open(BytesIO(data)) as image:
+            image_format = (image.format or "png").lower()
+            width, height = image.size
+            if image_format not in _NATIVE_FORMATS:
+                stream = BytesIO()
+                image.save(stream, format="png")
+                data, image_format = stream.getvalue(), "png"
+        return ImageEntry(data, image_format, width, height)
+
+    def variant(self, entry, size=None, quality=None):
+        """
+        entry downscaled to fit size (width, height) in pixels, keeping its aspect ratio, and/or
+        re-encoded (JPEG at quality, PNG optimized). The original is returned when it is
+        already that small and re-encoding would not make it smaller
+        """
+        if size is not None and size[0] >= entry.width and size[1] >= entry.height:
+            size = None
+        if size is None and quality is None:
+            return entry
+        key = (entry.digest, size, quality)
+        variant = self.variants.get(key)
+        if variant is not None:
+            self.hits += 1
+            return variant
+        self.misses += 1
+        with PILImage.open(BytesIO(entry.data)) as image:
+            if size is not None:
+                image.thumbnail(size, PILImage.LANCZOS)
+            stream = BytesIO()
+            if entry.format == "jpeg":
+                image.save(stream, format="jpeg", quality=quality or 90, optimize=True)
+            else:
+                image.save(stream, format="png", optimize=True)
+            width, height = image.size
+        data = stream.getvalue()
+        if size is None and len(data) >= len(entry.data):
+            variant = entry
+        else:
+            variant = ImageEntry(data, "jpeg" if entry.format == "jpeg" else "png", width, height)
+            variant = self.entries.setdefault(variant.digest, variant)
+        self.variants[key] = variant
+        return variant
+
+    def get_info(self):
+        """Hit/miss statistics and the bytes of the distinct images held"""
+        distinct = {id(entry): entry for entry in self.entries.values()}
+        return {"hits": self.hits, "misses": self.misses, "images": len(distinct),
+                "bytes": sum(len(entry.data) for entry in distinct.values())}
+
+    def clear(self):
+        """Drop every cached image and reset the statistics"""
+        self.files.clear()
+        self.entries.clear()
+        self.variants.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,119 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time
+
+
+def sort_key(value):
+    """
+    Total order over cell values for range queries: numbers, then text, then dates, then
+    booleans and times (Python refuses to compare across these types)
+    """
+    if isinstance(value, bool):
+        return (3, value)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    if isinstance(value, datetime):
+        return (2, value.replace(tzinfo=None))
+    if isinstance(value, date):
+        return (2, datetime.combine(value, time()))
+    if isinstance(value, time):
+        return (4, value.replace(tzinfo=None))
+    return (5, str(value))
+
+
+def _key_order(key):
+    """sort_key of an index key (booleans are keyed as 1-tuples, see ColumnIndex.key)"""
+    return sort_key(key[0] if key.__class__ is tuple else key)
+
+
+class ColumnIndex:
+    """
+    Index of the values of one column from first_row down: a hash map value -> rows for
+    equality lookups, and a sorted view (built on the first range query) for ranges.
+    update() keeps both in step with cell writes.
+    """
+    __slots__ = ("column", "first_row", "ignore_case", "values", "rows", "_sorted")
+
+    def __init__(self, column, first_row, cells=(), ignore_case=False):
+        self.column = column
+        self.first_row = first_row
+        self.ignore_case = ignore_case
+        self.values = {}     # row -> key
+        self.rows = {}       # key -> ascending list of rows
+        self._sorted = None  # ascending list of (sort_key(key), row), None until needed
+        for row, value in cells:
+            self.update(row, value)
+
+    def key(self, value):
+        """
+        Key a value is indexed under: text is case-folded with ignore_case, booleans are told
+        apart from 1 and 0, which Python holds equal (as row_signature does for diffs)
+        """
+        if value.__class__ is bool:
+            return (value,)
+        if self.ignore_case and isinstance(value, str):
+            return value.casefold()
+        return value
+
+    def update(self, row, value):
+        """Record that the cell of row now holds value (None clears it)"""
+        if row < self.first_row:
+            return
+        key = self.key(value)
+        old = self.values.get(row)
+        if old is not None:
+            if old == key and type(old) is type(key):
+                return
+            rows = self.rows[old]
+            rows.remove(row)
+            if not rows:
+                del self.rows[old]
+            del self.values[row]
+            if self._sorted is not None:
+                position = bisect_left(self._sorted, (_key_order(old), row))
+                del self._sorted[position]
+        if key is None:
+            return
+        self.values[row] = key
+        rows = self.rows.get(key)
+        if rows is None:
+            self.rows[key] = [row]
+        elif row > rows[-1]:
+            rows.append(row)
+        else:
+            insort(rows, row)
+        if self._sorted is not None:
+            insort(self._sorted, (_key_order(key), row))
+
+    def find(self, value):
+        """Rows holding value, in ascending order"""
+        try:
+            return list(self.rows.get(self.key(value), ()))
+        except TypeError:
+            # Unhashable lookups match nothing
+            return []
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        """
+        Rows whose value lies between low and high (None: unbounded), ordered by value.
+        Only values of the same kind as the bounds (numbers, text, dates...) are returned.
+        """
+        if self._sorted is None:
+            self._sorted = sorted((_key_order(key), row) for row, key in self.values.items())
+        entries = self._sorted
+        bound = low if low is not None else high
+        if bound is None:
+            return [row for _, row in entries]
+        rank = _key_order(self.key(bound))[0]
+        if low is None:
+            start = bisect_left(entries, ((rank,),))
+        else:
+            low = _key_order(self.key(low))
+            start = bisect_left(entries, (low,)) if include_low else bisect_right(entries, (low, float("inf")))
+        if high is None:
+            end = bisect_left(entries, ((rank + 1,),))
+        else:
+            high = _key_order(self.key(high))
+            end = bisect_right(entries, (high, float("inf"))) if include_high else bisect_left(entries, (high,))
+        return [row for _, row in entries[start:end]]
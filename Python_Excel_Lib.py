@@ -1,380 +1,2114 @@
 import os
+import re
+import csv
+import io
+import math
+import asyncio
+import tempfile
+import functools
+import itertools
 import openpyxl
+import Python_Excel_Diff
+import Python_Excel_Package
+from Python_Excel_Errors import (logger, report_error, report_exception, InvalidReferenceError, MissingDependencyError,
+                                 OperationError, SheetExistsError, SheetNotFoundError, UnsupportedOperationError)
+from Python_Excel_Aggregate import FUNCTIONS, ColumnValues, aggregate, group_aggregate
+from Python_Excel_Compact import CompactSheet, style_cells
+from Python_Excel_Formula import FormulaEngine
+from Python_Excel_Image import ImageCache, SharedImage, PILImage
+from Python_Excel_Index import ColumnIndex
+from Python_Excel_Reference import MAX_ROW, cell_coordinates, column_index, column_letter, parse_range
+from Python_Excel_Style import Excel_Style
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Protection, Font, NamedStyle
-from openpyxl.utils import get_column_letter
-from openpyxl.drawing.image import Image
-import re
+from openpyxl.cell import Cell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE, TIME_FORMATS
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timezone
 from uuid import uuid4
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only the array APIs need it
+    np = None
+
+
+def _column_to_array(values):
+    """
+    Convert a column of cell values to a typed NumPy array:
+    int64/float64 for numbers (float64 + NaN when None is present), bool,
+    datetime64[us] (NaT for None) for dates, object for strings and mixed columns.
+    """
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    has_none = len(present) != len(values)
+    if not kinds:
+        return np.full(len(values), np.nan)
+    if kinds == {bool}:
+        return np.array(values, dtype=bool if not has_none else object)
+    if kinds <= {int, float}:
+        if kinds == {int} and not has_none:
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if kinds <= {datetime, date}:
+        return np.array([np.datetime64("NaT") if value is None else value for value in values], dtype="datetime64[us]")
+    return np.array(values, dtype=object)
+
+
+def _array_to_values(column):
+    """Convert a NumPy/array-like column to native Python cell values (NaN/NaT become None)"""
+    if np is not None and isinstance(column, np.ndarray):
+        if column.dtype.kind == "M":
+            # tolist() of nanosecond datetimes returns ints, microseconds give datetime objects
+            return column.astype("datetime64[us]").tolist()
+        column = column.tolist()
+    return [None if isinstance(value, float) and value != value else value for value in column]
+
+
+_INT_RE = re.compile(r"[+-]?(?:0|[1-9][0-9]{0,14})$")
+_FLOAT_RE = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?$")
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[T ][0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]+)?)?)?$")
+_BOOLEANS = {"TRUE": True, "FALSE": False, "true": True, "false": False}
+
+
+def _infer_value(text, date_formats=()):
+    """
+    Typed value of a CSV field: None for '', int, float, bool (TRUE/FALSE), date/datetime
+    (ISO 8601 or one of date_formats), text otherwise. Integers with leading zeros or more
+    than 15 digits (codes, IDs) stay text, as Excel would lose them.
+    """
+    if not text:
+        return None
+    first = text[0]
+    if first.isdigit() or first in "+-.":
+        if _INT_RE.match(text):
+            return int(text)
+        if text.lstrip("+-").isdigit():
+            return text
+        if _FLOAT_RE.match(text):
+            return float(text)
+        if _ISO_DATE_RE.match(text):
+            try:
+                return date.fromisoformat(text) if len(text) == 10 else datetime.fromisoformat(text)
+            except ValueError:
+                return text
+    elif text in _BOOLEANS:
+        return _BOOLEANS[text]
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            pass
+    return text
+
+
+def _native_value(value):
+    """Make a value read from Parquet storable in a cell (Excel has no time zones)"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, time) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    if isinstance(value, (list, dict, bytes)):
+        return str(value)
+    return value
+
+
+def _csv_value(value, date_format):
+    """Text of a cell value in an exported CSV"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.strftime(date_format) if date_format else value.isoformat()
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return value
+
+
+def _new_cell(sheet, row, column, value):
+    """
+    Cell holding value. Plain numbers and text (not formulas or error codes) skip openpyxl's
+    type dispatch, the bulk of the cost of writing a cell; anything else goes through it
+    """
+    kind = value.__class__
+    if kind is int or kind is float:
+        cell = Cell(sheet, row=row, column=column)
+        cell._value = value
+        return cell
+    if (kind is str and value[:1] not in ("=", "#") and len(value) <= 32767
+            and ILLEGAL_CHARACTERS_RE.search(value) is None):
+        cell = Cell(sheet, row=row, column=column)
+        cell._value = value
+        cell.data_type = "s"
+        return cell
+    return Cell(sheet, row=row, column=column, value=value)
+
+
+class _UsedRange:
+    """
+    Index of the cells holding data in a sheet, maintained by the write_* methods so the
+    last row/column are known without scanning (or materializing) cells
+    """
+    __slots__ = ("rows", "col_counts", "_last_row", "_last_col")
+
+    def __init__(self, coordinates=()):
+        self.rows = {}        # row -> set of columns holding data
+        self.col_counts = {}  # column -> number of rows holding data
+        self._last_row = 0    # None: the maximum was removed, recomputed on demand
+        self._last_col = 0
+        for row, col in coordinates:
+            self.update(row, col, True)
+
+    def update(self, row, col, value):
+        """Record that (row, col) now holds value (None clears the cell)"""
+        cols = self.rows.get(row)
+        if value is not None:
+            if cols is None:
+                cols = self.rows[row] = set()
+            elif col in cols:
+                return
+            cols.add(col)
+            self.col_counts[col] = self.col_counts.get(col, 0) + 1
+            if self._last_row is not None and row > self._last_row:
+                self._last_row = row
+            if self._last_col is not None and col > self._last_col:
+                self._last_col = col
+        elif cols and col in cols:
+            cols.discard(col)
+            if not cols:
+                del self.rows[row]
+                if row == self._last_row:
+                    self._last_row = None
+            self.col_counts[col] -= 1
+            if not self.col_counts[col]:
+                del self.col_counts[col]
+                if col == self._last_col:
+                    self._last_col = None
+
+    def update_row(self, row, start_col, values):
+        """Record a row of values written from start_col, as update() would cell by cell"""
+        if row in self.rows:
+            for col, value in enumerate(values, start=start_col):
+                self.update(row, col, value)
+            return
+        # A row without data yet: nothing to clear, every value is new
+        cols = {col for col, value in enumerate(values, start=start_col) if value is not None}
+        if not cols:
+            return
+        self.rows[row] = cols
+        counts = self.col_counts
+        for col in cols:
+            counts[col] = counts.get(col, 0) + 1
+        if self._last_row is not None and row > self._last_row:
+            self._last_row = row
+        last_col = max(cols)
+        if self._last_col is not None and last_col > self._last_col:
+            self._last_col = last_col
+
+    @property
+    def last_row(self):
+        if self._last_row is None:
+            self._last_row = max(self.rows, default=0)
+        return self._last_row
+
+    @property
+    def last_col(self):
+        if self._last_col is None:
+            self._last_col = max(self.col_counts, default=0)
+        return self._last_col
+
+    def last_data_cell(self):
+        """Return (last row, last column of that row, no data right of that column)"""
+        last_row = self.last_row
+        if not last_row:
+            return (0, 0, True)
+        last_col = max(self.rows[last_row])
+        return (last_row, last_col, last_col == self.last_col)
+
+
 class Excel_WorkBook:
-    def __init__(self, str_path_file_excel, str_name_sheet="Sheet"):
+    # Executor shared by the async API (aopen, asave, aread_range), created on first use
+    async_max_workers = 4
+    _async_executor = None
+
+    def __init__(self, str_path_file_excel, str_name_sheet="Sheet", mode="normal", strict=False, compact=False):
         """
         Initialize Excel workbook with enhanced error handling
+
+        mode="normal" loads/creates a full in-memory workbook.
+        mode="stream" creates a write-only workbook: rows are appended straight to the
+        sheet XML as they are written, so memory stays flat regardless of row count.
+        mode="read" opens an existing file read-only: rows are parsed lazily by iter_rows
+        and read_range, so huge files are processed in constant memory.
+
+        compact=True (normal mode) keeps the values of the sheets created by this workbook in
+        typed column arrays instead of openpyxl cells, a fraction of the memory; cells are
+        created only for operations that need them (get_sheet, merge_cells, formulas...).
+
+        Messages go to the "Python_Excel" logger (silent unless logging is configured).
+        strict=True makes methods raise Python_Excel_Errors exceptions instead of
+        returning False/None.
         """
         self.str_path_file_excel = str_path_file_excel
+        self.mode = mode
+        self.strict = strict
+        # Per-sheet state of stream mode (pending row, last streamed row, style ranges)
+        self._stream_state = {}
+        # Write-only workbooks are consumed by their single save
+        self._stream_saved = False
+        # Per-sheet _UsedRange, built on first use and kept up to date by the write_* methods
+        self._used_ranges = {}
+        # Serializes async operations on this workbook (openpyxl objects are not thread-safe)
+        self._async_lock = None
+        # Changes since the file was loaded or last saved: sheets whose part must be rewritten,
+        # and workbook-level changes (new sheets, active sheet...) that need a full save
+        self._dirty_sheets = set()
+        self._structure_changed = False
+        # Set once the openpyxl workbook is handed out: it may be edited behind our back
+        self._workbook_shared = False
+        self._shared_sheets = set()
+        self._source_signature = None
+        # Formula evaluation, created on first use (read_cell(evaluate=True), calculate)
+        self._formula_engine = None
+        # Parses the worksheets of a loaded file on first access (normal mode only)
+        self._sheet_loader = None
+        # Per-sheet {column: ColumnIndex} built by create_index/find_rows, updated by the write_* methods
+        self._indexes = {}
+        # CompactSheet of the sheets whose values are not held in openpyxl cells (compact=True)
+        self.compact = compact and mode == "normal"
+        self._compact = {}
+        # Images read by insert_image, by file and by content
+        self._image_cache = ImageCache()
         try:
-            if os.path.exists(str_path_file_excel):
-                self.workbook = openpyxl.load_workbook(str_path_file_excel)
+            if mode not in ("normal", "stream", "read"):
+                raise ValueError(f"Unsupported mode '{mode}', expected 'normal', 'stream' or 'read'.")
+            if mode == "read":
+                if not os.path.exists(str_path_file_excel):
+                    raise FileNotFoundError(f"Excel file '{str_path_file_excel}' does not exist.")
+                self._workbook = openpyxl.load_workbook(str_path_file_excel, read_only=True)
+                if not self.__check_name_sheet__(str_name_sheet):
+                    report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."))
+                logger.info("Excel file opened in read mode.")
+            elif mode == "stream":
+                # A write-only workbook cannot be loaded, the file is always (re)generated
+                self._workbook = openpyxl.Workbook(write_only=True)
+                self._workbook.create_sheet(title=str_name_sheet)
+                logger.info("Created new streaming Excel file with sheet '%s'.", str_name_sheet)
+            elif os.path.exists(str_path_file_excel):
+                self._source_signature = Python_Excel_Package.file_signature(str_path_file_excel)
+                # Sheets are parsed on first access, untouched ones are copied as they are on save
+                self._workbook, self._sheet_loader = Python_Excel_Package.load_workbook_lazy(str_path_file_excel)
                 if self.__check_name_sheet__(str_name_sheet):
-                    print(f"Sheet '{str_name_sheet}' already exists.")
+                    logger.info("Sheet '%s' already exists.", str_name_sheet)
                 else:
-                    self.workbook.create_sheet(title=str_name_sheet)
-                    print(f"Created new sheet '{str_name_sheet}'.")
-                print("Excel file opened successfully.")
+                    self._workbook.create_sheet(title=str_name_sheet)
+                    self.__new_sheet_storage(str_name_sheet)
+                    self._structure_changed = True
+                    logger.info("Created new sheet '%s'.", str_name_sheet)
+                logger.info("Excel file opened successfully.")
             else:
-                self.workbook = openpyxl.Workbook()
+                self._workbook = openpyxl.Workbook()
                 # Remove default sheet and create new one with specified name
-                default_sheet = self.workbook.active
-                self.workbook.remove(default_sheet)
-                self.workbook.create_sheet(title=str_name_sheet)
-                print(f"Created new Excel file with sheet '{str_name_sheet}'.")
+                default_sheet = self._workbook.active
+                self._workbook.remove(default_sheet)
+                self._workbook.create_sheet(title=str_name_sheet)
+                self.__new_sheet_storage(str_name_sheet)
+                self._structure_changed = True
+                logger.info("Created new Excel file with sheet '%s'.", str_name_sheet)
             self.active_sheet = str_name_sheet
         except Exception as e:
-            print(f"Error initializing workbook: {str(e)}")
+            logger.error("Error initializing workbook: %s", e)
             raise
 
+    @property
+    def workbook(self):
+        """The openpyxl workbook; changes made through it are always saved with a full save"""
+        self.__load_sheets()
+        self._workbook_shared = True
+        # The caller may edit any cell: rebuild the used-range indexes on next use, as get_sheet does
+        self._used_ranges.clear()
+        for str_name_sheet in self._workbook.sheetnames:
+            self.__cells_changed(str_name_sheet)
+        return self._workbook
+
     def __check_name_sheet__(self, str_name_sheet):
         """Check if sheet name exists"""
-        return str_name_sheet in self.workbook.sheetnames
+        return str_name_sheet in self._workbook.sheetnames
+
+    def __worksheet(self, str_name_sheet):
+        """Return a worksheet, parsing it first if it was not accessed yet; its cells may be compact"""
+        if self._sheet_loader is not None and str_name_sheet in self._sheet_loader.pending:
+            self._sheet_loader.load(str_name_sheet)
+        return self._workbook[str_name_sheet]
+
+    def __sheet(self, str_name_sheet):
+        """Return a worksheet with its cells, creating the openpyxl cells of a compact sheet"""
+        sheet = self.__worksheet(str_name_sheet)
+        if str_name_sheet in self._compact:
+            self.__materialize(str_name_sheet)
+        return sheet
+
+    def __load_sheets(self, materialize=True):
+        """
+        Parse every worksheet not accessed yet (full saves, formulas, shared workbook) and,
+        with materialize, create the cells of the compact sheets
+        """
+        if self._sheet_loader is not None:
+            self._sheet_loader.load_all()
+        if materialize:
+            for str_name_sheet in list(self._compact):
+                self.__materialize(str_name_sheet)
+
+    def __new_sheet_storage(self, str_name_sheet):
+        """Keep the values of a new sheet in a CompactSheet when the workbook is compact"""
+        # The formula engine reads cells directly, new sheets get cells once it exists
+        if self.compact and self._formula_engine is None:
+            self._compact[str_name_sheet] = CompactSheet()
+
+    def __materialize(self, str_name_sheet):
+        """Turn a compact sheet into openpyxl cells, for operations that work on cells"""
+        store = self._compact.pop(str_name_sheet)
+        sheet = self._workbook[str_name_sheet]
+        store.materialize(sheet)
+        sheet._current_row = max(sheet._current_row, store.last_row)
+        logger.info("Created the cells of compact sheet '%s'.", str_name_sheet)
+
+    def __value_getter(self, str_name_sheet):
+        """Return a function (row, col) -> value of a sheet that creates no cells"""
+        store = self._compact.get(str_name_sheet)
+        if store is not None:
+            return store.get
+        get_cell = self.__worksheet(str_name_sheet)._cells.get
+
+        def get_value(row, col):
+            cell = get_cell((row, col))
+            return cell.value if cell is not None else None
+        return get_value
 
     def __validate_cell_reference(self, cell_ref):
-        """Validate cell reference format (e.g., A1, B2)"""
-        pattern = r'^[A-Z]+[1-9][0-9]*$'
-        return bool(re.match(pattern, cell_ref.upper()))
+        """Validate cell reference format (e.g., A1, B2, R2C1)"""
+        return cell_coordinates(cell_ref) is not None
+
+    def __parse_range(self, str_name_sheet, cell_range):
+        """parse_range() of a range of str_name_sheet: a sheet qualifier must name that sheet"""
+        try:
+            parsed = parse_range(cell_range)
+        except ValueError as e:
+            raise InvalidReferenceError(str(e)) from e
+        if parsed[0] is not None and parsed[0] != str_name_sheet:
+            raise InvalidReferenceError(f"Range '{cell_range}' refers to sheet '{parsed[0]}', not '{str_name_sheet}'.")
+        return parsed
+
+    def __local_range(self, str_name_sheet, cell_range):
+        """cell_range without its sheet qualifier, which must name str_name_sheet"""
+        if self.__parse_range(str_name_sheet, cell_range)[0] is None:
+            return cell_range
+        return cell_range.rsplit("!", 1)[1]
+
+    def __range_bounds(self, sheet, cell_range):
+        """(min_row, min_col, max_row, max_col) of a range, whole columns/rows clamped to the sheet"""
+        _, min_row, min_col, max_row, max_col = self.__parse_range(sheet.title, cell_range)
+        if sheet.title in self._compact:
+            # The worksheet of a compact sheet holds no cells, its size is in the used range
+            used = self.__used_range(sheet.title)
+            last_row, last_col = max(used.last_row, 1), max(used.last_col, 1)
+        else:
+            last_row, last_col = sheet.max_row, sheet.max_column
+        if min_row is None:
+            min_row, max_row = 1, last_row
+        if min_col is None:
+            min_col, max_col = 1, last_col
+        return (min_row, min_col, max_row, max_col)
+
+    def __check_writable(self):
+        """Check that the workbook can be modified (not opened in read mode)"""
+        if self.mode == "read":
+            return report_error(self.strict, UnsupportedOperationError("Workbook is opened in read mode."), False)
+        if self._stream_saved:
+            return report_error(self.strict, UnsupportedOperationError(
+                "Stream workbook was already saved, write-only workbooks can be saved only once."), False)
+        return True
+
+    def __style_ids(self, pattern_fill=None, font=None, border=None, alignment=None, number_format=None):
+        """
+        Register style objects in the workbook style tables once and return
+        [(StyleArray index, style id)] to copy into every formatted cell
+        """
+        ids = []
+        if font:
+            ids.append((0, self._workbook._fonts.add(font)))
+        if pattern_fill:
+            ids.append((1, self._workbook._fills.add(pattern_fill)))
+        if border:
+            ids.append((2, self._workbook._borders.add(border)))
+        if number_format:
+            if number_format in BUILTIN_FORMATS_REVERSE:
+                ids.append((3, BUILTIN_FORMATS_REVERSE[number_format]))
+            else:
+                ids.append((3, self._workbook._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE))
+        if alignment:
+            ids.append((5, self._workbook._alignments.add(alignment)))
+        return ids
+
+    def __style_dimension(self, dimension, style):
+        """Apply format_cells keywords to a column or row dimension"""
+        for name, attribute in (("pattern_fill", "fill"), ("font", "font"), ("border", "border"),
+                                ("alignment", "alignment"), ("number_format", "number_format")):
+            if style.get(name):
+                setattr(dimension, attribute, style[name])
+
+    def __mark_dirty(self, str_name_sheet=None):
+        """Record a change of a sheet, or of the workbook structure when no sheet is given"""
+        if str_name_sheet is None:
+            self._structure_changed = True
+        else:
+            self._dirty_sheets.add(str_name_sheet)
+
+    def mark_dirty(self, str_name_sheet=None):
+        """Tell save() that a sheet (or the whole workbook) was edited outside Excel_WorkBook"""
+        self.__mark_dirty(str_name_sheet)
+        for name in [str_name_sheet] if str_name_sheet else self._workbook.sheetnames:
+            self.__cells_changed(name)
+
+    def __formulas(self):
+        """Return the formula engine, creating it on first use (normal mode only)"""
+        if self._formula_engine is None:
+            if self.mode != "normal":
+                raise ValueError(f"Formulas cannot be evaluated in {self.mode} mode.")
+            # Formulas may refer to any sheet
+            self.__load_sheets()
+            self._formula_engine = FormulaEngine(self._workbook)
+        return self._formula_engine
+
+    def __cells_changed(self, str_name_sheet, min_row=None, min_col=None, max_row=None, max_col=None):
+        """
+        Invalidate the formulas depending on written cells and update the column indexes
+        covering them (the whole sheet without bounds: its indexes are dropped)
+        """
+        indexes = self._indexes.get(str_name_sheet)
+        if indexes:
+            if min_row is None:
+                del self._indexes[str_name_sheet]
+            else:
+                get_value = self.__value_getter(str_name_sheet)
+                for column, index in indexes.items():
+                    if min_col <= column <= max_col:
+                        for row in range(max(min_row, index.first_row), max_row + 1):
+                            index.update(row, get_value(row, column))
+        if self._formula_engine is None:
+            return
+        if min_row is None:
+            self._formula_engine.sheet_changed(str_name_sheet)
+        else:
+            self._formula_engine.range_changed(str_name_sheet, min_row, min_col, max_row, max_col)
+
+    def has_changes(self):
+        """Return True if the workbook changed since it was loaded or last saved"""
+        return bool(self._dirty_sheets or self._shared_sheets or self._structure_changed or self._workbook_shared)
+
+    def __used_range(self, str_name_sheet):
+        """Return the used-range index of a sheet, building it once from the sheet's cell dict"""
+        store = self._compact.get(str_name_sheet)
+        if store is not None:
+            return store
+        used = self._used_ranges.get(str_name_sheet)
+        if used is None:
+            cells = self.__worksheet(str_name_sheet)._cells
+            used = _UsedRange(coordinate for coordinate, cell in cells.items() if cell._value is not None)
+            self._used_ranges[str_name_sheet] = used
+        return used
+
+    def refresh_used_range(self, str_name_sheet):
+        """Drop the used-range index of a sheet after editing its cells outside Excel_WorkBook"""
+        self._used_ranges.pop(str_name_sheet, None)
+
+    def __stream_state(self, str_name_sheet):
+        """Return the stream state of a sheet, creating it on first use"""
+        state = self._stream_state.get(str_name_sheet)
+        if state is None:
+            # last_row: last row already sent to the sheet XML
+            # row/cells: the pending row, kept until a later row is written
+            # styles: (min_col, min_row, max_col, max_row, style ids) registered by format_cells
+            state = {"last_row": 0, "row": None, "cells": {}, "styles": []}
+            self._stream_state[str_name_sheet] = state
+        return state
+
+    def __stream_write(self, str_name_sheet, row, list_content, start_column=1):
+        """Buffer values of a row in stream mode, earlier rows are flushed to the sheet XML"""
+        state = self.__stream_state(str_name_sheet)
+        if row <= state["last_row"] or (state["row"] is not None and row < state["row"]):
+            return report_error(self.strict, UnsupportedOperationError(
+                f"Row {row} of sheet '{str_name_sheet}' has already been streamed, "
+                "rows must be written in ascending order."), False)
+        if state["row"] != row:
+            self.__stream_flush(str_name_sheet, row - 1)
+            state["row"] = row
+        cells = state["cells"]
+        for index, data in enumerate(list_content, start=start_column):
+            cells[index] = data
+        return True
+
+    def __stream_flush(self, str_name_sheet, up_to_row):
+        """Append the pending row and any gap rows up to up_to_row to the sheet XML"""
+        state = self.__stream_state(str_name_sheet)
+        sheet = self._workbook[str_name_sheet]
+        for row in range(state["last_row"] + 1, up_to_row + 1):
+            cells = state["cells"] if row == state["row"] else {}
+            sheet.append(self.__stream_row_values(sheet, state, row, cells))
+        if state["row"] is not None and state["row"] <= up_to_row:
+            state["row"] = None
+            state["cells"] = {}
+        state["last_row"] = max(state["last_row"], up_to_row)
+
+    def __stream_row_values(self, sheet, state, row, cells):
+        """Build the list appended for a streamed row, wrapping styled values in cells"""
+        styles = [style for style in state["styles"] if style[1] <= row <= style[3]]
+        width = max([max(cells, default=0)] + [style[2] for style in styles])
+        values = [None] * width
+        for col, data in cells.items():
+            values[col - 1] = data
+        for col in range(1, width + 1) if styles else ():
+            covering = [style[4] for style in styles if style[0] <= col <= style[2]]
+            if covering and not isinstance(values[col - 1], Cell):
+                style_array = StyleArray()
+                for ids in covering:
+                    for index, value in ids:
+                        style_array[index] = value
+                values[col - 1] = Cell(sheet, row=row, column=col, value=values[col - 1], style_array=style_array)
+        return values
+
+    def __stream_finish(self):
+        """Flush every streamed sheet, including styled rows that never received data"""
+        for str_name_sheet, state in self._stream_state.items():
+            last_row = max([state["row"] or 0] + [style[3] for style in state["styles"]])
+            self.__stream_flush(str_name_sheet, last_row)
 
     def create_sheet(self, str_name_sheet, overwrite=False):
         """Create new sheet with option to overwrite"""
         try:
-            if not overwrite and self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' already exists.")
+            if not self.__check_writable():
                 return False
+            if not overwrite and self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetExistsError(f"Sheet '{str_name_sheet}' already exists."), False)
             if overwrite and self.__check_name_sheet__(str_name_sheet):
-                self.workbook.remove(self.workbook[str_name_sheet])
-            self.workbook.create_sheet(title=str_name_sheet)
-            print(f"Created sheet '{str_name_sheet}'.")
+                self._workbook.remove(self._workbook[str_name_sheet])
+                if self._sheet_loader is not None:
+                    self._sheet_loader.discard(str_name_sheet)
+                self._stream_state.pop(str_name_sheet, None)
+                self._used_ranges.pop(str_name_sheet, None)
+                self._compact.pop(str_name_sheet, None)
+            self._workbook.create_sheet(title=str_name_sheet)
+            self.__new_sheet_storage(str_name_sheet)
+            self.__cells_changed(str_name_sheet)
+            self.__mark_dirty()
+            logger.info("Created sheet '%s'.", str_name_sheet)
             return True
         except Exception as e:
-            print(f"Error creating sheet: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error creating sheet", e, False)
 
     def set_active_sheet(self, str_name_sheet):
         """Set the active sheet"""
         if self.__check_name_sheet__(str_name_sheet):
             self.active_sheet = str_name_sheet
-            self.workbook.active = self.workbook[str_name_sheet]
+            self._workbook.active = self._workbook[str_name_sheet]
+            self.__mark_dirty()
             return True
-        print(f"Sheet '{str_name_sheet}' does not exist.")
-        return False
+        return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
 
     def get_sheet(self, str_name_sheet):
         """Return specified sheet object"""
         if self.__check_name_sheet__(str_name_sheet):
-            return self.workbook[str_name_sheet]
-        print(f"Sheet '{str_name_sheet}' does not exist.")
-        return None
+            # The caller may edit cells directly, rebuild the used-range index on next use
+            # and rewrite the sheet on every save
+            self._used_ranges.pop(str_name_sheet, None)
+            self._shared_sheets.add(str_name_sheet)
+            self.__cells_changed(str_name_sheet)
+            return self.__sheet(str_name_sheet)
+        return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), None)
 
     def get_sheet_names(self):
         """Return list of sheet names"""
-        return self.workbook.sheetnames
+        return self._workbook.sheetnames
 
     def write_column(self, str_name_sheet, column, list_content, start_row=1):
         """Write data to a column (accepts both letter and number column index)"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
-            
-            sheet = self.workbook[str_name_sheet]
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
             # Convert column letter to number if needed
             if isinstance(column, str):
-                column = openpyxl.utils.column_index_from_string(column)
-            
+                column = column_index(column)
+            if start_row < 1 or column < 1:
+                return report_error(self.strict, InvalidReferenceError("Rows and columns start at 1."), False)
+            self.__mark_dirty(str_name_sheet)
+
+            if self.mode == "stream":
+                for index, data in enumerate(list_content, start=start_row):
+                    if not self.__stream_write(str_name_sheet, index, [data], column):
+                        return False
+                return True
+
+            used = self.__used_range(str_name_sheet)
+            store = self._compact.get(str_name_sheet)
+            sheet = None if store is not None else self.__sheet(str_name_sheet)
+            index = start_row - 1
             for index, data in enumerate(list_content, start=start_row):
-                sheet.cell(row=index, column=column).value = data
+                if store is not None:
+                    store.set(index, column, data)
+                else:
+                    sheet.cell(row=index, column=column).value = data
+                used.update(index, column, data)
+            if index >= start_row:
+                self.__cells_changed(str_name_sheet, start_row, column, index, column)
             return True
         except Exception as e:
-            print(f"Error writing column: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error writing column", e, False)
 
     def write_row(self, str_name_sheet, row, list_content, start_column=1):
         """Write data to a row"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            if row < 1 or start_column < 1:
+                return report_error(self.strict, InvalidReferenceError("Rows and columns start at 1."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            if self.mode == "stream":
+                return self.__stream_write(str_name_sheet, row, list_content, start_column)
+
+            used = self.__used_range(str_name_sheet)
+            store = self._compact.get(str_name_sheet)
+            sheet = None if store is not None else self.__sheet(str_name_sheet)
+            index = start_column - 1
             for index, data in enumerate(list_content, start=start_column):
-                sheet.cell(row=row, column=index).value = data
+                if store is not None:
+                    store.set(row, index, data)
+                else:
+                    sheet.cell(row=row, column=index).value = data
+                used.update(row, index, data)
+            if index >= start_column:
+                self.__cells_changed(str_name_sheet, row, start_column, row, index)
             return True
         except Exception as e:
-            print(f"Error writing row: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error writing row", e, False)
+
+    def write_rows(self, str_name_sheet, start_row, rows, start_column=1):
+        """
+        Write a 2D block of values in a single pass.
+        rows can be any iterable of sequences: lists, tuples, generators or a NumPy 2D array.
+        """
+        try:
+            if not self.__check_writable():
+                return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            if start_row < 1 or start_column < 1:
+                return report_error(self.strict, InvalidReferenceError("Rows and columns start at 1."), False)
+            self.__mark_dirty(str_name_sheet)
+
+            # NumPy arrays: convert once to native Python values instead of per-cell scalars
+            if hasattr(rows, "tolist"):
+                rows = rows.tolist()
+
+            if self.mode == "stream":
+                for row, values in enumerate(rows, start=start_row):
+                    if not self.__stream_write(str_name_sheet, row, values, start_column):
+                        return False
+                return True
+
+            used = self.__used_range(str_name_sheet)
+            update_used = used.update
+            row = start_row - 1
+            max_column = start_column - 1
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                set_value = store.set
+                for row, values in enumerate(rows, start=start_row):
+                    column = start_column - 1
+                    for column, data in enumerate(values, start=start_column):
+                        set_value(row, column, data)
+                        update_used(row, column, data)
+                    if column > max_column:
+                        max_column = column
+                if row >= start_row and max_column >= start_column:
+                    self.__cells_changed(str_name_sheet, start_row, start_column, row, max_column)
+                return True
+
+            sheet = self.__sheet(str_name_sheet)
+            # Fill the cell dict directly: sheet.cell() re-validates and re-looks up every coordinate
+            cells = sheet._cells
+            update_row = used.update_row
+            for row, values in enumerate(rows, start=start_row):
+                if values.__class__ is not list and values.__class__ is not tuple:
+                    # Read twice below
+                    values = list(values)
+                column = start_column - 1
+                for column, data in enumerate(values, start=start_column):
+                    cell = cells.get((row, column))
+                    if cell is None:
+                        cells[(row, column)] = _new_cell(sheet, row, column, data)
+                    else:
+                        cell.value = data
+                update_row(row, start_column, values)
+                if column > max_column:
+                    max_column = column
+            # Keep sheet.append() in sync with the rows written above
+            sheet._current_row = max(sheet._current_row, row)
+            if row >= start_row and max_column >= start_column:
+                self.__cells_changed(str_name_sheet, start_row, start_column, row, max_column)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error writing rows", e, False)
+
+    def write_range(self, str_name_sheet, top_left, rows):
+        """Write a 2D block of values whose top-left cell is top_left ('B3' or (row, column))"""
+        top_left = cell_coordinates(top_left)
+        if top_left is None:
+            return report_error(self.strict, InvalidReferenceError("Invalid cell reference format."), False)
+        return self.write_rows(str_name_sheet, top_left[0], rows, start_column=top_left[1])
 
     def write_cell(self, str_name_sheet, cell_ref, content):
         """Write to a specific cell (accepts both A1-style and row/column coordinates)"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            cell_ref = cell_coordinates(cell_ref)
+            if cell_ref is None:
+                return report_error(self.strict, InvalidReferenceError("Invalid cell reference format."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
-            if isinstance(cell_ref, str) and self.__validate_cell_reference(cell_ref):
-                sheet[cell_ref].value = content
-            elif isinstance(cell_ref, tuple) and len(cell_ref) == 2:
-                sheet.cell(row=cell_ref[0], column=cell_ref[1]).value = content
+            if self.mode == "stream":
+                return self.__stream_write(str_name_sheet, cell_ref[0], [content], cell_ref[1])
+
+            row, column = cell_ref
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                store.set(row, column, content)
             else:
-                print("Invalid cell reference format.")
-                return False
+                self.__sheet(str_name_sheet).cell(row=row, column=column).value = content
+            self.__used_range(str_name_sheet).update(row, column, content)
+            self.__cells_changed(str_name_sheet, row, column, row, column)
             return True
         except Exception as e:
-            print(f"Error writing cell: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error writing cell", e, False)
 
-    def read_cell(self, str_name_sheet, cell_ref):
-        """Read from a specific cell"""
+    def read_cell(self, str_name_sheet, cell_ref, evaluate=False):
+        """
+        Read from a specific cell.
+        evaluate=True returns the computed value of a formula cell instead of the formula text.
+        """
         try:
             if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
-                return None
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), None)
+            if self.mode == "stream":
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Reading cells is not available in stream mode."), None)
             
-            sheet = self.workbook[str_name_sheet]
-            if isinstance(cell_ref, str) and self.__validate_cell_reference(cell_ref):
-                return sheet[cell_ref].value
-            elif isinstance(cell_ref, tuple) and len(cell_ref) == 2:
-                return sheet.cell(row=cell_ref[0], column=cell_ref[1]).value
-            print("Invalid cell reference format.")
-            return None
+            sheet = self.__worksheet(str_name_sheet)
+            cell_ref = cell_coordinates(cell_ref)
+            if cell_ref is not None:
+                if self.mode == "read":
+                    return sheet.cell(row=cell_ref[0], column=cell_ref[1]).value
+                if evaluate:
+                    return self.__formulas().value(str_name_sheet, cell_ref[0], cell_ref[1])
+                # Look the cell up instead of sheet.cell(), which would create an empty one
+                return self.__value_getter(str_name_sheet)(*cell_ref)
+            return report_error(self.strict, InvalidReferenceError("Invalid cell reference format."), None)
         except Exception as e:
-            print(f"Error reading cell: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error reading cell", e, None)
 
     def read_range(self, str_name_sheet, start_cell, end_cell):
         """Read a range of cells (e.g., 'A1:C3')"""
         try:
             if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
-                return None
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), None)
+            if self.mode == "stream":
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Reading ranges is not available in stream mode."), None)
             
-            sheet = self.workbook[str_name_sheet]
-            return [[cell.value for cell in row] for row in sheet[start_cell:end_cell]]
+            sheet = self.__worksheet(str_name_sheet)
+            min_row, min_col, max_row, max_col = self.__range_bounds(sheet, f"{start_cell}:{end_cell}")
+            if self.mode == "read":
+                # A single streaming pass instead of indexing the read-only sheet
+                return [list(row) for row in sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col,
+                                                             max_col=max_col, values_only=True)]
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                get_value = store.get
+                return [[get_value(row, col) for col in range(min_col, max_col + 1)]
+                        for row in range(min_row, max_row + 1)]
+            # Look the cells up instead of sheet[range], which would create the empty ones
+            get_cell = sheet._cells.get
+            values = []
+            for row in range(min_row, max_row + 1):
+                cells = [get_cell((row, col)) for col in range(min_col, max_col + 1)]
+                values.append([cell.value if cell is not None else None for cell in cells])
+            return values
         except Exception as e:
-            print(f"Error reading range: {str(e)}")
+            return report_exception(self.strict, "Error reading range", e, None)
+
+    def iter_rows(self, str_name_sheet, min_row=None, max_row=None, min_col=None, max_col=None, values_only=True):
+        """
+        Lazily yield the rows of a sheet (tuples of values, or cells if values_only=False).
+        In read mode rows are parsed while iterating, so breaking out early stops the parsing.
+        """
+        if self.mode == "stream":
+            report_error(self.strict, UnsupportedOperationError("Iterating rows is not available in stream mode."))
+            return
+        if not self.__check_name_sheet__(str_name_sheet):
+            report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."))
+            return
+        try:
+            if values_only and self.mode != "read":
+                # Same bounds as openpyxl (from A1 to the last cell unless given), but the values are
+                # looked up: openpyxl's iter_rows would create a cell at every coordinate visited
+                if str_name_sheet in self._compact:
+                    used = self.__used_range(str_name_sheet)
+                    empty, last_row, last_col = not used.last_row, max(used.last_row, 1), max(used.last_col, 1)
+                else:
+                    sheet = self.__worksheet(str_name_sheet)
+                    empty, last_row, last_col = not sheet._cells, sheet.max_row, sheet.max_column
+                if empty and not any((min_row, max_row, min_col, max_col)):
+                    return
+                get_value = self.__value_getter(str_name_sheet)
+                columns = range(min_col or 1, (max_col or last_col) + 1)
+                for row in range(min_row or 1, (max_row or last_row) + 1):
+                    yield tuple(get_value(row, col) for col in columns)
+                return
+            sheet = self.__sheet(str_name_sheet)
+            yield from sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col,
+                                       max_col=max_col, values_only=values_only)
+        except Exception as e:
+            report_exception(self.strict, "Error iterating rows", e)
+
+    def read_range_as_array(self, str_name_sheet, start_cell, end_cell, header=False):
+        """
+        Read a range as a dict of typed NumPy column arrays.
+        Keys are the values of the first row when header=True, column letters otherwise.
+        """
+        if np is None:
+            return report_error(self.strict, MissingDependencyError(
+                "NumPy is required to read a range as arrays."), None)
+        try:
+            _, min_row, min_col, max_row, max_col = self.__parse_range(str_name_sheet, f"{start_cell}:{end_cell}")
+            # iter_rows looks the values up, the empty cells of the range are never created
+            rows = self.iter_rows(str_name_sheet, min_row=min_row, max_row=max_row,
+                                  min_col=min_col, max_col=max_col, values_only=True)
+            if header:
+                # Empty or repeated header cells fall back to the column letter so no column is lost
+                names = []
+                for col, name in enumerate(next(rows, ()), start=min_col):
+                    name = "" if name is None else str(name)
+                    names.append(name if name and name not in names else column_letter(col))
+            else:
+                names = [column_letter(col) for col in range(min_col, max_col + 1)]
+            columns = list(zip(*rows)) or [()] * len(names)
+            return {name: _column_to_array(list(values)) for name, values in zip(names, columns)}
+        except Exception as e:
+            return report_exception(self.strict, "Error reading range as arrays", e, None)
+
+    def write_array(self, str_name_sheet, top_left, data, header=True):
+        """
+        Write NumPy data at top_left ('A1' or (row, column)):
+        a 2D array is written as rows, a dict of 1D arrays as columns (keys as header row when header=True).
+        """
+        try:
+            if isinstance(data, dict):
+                names = list(data)
+                columns = [_array_to_values(data[name]) for name in names]
+                rows = zip(*columns)
+                if header:
+                    rows = itertools.chain([names], rows)
+            else:
+                rows = (_array_to_values(row) for row in data)
+            return self.write_range(str_name_sheet, top_left, rows)
+        except Exception as e:
+            return report_exception(self.strict, "Error writing array", e, False)
+
+    def read_range_as_dataframe(self, str_name_sheet, start_cell, end_cell, header=True):
+        """Read a range as a pandas DataFrame (requires pandas)"""
+        try:
+            import pandas as pd
+        except ImportError:
+            return report_error(self.strict, MissingDependencyError(
+                "pandas is required to read a range as a DataFrame."), None)
+        columns = self.read_range_as_array(str_name_sheet, start_cell, end_cell, header=header)
+        if columns is None:
             return None
+        return pd.DataFrame(columns)
+
+    def write_dataframe(self, str_name_sheet, top_left, dataframe, header=True, index=False):
+        """Write a pandas DataFrame at top_left, column by column"""
+        if index:
+            dataframe = dataframe.reset_index()
+        # Missing values of any pandas dtype (NaN, NaT, pd.NA) become empty cells
+        columns = {str(name): dataframe[name].astype(object).where(dataframe[name].notna(), None).to_numpy()
+                   for name in dataframe.columns}
+        return self.write_array(str_name_sheet, top_left, columns, header=header)
+
+    def __index_column(self, str_name_sheet, column, header_row):
+        """
+        Column number of column: an index, a header of header_row (e.g. "WORK ORDER") or a
+        column letter. Headers take precedence over letters. None if it matches nothing
+        """
+        if isinstance(column, int):
+            return column if column >= 1 else None
+        if header_row:
+            if self.mode == "read":
+                sheet = self.__sheet(str_name_sheet)
+                headers = next(sheet.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+            else:
+                # sheet.iter_rows would scan every cell for the sheet's width
+                get_value = self.__value_getter(str_name_sheet)
+                last_col = self.__used_range(str_name_sheet).last_col
+                headers = [get_value(header_row, col) for col in range(1, last_col + 1)]
+            for number, header in enumerate(headers, start=1):
+                if header == column:
+                    return number
+        if isinstance(column, str) and column.isalpha() and len(column) <= 3:
+            number = column_index(column.upper())
+            return number if number <= 16384 else None
+        return None
+
+    def __index(self, str_name_sheet, column, header_row=1, ignore_case=None):
+        """
+        Return the index of a column, building it on first use (ignore_case=None keeps the
+        existing index whatever its case handling)
+        """
+        if self.mode == "stream":
+            raise UnsupportedOperationError("Indexes are not available in stream mode.")
+        if not self.__check_name_sheet__(str_name_sheet):
+            raise SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist.")
+        number = self.__index_column(str_name_sheet, column, header_row)
+        if number is None:
+            raise InvalidReferenceError(f"Column '{column}' not found.")
+        indexes = self._indexes.setdefault(str_name_sheet, {})
+        index = indexes.get(number)
+        first_row = (header_row or 0) + 1
+        if index is not None and index.first_row == first_row and ignore_case in (None, index.ignore_case):
+            return index
+        if self.mode == "read":
+            sheet = self.__sheet(str_name_sheet)
+            values = sheet.iter_rows(min_row=first_row, min_col=number, max_col=number, values_only=True)
+            cells = ((row, value[0]) for row, value in enumerate(values, start=first_row) if value)
+        else:
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                cells = ((row, value) for row, value in store.column_cells(number) if row >= first_row)
+            else:
+                # Only rows holding data in that column, without creating empty cells
+                get_cell = self.__worksheet(str_name_sheet)._cells.get
+                used_rows = self.__used_range(str_name_sheet).rows
+                cells = ((row, get_cell((row, number)).value) for row, cols in used_rows.items()
+                         if number in cols and row >= first_row)
+        index = indexes[number] = ColumnIndex(number, first_row, cells, ignore_case=bool(ignore_case))
+        return index
+
+    def __row_values(self, str_name_sheet, rows, columns):
+        """Values of columns (numbers) for each of rows, as a list of tuples"""
+        if not rows:
+            return []
+        if self.mode == "read":
+            sheet = self.__sheet(str_name_sheet)
+            # One streaming pass over the rows spanned instead of random access
+            wanted = set(rows)
+            first, last = min(rows), max(rows)
+            min_col, max_col = min(columns), max(columns)
+            found = {}
+            for row, values in enumerate(sheet.iter_rows(min_row=first, max_row=last, min_col=min_col,
+                                                         max_col=max_col, values_only=True), start=first):
+                if row in wanted:
+                    found[row] = tuple(values[col - min_col] if col - min_col < len(values) else None
+                                       for col in columns)
+            return [found.get(row, (None,) * len(columns)) for row in rows]
+        get_value = self.__value_getter(str_name_sheet)
+        return [tuple(get_value(row, col) for col in columns) for row in rows]
+
+    def create_index(self, str_name_sheet, column, header_row=1, ignore_case=False):
+        """
+        Index a column (number, letter or header of header_row, e.g. "WORK ORDER") for find_rows,
+        find_range and query. Rows below header_row are indexed (header_row=None: from row 1).
+        The index follows the write_* methods; edits made through get_sheet/workbook drop it.
+        """
+        try:
+            index = self.__index(str_name_sheet, column, header_row, ignore_case)
+            logger.info("Indexed %s values of column %s in sheet '%s'.", len(index.values),
+                        column_letter(index.column), str_name_sheet)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error creating index", e, False)
+
+    def drop_index(self, str_name_sheet, column=None, header_row=1):
+        """Drop the index of a column, or every index of the sheet without column"""
+        try:
+            if column is None:
+                self._indexes.pop(str_name_sheet, None)
+                return True
+            number = self.__index_column(str_name_sheet, column, header_row)
+            self._indexes.get(str_name_sheet, {}).pop(number, None)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error dropping index", e, False)
+
+    def find_rows(self, str_name_sheet, column, value, header_row=1):
+        """
+        Return the rows (ascending) whose column holds value, through the column's index
+        (built on first use). None on error
+        """
+        try:
+            return self.__index(str_name_sheet, column, header_row).find(value)
+        except Exception as e:
+            return report_exception(self.strict, "Error finding rows", e, None)
+
+    def find_range(self, str_name_sheet, column, low=None, high=None, header_row=1, include_low=True,
+                   include_high=True):
+        """
+        Return the rows whose column value lies between low and high (None: unbounded), ordered
+        by value. Values are compared within their kind: numbers, text or dates. None on error
+        """
+        try:
+            return self.__index(str_name_sheet, column, header_row).range(low, high, include_low, include_high)
+        except Exception as e:
+            return report_exception(self.strict, "Error finding rows", e, None)
+
+    def query(self, str_name_sheet, where=None, columns=None, header_row=1):
+        """
+        Return the rows matching every condition of where: {column: value} (equality, through
+        the index), {column: slice(low, high)} (inclusive range, through the index) or
+        {column: callable} (predicate on the value). With columns (numbers, letters or headers)
+        the values of those columns are returned for each row instead of row numbers.
+        """
+        try:
+            candidates = None
+            predicates = []
+            for column, condition in (where or {}).items():
+                if callable(condition):
+                    number = self.__index_column(str_name_sheet, column, header_row)
+                    if number is None:
+                        raise InvalidReferenceError(f"Column '{column}' not found.")
+                    predicates.append((number, condition))
+                    continue
+                index = self.__index(str_name_sheet, column, header_row)
+                if isinstance(condition, slice):
+                    rows = index.range(condition.start, condition.stop)
+                else:
+                    rows = index.find(condition)
+                candidates = set(rows) if candidates is None else candidates.intersection(rows)
+            if candidates is None:
+                if self.mode == "read":
+                    last_row = self.__sheet(str_name_sheet).max_row or 0
+                else:
+                    last_row = self.__used_range(str_name_sheet).last_row
+                candidates = range((header_row or 0) + 1, last_row + 1)
+            rows = sorted(candidates)
+            if predicates:
+                tests = self.__row_values(str_name_sheet, rows, [number for number, _ in predicates])
+                rows = [row for row, values in zip(rows, tests)
+                        if all(test(value) for (_, test), value in zip(predicates, values))]
+            if columns is None:
+                return rows
+            numbers = [self.__index_column(str_name_sheet, column, header_row) for column in columns]
+            if None in numbers:
+                raise InvalidReferenceError(f"Column '{columns[numbers.index(None)]}' not found.")
+            return self.__row_values(str_name_sheet, rows, numbers)
+        except Exception as e:
+            return report_exception(self.strict, "Error querying sheet", e, None)
+
+    def __aggregate_columns(self, str_name_sheet, columns, header_row, min_row, max_row, coerce, group_by=None):
+        """
+        Read the values of columns (and of group_by) in a single pass over the rows of the sheet.
+        Returns (first row, last row, {column: column number}, {column: ColumnValues}, group keys)
+        """
+        if self.mode == "stream":
+            raise UnsupportedOperationError("Aggregating is not available in stream mode.")
+        if not self.__check_name_sheet__(str_name_sheet):
+            raise SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist.")
+        numbers = {}
+        for column in list(columns) + ([group_by] if group_by is not None else []):
+            number = self.__index_column(str_name_sheet, column, header_row)
+            if number is None:
+                raise InvalidReferenceError(f"Column '{column}' not found.")
+            numbers[column] = number
+        if min_row is None:
+            min_row = (header_row or 0) + 1
+        if max_row is None:
+            if self.mode == "read":
+                max_row = self.__sheet(str_name_sheet).max_row or 0
+            else:
+                max_row = self.__used_range(str_name_sheet).last_row
+        wanted = sorted(set(numbers.values()))
+        rows = range(min_row, max_row + 1)
+        if self.mode == "read":
+            found = self.__row_values(str_name_sheet, rows, wanted)
+            values = dict(zip(wanted, zip(*found))) if found else {number: () for number in wanted}
+        else:
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                values = {number: [store.get(row, number) for row in rows] for number in wanted}
+            else:
+                # Column by column straight from the cell dict, without creating empty cells
+                get_cell = self.__worksheet(str_name_sheet)._cells.get
+                values = {}
+                for number in wanted:
+                    cells = [get_cell((row, number)) for row in rows]
+                    values[number] = [cell._value if cell is not None else None for cell in cells]
+        data = {column: ColumnValues(values[numbers[column]], coerce) for column in columns}
+        keys = values[numbers[group_by]] if group_by is not None else None
+        return min_row, max_row, numbers, data, keys
+
+    def aggregate(self, str_name_sheet, columns, functions="sum", header_row=1, min_row=None, max_row=None,
+                  group_by=None, coerce=True):
+        """
+        Compute sum/mean/min/max/count of columns (numbers, letters or headers) over the rows
+        below header_row (or min_row..max_row) in a single pass, vectorized with NumPy when it
+        is installed. Numbers stored as text ("2.5") count as numbers unless coerce=False.
+        Returns {column: value} for one function name, {column: {function: value}} for a list,
+        and {group: {...}} per value of group_by. None on error.
+        """
+        try:
+            names = [functions] if isinstance(functions, str) else list(functions)
+            unknown = [name for name in names if name not in FUNCTIONS]
+            if unknown:
+                raise UnsupportedOperationError(f"Unknown aggregate '{unknown[0]}', expected one of {', '.join(FUNCTIONS)}.")
+            columns = list(columns) if isinstance(columns, (list, tuple)) else [columns]
+            _, _, _, data, keys = self.__aggregate_columns(str_name_sheet, columns, header_row, min_row, max_row,
+                                                           coerce, group_by)
+
+            def shape(results):
+                return {column: values[names[0]] if isinstance(functions, str) else values
+                        for column, values in results.items()}
+            if group_by is not None:
+                return {key: shape(results) for key, results in group_aggregate(keys, data, names).items()}
+            return shape({column: aggregate(values, names) for column, values in data.items()})
+        except Exception as e:
+            return report_exception(self.strict, "Error aggregating columns", e, None)
+
+    def write_aggregates(self, str_name_sheet, targets, header_row=1, min_row=None, max_row=None, formulas=True,
+                         coerce=True):
+        """
+        Compute aggregates and write them to target cells: targets is {cell: (column, function)},
+        e.g. {"K70": ("K", "sum")}. With formulas=True the cell receives the matching formula
+        (=SUM(K3:K69)) when the column holds real numbers; columns of numbers stored as text
+        get the value, as Excel's SUM would ignore them. Without max_row the range stops above
+        the targets placed in the aggregated columns. Returns {cell: value}, None on error.
+        """
+        try:
+            if not self.__check_writable():
+                return None
+            columns = list(dict.fromkeys(column for column, _ in targets.values()))
+            for _, function in targets.values():
+                if function not in FUNCTIONS:
+                    raise UnsupportedOperationError(f"Unknown aggregate '{function}', expected one of {', '.join(FUNCTIONS)}.")
+            # Targets in the aggregated columns must stay out of the range (=SUM(A2:A6) in A6 is circular):
+            # the default range stops above them
+            aggregated = {self.__index_column(str_name_sheet, column, header_row) for column in columns}
+            first_row = min_row if min_row is not None else (header_row or 0) + 1
+            inside = {}
+            for cell_ref in targets:
+                coordinates = cell_coordinates(cell_ref)
+                if coordinates is None:
+                    raise InvalidReferenceError(f"Invalid cell reference '{cell_ref}'.")
+                if coordinates[1] in aggregated and coordinates[0] >= first_row:
+                    inside[cell_ref] = coordinates[0]
+            if inside and max_row is None:
+                max_row = min(inside.values()) - 1
+            elif inside and min(inside.values()) <= max_row:
+                cell_ref = min(inside, key=inside.get)
+                raise InvalidReferenceError(f"Target cell '{cell_ref}' lies in the range it aggregates.")
+            min_row, max_row, numbers, data, _ = self.__aggregate_columns(str_name_sheet, columns, header_row,
+                                                                          min_row, max_row, coerce)
+            results = {}
+            for cell_ref, (column, function) in targets.items():
+                value = aggregate(data[column], [function])[function]
+                results[cell_ref] = value
+                if formulas and not data[column].text_numbers and max_row >= min_row:
+                    letter = column_letter(numbers[column])
+                    written = self.set_formula(str_name_sheet, cell_ref,
+                                               f"={FUNCTIONS[function]}({letter}{min_row}:{letter}{max_row})")
+                else:
+                    written = self.write_cell(str_name_sheet, cell_ref, value)
+                if not written:
+                    return None
+            return results
+        except Exception as e:
+            return report_exception(self.strict, "Error writing aggregates", e, None)
+
+    def __data_rows(self, str_name_sheet, first_row):
+        """Yield the rows of values of a sheet from first_row down to its last used row"""
+        if self.mode == "read":
+            yield from self.__sheet(str_name_sheet).iter_rows(min_row=first_row, values_only=True)
+            return
+        used = self.__used_range(str_name_sheet)
+        if used.last_row >= first_row:
+            yield from self.__iter_values(str_name_sheet, (first_row, 1), (used.last_row, max(used.last_col, 1)))
+
+    def diff_sheet(self, str_name_sheet, other, other_sheet=None, keys=None, header_row=1):
+        """
+        Compare a sheet of this workbook (the old version) with other_sheet (same name by
+        default) of other, an Excel_WorkBook holding the new version. Rows below header_row
+        are compared through row hashes, in a single pass over each sheet; with keys (columns
+        as numbers, letters or headers, e.g. "WORK ORDER") rows are paired by key wherever
+        they moved, otherwise by position. Returns a Python_Excel_Diff.SheetDiff, None on error.
+        """
+        try:
+            other_sheet = other_sheet or str_name_sheet
+            for workbook, name in ((self, str_name_sheet), (other, other_sheet)):
+                if workbook.mode == "stream":
+                    raise UnsupportedOperationError("Comparing sheets is not available in stream mode.")
+                if not workbook.__check_name_sheet__(name):
+                    raise SheetNotFoundError(f"Sheet '{name}' does not exist.")
+            numbers = None
+            if keys is not None:
+                numbers = []
+                for key in keys if isinstance(keys, (list, tuple)) else [keys]:
+                    number = self.__index_column(str_name_sheet, key, header_row)
+                    if number is None or other.__index_column(other_sheet, key, header_row) != number:
+                        raise InvalidReferenceError(f"Key column '{key}' not found at the same position in both sheets.")
+                    numbers.append(number)
+            first_row = (header_row or 0) + 1
+            diff = Python_Excel_Diff.diff_rows(self.__data_rows(str_name_sheet, first_row),
+                                               other.__data_rows(other_sheet, first_row), numbers, first_row)
+            summary = diff.summary()
+            logger.info("Sheet '%s': %s rows inserted, %s deleted, %s changed (%s cells).", str_name_sheet,
+                        summary["inserted"], summary["deleted"], summary["changed"], summary["changed_cells"])
+            return diff
+        except Exception as e:
+            return report_exception(self.strict, "Error comparing sheets", e, None)
+
+    def diff_workbook(self, other, keys=None, header_row=1):
+        """
+        Compare every sheet of this workbook with the sheet of the same name in other (see
+        diff_sheet); keys may be one key list for all sheets or {sheet: keys}. Returns
+        {"sheets": {sheet: SheetDiff}, "added": [sheets only in other], "removed": [sheets only
+        here]}, None on error
+        """
+        try:
+            names = self.get_sheet_names()
+            other_names = other.get_sheet_names()
+            sheets = {}
+            for name in names:
+                if name not in other_names:
+                    continue
+                sheet_keys = keys.get(name) if isinstance(keys, dict) else keys
+                diff = self.diff_sheet(name, other, keys=sheet_keys, header_row=header_row)
+                if diff is None:
+                    return None
+                sheets[name] = diff
+            return {"sheets": sheets, "added": [name for name in other_names if name not in names],
+                    "removed": [name for name in names if name not in other_names]}
+        except Exception as e:
+            return report_exception(self.strict, "Error comparing workbooks", e, None)
+
+    def apply_diff(self, str_name_sheet, diff):
+        """
+        Apply a SheetDiff of diff_sheet to a sheet of this workbook in bulk: one pass writes the
+        changed cells, removes the deleted rows and inserts the new ones, moving the rows below
+        with their styles and heights. Keyed diffs find the rows of the sheet by key, so the
+        target may hold the rows in another order; unkeyed diffs use the old row numbers.
+        Merged cells, conditional formats, data validations, tables, drawings, formulas or
+        defined names tied to the rows that would move are not shifted: such diffs are refused
+        (UnsupportedOperationError) and the sheet is left unchanged.
+        Returns {"changed", "inserted", "deleted", "missing", "conflicts"} (see
+        Python_Excel_Diff.apply_diff), None on error.
+        """
+        try:
+            if not self.__check_writable():
+                return None
+            if self.mode == "stream":
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Applying a diff is not available in stream mode."), None)
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), None)
+            self.__mark_dirty(str_name_sheet)
+            located = diff.locate(self.__data_rows(str_name_sheet, diff.first_row) if diff.keys else ())
+            if diff.inserted or diff.deleted:
+                # Formulas of every sheet are checked for references to the rows that move
+                self.__load_sheets()
+            sheet = self.__sheet(str_name_sheet)
+            stats = Python_Excel_Diff.apply_diff(sheet, diff, located)
+            # Rows moved: rebuild the used range and drop the indexes of the sheet
+            self._used_ranges.pop(str_name_sheet, None)
+            sheet._current_row = self.__used_range(str_name_sheet).last_row
+            self.__cells_changed(str_name_sheet)
+            logger.info("Applied diff to sheet '%s': %s cells changed, %s rows inserted, %s deleted.",
+                        str_name_sheet, stats["changed"], stats["inserted"], stats["deleted"])
+            if stats["missing"] or stats["conflicts"]:
+                logger.warning("Sheet '%s': %s rows of the diff not found, %s cells did not hold the old value.",
+                               str_name_sheet, stats["missing"], stats["conflicts"])
+            return stats
+        except UnsupportedOperationError as e:
+            return report_error(self.strict, e, None)
+        except Exception as e:
+            return report_exception(self.strict, "Error applying diff", e, None)
+
+    def __iter_values(self, str_name_sheet, start_cell=None, end_cell=None):
+        """
+        Yield the rows of values of a range ('A1'/(row, col) corners, the used range by default)
+        one at a time, without creating empty cells
+        """
+        sheet = self.__worksheet(str_name_sheet)
+        if start_cell is None:
+            if self.mode == "read":
+                yield from sheet.iter_rows(values_only=True)
+                return
+            used = self.__used_range(str_name_sheet)
+            min_row, min_col, max_row, max_col = 1, 1, used.last_row, used.last_col
+        else:
+            start = cell_coordinates(start_cell)
+            end = cell_coordinates(end_cell if end_cell is not None else start_cell)
+            if start is None or end is None:
+                raise InvalidReferenceError("Invalid cell reference format.")
+            min_row, max_row = sorted((start[0], end[0]))
+            min_col, max_col = sorted((start[1], end[1]))
+        if self.mode == "read":
+            yield from sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col,
+                                       values_only=True)
+            return
+        get_value = self.__value_getter(str_name_sheet)
+        columns = range(min_col, max_col + 1)
+        for row in range(min_row, max_row + 1):
+            yield tuple(get_value(row, col) for col in columns)
+
+    def __import_rows(self, str_name_sheet, rows, start_row, start_column, number_formats):
+        """
+        Write rows streamed from a file, checking they fit in the sheet, and apply the
+        column number formats ({"C": "0.00"} or {3: "0.00"}) to the written cells.
+        Returns the number of rows written, None on failure
+        """
+        formats = [(column_index(column) if isinstance(column, str) else column, number_format)
+                   for column, number_format in (number_formats or {}).items()]
+        styles = []
+        if self.mode == "stream" and formats:
+            # Streamed rows are styled as they are written: register open-ended ranges and clip
+            # them to the imported rows afterwards, so no empty styled rows are flushed
+            styles = self.__stream_state(str_name_sheet)["styles"]
+            first_style = len(styles)
+            for column, number_format in formats:
+                letter = column_letter(column)
+                if not self.format_cells(str_name_sheet, f"{letter}{start_row}:{letter}{MAX_ROW}",
+                                         number_format=number_format):
+                    return None
+        count = [0]
+
+        def counted(rows):
+            for count[0], values in enumerate(rows, start=1):
+                if start_row + count[0] - 1 > MAX_ROW:
+                    raise InvalidReferenceError(f"More rows than fit in a sheet ({MAX_ROW}).")
+                yield values
+        try:
+            if not self.write_rows(str_name_sheet, start_row, counted(rows), start_column=start_column):
+                return None
+        finally:
+            if styles:
+                last_row = start_row + count[0] - 1
+                styles[first_style:] = [(min_col, min_row, max_col, last_row, ids)
+                                        for min_col, min_row, max_col, _, ids in styles[first_style:]]
+        if self.mode != "stream" and formats and count[0]:
+            last_row = start_row + count[0] - 1
+            operations = [(f"{column_letter(column)}{start_row}:{column_letter(column)}{last_row}",
+                           {"number_format": number_format}) for column, number_format in formats]
+            if not self.format_ranges(str_name_sheet, operations):
+                return None
+        return count[0]
+
+    def import_csv(self, str_name_sheet, path, start_row=1, start_column=1, header=True, delimiter=",",
+                   encoding="utf-8", infer_types=True, date_formats=(), number_formats=None):
+        """
+        Stream a CSV file into a sheet without loading it: fields are typed on the fly
+        (numbers, TRUE/FALSE, ISO dates and date_formats such as "%d-%b-%y"; infer_types=False
+        keeps text), the header row is kept as text. number_formats ({"F": "yyyy-mm-dd"})
+        formats the imported columns. In stream mode memory stays flat whatever the file size.
+        """
+        try:
+            if not self.__check_writable():
+                return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            with open(path, newline="", encoding=encoding) as stream:
+                reader = csv.reader(stream, delimiter=delimiter)
+
+                def typed(reader):
+                    if header:
+                        first = next(reader, None)
+                        if first is not None:
+                            yield first
+                    if not infer_types:
+                        yield from ([field if field else None for field in fields] for fields in reader)
+                        return
+                    for fields in reader:
+                        yield [_infer_value(field, date_formats) for field in fields]
+                count = self.__import_rows(str_name_sheet, typed(reader), start_row, start_column, number_formats)
+            if count is None:
+                return False
+            logger.info("Imported %s rows from %s into sheet '%s'.", count, path, str_name_sheet)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error importing CSV", e, False)
+
+    def export_csv(self, str_name_sheet, path, start_cell=None, end_cell=None, delimiter=",", encoding="utf-8",
+                   date_format=None):
+        """
+        Write a range ('A1'/(row, col) corners, the used range by default) to a CSV file row by
+        row, never building the whole table. Dates use ISO 8601 unless date_format is given.
+        The file is written atomically.
+        """
+        try:
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            if self.mode == "stream":
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Exporting is not available in stream mode."), False)
+            rows = self.__iter_values(str_name_sheet, start_cell, end_cell)
+
+            def write(stream):
+                text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+                writer = csv.writer(text, delimiter=delimiter)
+                for values in rows:
+                    writer.writerow([_csv_value(value, date_format) for value in values])
+                text.flush()
+                text.detach()
+            Python_Excel_Package.write_atomic(path, write)
+            logger.info("Exported sheet '%s' to %s", str_name_sheet, path)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error exporting CSV", e, False)
+
+    def import_parquet(self, str_name_sheet, path, start_row=1, start_column=1, header=True, columns=None,
+                       batch_size=65536, number_formats=None):
+        """
+        Stream a Parquet file into a sheet batch by batch (requires pyarrow), with the header
+        row taken from the schema. Values keep their Parquet types; time zones are converted
+        to naive UTC, as Excel has none.
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return report_error(self.strict, MissingDependencyError(
+                "pyarrow is required to import Parquet files."), False)
+        try:
+            if not self.__check_writable():
+                return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            parquet = pq.ParquetFile(path)
+
+            def rows():
+                if header:
+                    yield list(columns) if columns else list(parquet.schema_arrow.names)
+                for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+                    values = [[_native_value(value) for value in column.to_pylist()] for column in batch.columns]
+                    yield from zip(*values)
+            try:
+                count = self.__import_rows(str_name_sheet, rows(), start_row, start_column, number_formats)
+            finally:
+                parquet.close()
+            if count is None:
+                return False
+            logger.info("Imported %s rows from %s into sheet '%s'.", count, path, str_name_sheet)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error importing Parquet", e, False)
+
+    def export_parquet(self, str_name_sheet, path, start_cell=None, end_cell=None, header=True, batch_size=65536):
+        """
+        Write a range (the used range by default) to a Parquet file in batches of batch_size
+        rows (requires pyarrow). With header=True the first row names the columns. Column types
+        are inferred over the whole range: integers mixed with floats are written as floats,
+        columns mixing other types as text.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return report_error(self.strict, MissingDependencyError(
+                "pyarrow is required to export Parquet files."), False)
+        try:
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            if self.mode == "stream":
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Exporting is not available in stream mode."), False)
+            def batches():
+                """Batches of rows of the range, each as a list of columns"""
+                rows = self.__iter_values(str_name_sheet, start_cell, end_cell)
+                if header:
+                    next(rows, None)
+                while True:
+                    batch = list(itertools.islice(rows, batch_size))
+                    if not batch:
+                        return
+                    width = len(names) if names is not None else max(map(len, batch))
+                    yield [[row[index] if index < len(row) else None for row in batch] for index in range(width)]
+                    if len(batch) < batch_size:
+                        return
+
+            names = None
+            if header:
+                first = next(self.__iter_values(str_name_sheet, start_cell, end_cell), None)
+                names = [str(name) if name is not None else f"column_{index}"
+                         for index, name in enumerate(first or (), start=1)]
+
+            # A first pass settles the type of each column: a Parquet file has a single schema
+            types = [pa.null()] * len(names or ())
+            for columns in batches():
+                types.extend([pa.null()] * (len(columns) - len(types)))
+                for index, values in enumerate(columns):
+                    try:
+                        seen = pa.array(values).type
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        seen = pa.string()
+                    types[index] = self.__promote_parquet_type(pa, types[index], seen)
+            schema = pa.schema([pa.field(names[index] if names else f"column_{index + 1}", field_type)
+                                for index, field_type in enumerate(types)])
+
+            def write(stream):
+                writer = pq.ParquetWriter(stream, schema)
+                try:
+                    for columns in batches():
+                        columns.extend([None] * len(columns[0]) for _ in range(len(schema) - len(columns)))
+                        arrays = []
+                        for field, values in zip(schema, columns):
+                            if pa.types.is_string(field.type):
+                                values = [None if value is None else str(value) for value in values]
+                            arrays.append(pa.array(values, type=field.type))
+                        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                finally:
+                    writer.close()
+            Python_Excel_Package.write_atomic(path, write)
+            logger.info("Exported sheet '%s' to %s", str_name_sheet, path)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error exporting Parquet", e, False)
+
+    @staticmethod
+    def __promote_parquet_type(pa, current, seen):
+        """Parquet type of a column holding values of both types"""
+        if pa.types.is_null(current) or current == seen:
+            return seen
+        if pa.types.is_null(seen):
+            return current
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (current, seen)):
+            return pa.float64()
+        return pa.string()
 
     def set_column_width(self, str_name_sheet, column, width):
         """Set column width"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            if self.mode == "stream" and self.__stream_state(str_name_sheet)["last_row"]:
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Column widths must be set before the first row is streamed."), False)
+
+            sheet = self.__worksheet(str_name_sheet)
             if isinstance(column, int):
-                column = get_column_letter(column)
+                column = column_letter(column)
             sheet.column_dimensions[column].width = width
             return True
         except Exception as e:
-            print(f"Error setting column width: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error setting column width", e, False)
 
     def set_row_height(self, str_name_sheet, row, height):
         """Set row height"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            if self.mode == "stream" and row <= self.__stream_state(str_name_sheet)["last_row"]:
+                return report_error(self.strict, UnsupportedOperationError(
+                    f"Row {row} has already been streamed."), False)
+
+            sheet = self.__worksheet(str_name_sheet)
             sheet.row_dimensions[row].height = height
             return True
         except Exception as e:
-            print(f"Error setting row height: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error setting row height", e, False)
 
     def format_cells(self, str_name_sheet, cell_range, pattern_fill=None, font=None, border=None, alignment=None, number_format=None):
         """Format cells with multiple style options"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
             
-            sheet = self.workbook[str_name_sheet]
-            for row in sheet[cell_range]:
-                for cell in row:
-                    if pattern_fill:
-                        cell.fill = pattern_fill
-                    if font:
-                        cell.font = font
-                    if border:
-                        cell.border = border
-                    if alignment:
-                        cell.alignment = alignment
-                    if number_format:
-                        cell.number_format = number_format
+            if self.mode == "stream":
+                # Styles are attached to the cells when their row is streamed
+                _, min_row, min_col, max_row, max_col = self.__parse_range(str_name_sheet, cell_range)
+                if min_row is None or min_col is None:
+                    return report_error(self.strict, UnsupportedOperationError(
+                        "Whole row/column ranges are not supported in stream mode."), False)
+                state = self.__stream_state(str_name_sheet)
+                if min_row <= state["last_row"]:
+                    return report_error(self.strict, UnsupportedOperationError(
+                        f"Range '{cell_range}' starts in a row that has already been streamed."), False)
+                ids = self.__style_ids(pattern_fill, font, border, alignment, number_format)
+                state["styles"].append((min_col, min_row, max_col, max_row, ids))
+                return True
+        except Exception as e:
+            return report_exception(self.strict, "Error formatting cells", e, False)
+
+        style = {"pattern_fill": pattern_fill, "font": font, "border": border,
+                 "alignment": alignment, "number_format": number_format}
+        return self.format_ranges(str_name_sheet, [(cell_range, style)])
+
+    def format_ranges(self, str_name_sheet, operations):
+        """
+        Apply a batch of (cell_range, style) operations in a single pass.
+        style is a dict of format_cells keywords (pattern_fill, font, border, alignment, number_format).
+        Where ranges overlap, later operations win attribute by attribute and every cell is styled once.
+        Whole columns ('C:D') and rows ('3:5') are styled at column/row level and on their existing cells.
+        """
+        try:
+            if not self.__check_writable():
+                return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            operations = list(operations)
+            parsed = []
+            for cell_range, style in operations:
+                _, min_row, min_col, max_row, max_col = self.__parse_range(str_name_sheet, cell_range)
+                parsed.append(((min_col, min_row, max_col, max_row), style))
+            self.__mark_dirty(str_name_sheet)
+
+            if self.mode == "stream":
+                for cell_range, style in operations:
+                    if not self.format_cells(str_name_sheet, cell_range, **style):
+                        return False
+                return True
+
+            sheet = self.__worksheet(str_name_sheet)
+            store = self._compact.get(str_name_sheet)
+            bounded = [bounds for bounds, style in parsed if None not in bounds]
+            if store is not None:
+                used = self.__used_range(str_name_sheet)
+                max_row, max_column = max(used.last_row, 1), max(used.last_col, 1)
+            else:
+                max_row, max_column = sheet.max_row, sheet.max_column
+            last_row = max([max_row] + [bounds[3] for bounds in bounded])
+            last_col = max([max_column] + [bounds[2] for bounds in bounded])
+
+            # (min_col, min_row, max_col, max_row, style ids, create missing cells)
+            spans = []
+            for (min_col, min_row, max_col, max_row), style in parsed:
+                ids = self.__style_ids(**style)
+                if not ids:
+                    continue
+                create = True
+                if min_row is None:
+                    for col in range(min_col, max_col + 1):
+                        self.__style_dimension(sheet.column_dimensions[column_letter(col)], style)
+                    min_row, max_row, create = 1, last_row, False
+                elif min_col is None:
+                    for row in range(min_row, max_row + 1):
+                        self.__style_dimension(sheet.row_dimensions[row], style)
+                    min_col, max_col, create = 1, last_col, False
+                spans.append((min_col, min_row, max_col, max_row, ids, create))
+
+            if store is not None:
+                # Kept as spans and applied when the sheet is saved or materialized
+                store.spans.extend(spans)
+            else:
+                style_cells(sheet, spans)
             return True
         except Exception as e:
-            print(f"Error formatting cells: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error formatting cells", e, False)
 
-    def insert_image(self, str_name_sheet, cell_ref, image_path, scale_width=1.0, scale_height=1.0):
+    def format_conditional_ranges(self, str_name_sheet, operations, style_manager=None):
+        """
+        Apply a batch of (cell_range, rule) conditional formats to one sheet, rule being a dict of
+        Excel_Style.create_conditional_formatting keywords (see Excel_Style.format_conditional_ranges).
+        Only this sheet is loaded and saved again, unlike handing the workbook property to Excel_Style.
+        style_manager is the Excel_Style building the rules, a new one by default.
+        """
         try:
+            if not self.__check_writable():
+                return False
             if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' not exists.")
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            operations = [(self.__local_range(str_name_sheet, cell_range), rule) for cell_range, rule in operations]
+            self.__mark_dirty(str_name_sheet)
+
+            # Rules live on the worksheet, not on its cells: a compact sheet stays compact
+            self.__worksheet(str_name_sheet)
+            if style_manager is None:
+                style_manager = Excel_Style(strict=self.strict)
+            return style_manager.format_conditional_ranges(self._workbook, str_name_sheet, operations)
+        except Exception as e:
+            return report_exception(self.strict, "Error creating conditional formatting", e, False)
+
+    def insert_image(self, str_name_sheet, cell_ref, image_path, scale_width=1.0, scale_height=1.0,
+                     downscale=False, quality=None):
+        """
+        Insert an image anchored at cell_ref. Files are read and decoded once per workbook and
+        the same image placed several times is stored once in the file. downscale=True stores
+        the pixels at the displayed size when smaller; quality re-encodes JPEGs at that quality
+        (PNGs are re-saved optimized) when it makes them smaller.
+        """
+        try:
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' not exists."), False)
+            if PILImage is None:
+                return report_error(self.strict, MissingDependencyError(
+                    "Pillow is required to insert images."), False)
             if not os.path.exists(image_path):
-                print(f"File ảnh '{image_path}' not exists.")
-                return False
+                return report_error(self.strict, OperationError(f"File ảnh '{image_path}' not exists."), False)
                 
-            sheet = self.workbook[str_name_sheet]
-            img = Image(image_path)
+            entry = self._image_cache.load(image_path)
+            self.__mark_dirty(str_name_sheet)
+            sheet = self.__worksheet(str_name_sheet)
             # Điều chỉnh kích thước ảnh
-            img.width = img.width * scale_width
-            img.height = img.height * scale_height
+            width, height = entry.width * scale_width, entry.height * scale_height
+            size = (max(1, math.ceil(width)), max(1, math.ceil(height))) if downscale else None
+            img = SharedImage(self._image_cache.variant(entry, size, quality))
+            img.width, img.height = width, height
             sheet.add_image(img, cell_ref)
             return True
         except Exception as e:
-            print(f"Error inserting image: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error inserting image", e, False)
+
+    def get_image_cache_info(self):
+        """Hits/misses of the image cache, distinct images held and their bytes"""
+        return self._image_cache.get_info()
 
     def set_formula(self, str_name_sheet, cell_ref, formula):
         """Set Excel formula in a cell"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
-            if isinstance(cell_ref, str) and self.__validate_cell_reference(cell_ref):
-                sheet[cell_ref].value = formula
-            elif isinstance(cell_ref, tuple) and len(cell_ref) == 2:
-                sheet.cell(row=cell_ref[0], column=cell_ref[1]).value = formula
+            if self.mode == "stream":
+                cell_ref = cell_coordinates(cell_ref)
+                if cell_ref is None:
+                    return report_error(self.strict, InvalidReferenceError("Invalid cell reference format."), False)
+                return self.__stream_write(str_name_sheet, cell_ref[0], [formula], cell_ref[1])
+
+            cell_ref = cell_coordinates(cell_ref)
+            if cell_ref is None:
+                return report_error(self.strict, InvalidReferenceError("Invalid cell reference format."), False)
+            row, column = cell_ref
+            store = self._compact.get(str_name_sheet)
+            if store is not None:
+                store.set(row, column, formula)
             else:
-                print("Invalid cell reference format.")
-                return False
+                self.__sheet(str_name_sheet).cell(row=row, column=column).value = formula
+            self.__used_range(str_name_sheet).update(row, column, formula)
+            self.__cells_changed(str_name_sheet, row, column, row, column)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error setting formula", e, False)
+
+    def calculate(self, str_name_sheet=None):
+        """
+        Compute the formulas of a sheet (or of the whole workbook) whose value is not up to date.
+        Only formulas downstream of cells written since the last calculation are recomputed.
+        Once formulas have been evaluated, save() stores their values in the file.
+        """
+        try:
+            if str_name_sheet is not None and not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            self.__formulas().recalculate(str_name_sheet)
             return True
         except Exception as e:
-            print(f"Error setting formula: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error calculating formulas", e, False)
 
     def freeze_panes(self, str_name_sheet, cell_ref):
         """Freeze panes at specified cell"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            if self.mode == "stream" and self.__stream_state(str_name_sheet)["last_row"]:
+                return report_error(self.strict, UnsupportedOperationError(
+                    "Freeze panes must be set before the first row is streamed."), False)
+
+            sheet = self.__worksheet(str_name_sheet)
             sheet.freeze_panes = cell_ref
             return True
         except Exception as e:
-            print(f"Error setting freeze panes: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error setting freeze panes", e, False)
 
     def add_sort_filter(self, str_name_sheet, cell_range):
         """Add sort and filter to specified range"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            cell_range = self.__local_range(str_name_sheet, cell_range)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            sheet = self.__worksheet(str_name_sheet)
             sheet.auto_filter.ref = cell_range
             return True
         except Exception as e:
-            print(f"Error adding sort filter: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error adding sort filter", e, False)
 
     def merge_cells(self, str_name_sheet, cell_range):
         """Merge cells in specified range"""
         try:
-            if not self.__check_name_sheet__(str_name_sheet):
-                print(f"Sheet '{str_name_sheet}' does not exist.")
+            if not self.__check_writable():
                 return False
+            if not self.__check_name_sheet__(str_name_sheet):
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{str_name_sheet}' does not exist."), False)
+            cell_range = self.__local_range(str_name_sheet, cell_range)
+            self.__mark_dirty(str_name_sheet)
             
-            sheet = self.workbook[str_name_sheet]
+            sheet = self.__sheet(str_name_sheet)
+            if self.mode == "stream":
+                sheet.merged_cells.add(cell_range)
+                return True
             sheet.merge_cells(cell_range)
+            # Merging clears every cell but the top-left one
+            self._used_ranges.pop(str_name_sheet, None)
+            min_row, min_col, max_row, max_col = self.__range_bounds(sheet, cell_range)
+            self.__cells_changed(str_name_sheet, min_row, min_col, max_row, max_col)
             return True
         except Exception as e:
-            print(f"Error merging cells: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error merging cells", e, False)
 
-    def save(self, path_save=None):
-        """Save workbook to specified path or original path"""
+    def __compact_sheet_data(self):
+        """
+        Serialize the rows of the compact sheets to temporary files for write_workbook:
+        {sheet: (dimension reference, file)}. Their cell formats are registered on the way.
+        """
+        date_ids = {cls: self.__style_ids(number_format=number_format) for cls, number_format in TIME_FORMATS.items()}
+        sheet_data = {}
+        for str_name_sheet, store in self._compact.items():
+            rows_file = tempfile.TemporaryFile()
+            try:
+                dimension = store.write_xml(rows_file, self._workbook[str_name_sheet], self._workbook._cell_styles,
+                                            date_ids)
+            except BaseException:
+                rows_file.close()
+                for _, other in sheet_data.values():
+                    other.close()
+                raise
+            sheet_data[str_name_sheet] = (dimension, rows_file)
+        return sheet_data
+
+    def save(self, path_save=None, incremental=True):
+        """
+        Save workbook to specified path or original path.
+        The file is written to a temporary file next to the target, fsynced and renamed over it,
+        so a crash never leaves a half-written workbook. Without changes nothing is written
+        (save-as copies the source file); when only some sheets changed, only their parts and
+        the stylesheet are regenerated and every other part is copied from the source file.
+        incremental=False always regenerates the whole file.
+        """
         try:
+            if not self.__check_writable():
+                return False
             path = path_save if path_save else self.str_path_file_excel
-            self.workbook.save(path)
-            print(f"Workbook saved to {path}")
+            if self.mode == "stream":
+                # Write-only workbooks can be saved only once (__check_writable refuses anything after)
+                self._stream_saved = True
+                self.__stream_finish()
+                Python_Excel_Package.write_atomic(
+                    path, functools.partial(Python_Excel_Package.write_workbook, self._workbook))
+                logger.info("Workbook saved to %s", path)
+                return True
+
+            source = self.str_path_file_excel
+            # The source file can stand in for unchanged parts only if nobody rewrote it since
+            source_intact = (self._source_signature is not None
+                             and Python_Excel_Package.file_signature(source) == self._source_signature)
+            same_file = source_intact and os.path.exists(path) and os.path.samefile(source, path)
+            formula_values = None
+            if self._formula_engine is not None:
+                # Computed values are saved as the cached values of the formula cells
+                self._formula_engine.recalculate()
+                self._dirty_sheets |= self._formula_engine.changed_sheets
+                formula_values = self._formula_engine.cached_values()
+            dirty_sheets = self._dirty_sheets | self._shared_sheets
+            if self._sheet_loader is not None:
+                # mark_dirty() may name a sheet that was never accessed
+                for str_name_sheet in dirty_sheets:
+                    self._sheet_loader.load(str_name_sheet)
+            if not self.has_changes() and source_intact:
+                if same_file:
+                    logger.info("No changes to save.")
+                    return True
+                Python_Excel_Package.copy_atomic(source, path)
+            elif not (incremental and source_intact and not self._structure_changed and not self._workbook_shared
+                      and not self._compact
+                      and Python_Excel_Package.save_incremental(self._workbook, source, path, dirty_sheets,
+                                                                formula_values)):
+                self.__load_sheets(materialize=False)
+                sheet_data = self.__compact_sheet_data()
+                try:
+                    Python_Excel_Package.write_atomic(
+                        path, functools.partial(Python_Excel_Package.write_workbook, self._workbook,
+                                                formula_values=formula_values, sheet_data=sheet_data))
+                finally:
+                    for _, rows_file in sheet_data.values():
+                        rows_file.close()
+
+            if os.path.exists(source) and os.path.samefile(source, path):
+                # The file now holds the workbook as it is in memory
+                self._source_signature = Python_Excel_Package.file_signature(path)
+                self._dirty_sheets.clear()
+                self._structure_changed = False
+                if self._formula_engine is not None:
+                    self._formula_engine.changed_sheets.clear()
+            logger.info("Workbook saved to %s", path)
             return True
         except Exception as e:
-            print(f"Error saving workbook: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error saving workbook", e, False)
+
+    @classmethod
+    def append_rows(cls, str_path_file_excel, str_name_sheet, rows, start_column=1, strict=False):
+        """
+        Append rows below the last row of a sheet of an xlsx file and save it, without loading
+        the workbook: only the sheet's part is rewritten, its existing rows copied as bytes (see
+        Python_Excel_Package.append_rows). Files that cannot be appended in place (new file or
+        sheet, formatted empty rows after the data...) are loaded, written after their last data
+        row and saved. Returns (first row, last row) written, None on error or without rows
+        (the file is left untouched)
+        """
+        try:
+            if start_column < 1:
+                return report_error(strict, InvalidReferenceError("Rows and columns start at 1."), None)
+            if hasattr(rows, "tolist"):
+                rows = rows.tolist()
+            rows = [list(values) for values in rows]
+            if not rows:
+                logger.info("No rows to append to sheet '%s'.", str_name_sheet)
+                return None
+            if os.path.exists(str_path_file_excel):
+                appended = Python_Excel_Package.append_rows(str_path_file_excel, str_name_sheet, rows, start_column)
+                if appended is not None:
+                    logger.info("Appended rows %s to %s of sheet '%s' in place.", appended[0], appended[1],
+                                str_name_sheet)
+                    return appended
+                logger.info("Sheet '%s' cannot be appended in place, loading the workbook.", str_name_sheet)
+            workbook = cls(str_path_file_excel, str_name_sheet, strict=strict)
+            try:
+                last_row = workbook.check_last_data_cell(str_name_sheet)[0]
+                if not workbook.write_rows(str_name_sheet, last_row + 1, rows, start_column=start_column) \
+                        or not workbook.save():
+                    return None
+            finally:
+                workbook.close()
+            return (last_row + 1, last_row + len(rows))
+        except Exception as e:
+            return report_exception(strict, "Error appending rows", e, None)
+
+    @classmethod
+    def set_async_executor(cls, executor):
+        """Use executor (e.g. a ThreadPoolExecutor sized for the service) for the async API"""
+        cls._async_executor = executor
+
+    @classmethod
+    def _get_async_executor(cls):
+        if cls._async_executor is None:
+            cls._async_executor = ThreadPoolExecutor(max_workers=cls.async_max_workers,
+                                                     thread_name_prefix="Excel_WorkBook")
+        return cls._async_executor
+
+    @classmethod
+    async def aopen(cls, str_path_file_excel, str_name_sheet="Sheet", mode="normal", strict=False, compact=False):
+        """
+        Async counterpart of Excel_WorkBook(...): parsing runs in the shared executor,
+        so at most async_max_workers workbooks are loaded/saved at the same time
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._get_async_executor(),
+                                          functools.partial(cls, str_path_file_excel, str_name_sheet, mode=mode,
+                                                            strict=strict, compact=compact))
+
+    async def __run_async(self, method, *args):
+        """
+        Run a blocking method in the shared executor, one operation at a time per workbook.
+        The lock only orders async calls: synchronous methods called while one is pending run
+        concurrently with it, so callers await pending async calls before writing
+        """
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_async_executor(), functools.partial(method, *args))
+
+    async def asave(self, path_save=None):
+        """
+        Async counterpart of save(): serialization and file I/O run in the shared executor.
+        Await it before calling synchronous methods of this workbook (see __run_async)
+        """
+        return await self.__run_async(self.save, path_save)
+
+    async def aread_range(self, str_name_sheet, start_cell, end_cell):
+        """Async counterpart of read_range()"""
+        return await self.__run_async(self.read_range, str_name_sheet, start_cell, end_cell)
 
     def close(self):
         """Close workbook"""
         try:
-            self.workbook.close()
-            print("Workbook closed successfully.")
+            self._workbook.close()
+            self._compact.clear()
+            self._image_cache.clear()
+            if self._sheet_loader is not None:
+                self._sheet_loader.close()
+            logger.info("Workbook closed successfully.")
             return True
         except Exception as e:
-            print(f"Error closing workbook: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error closing workbook", e, False)
 
     def check_last_data_cell(self, str_name_sheet):
             """
-            Trong thư viện openpyxl, xác định ô cuối cùng có dữ liệu bằng cách sử dụng thuộc tính max_row và max_column của sheet, 
-            kết hợp với việc kiểm tra thực tế các ô từ cuối sheet trở lên. Tuy nhiên, max_row và max_column chỉ cho biết phạm vi lớn nhất mà sheet đã sử dụng, 
-            chứ không đảm bảo rằng mọi ô trong phạm vi đó đều có dữ liệu. 
-            Vì vậy, chúng ta cần một phương pháp quét ngược từ cuối sheet để tìm chính xác ô cuối cùng có dữ liệu, và sau đó kiểm tra các ô tiếp theo một cách hiệu quả hơn.
+            Return (last_row, last_col, is_clean): the last row holding data, the last column holding
+            data in that row, and whether no data lies right of that column in any other row.
+            max_row/max_column only give the largest range the sheet has used (formatted empty cells
+            included), so the answer comes from the used-range index kept by the write_* methods,
+            built once from the sheet's cell dict: no scan, and no empty cells are created.
             """
             try:
                 if not self.__check_name_sheet__(str_name_sheet):
-                    print(f"Sheet '{str_name_sheet}' does not exist.")
-                    return None
+                    return report_error(self.strict, SheetNotFoundError(
+                        f"Sheet '{str_name_sheet}' does not exist."), None)
+                if self.mode == "stream":
+                    return report_error(self.strict, UnsupportedOperationError(
+                        "Checking the last data cell is not available in stream mode."), None)
                 
-                sheet = self.workbook[str_name_sheet]
-                max_row = sheet.max_row or 1
-                max_col = sheet.max_column or 1
-
-                # Start from the bottom-right cell and scan backwards to find the last cell with data
-                last_row = 0
-                last_col = 0
-                for row in range(max_row, 0, -1):
-                    for col in range(max_col, 0, -1):
-                        if sheet.cell(row=row, column=col).value is not None:
-                            last_row = row
-                            last_col = col
-                            break
-                    if last_row > 0:
-                        break
-
-                if last_row == 0 or last_col == 0:
-                    print("No data found in the sheet.")
-                    return (0, 0, True)
-
-                # Check a reasonable range after the last cell (e.g., next 1000 rows or columns)
-                check_range = 1000
-                is_clean = True
-                # Check rows after last_row
-                for row in range(last_row + 1, min(last_row + check_range + 1, max_row + 1)):
-                    for col in range(1, max_col + 1):
-                        if sheet.cell(row=row, column=col).value is not None:
-                            is_clean = False
-                            print(f"Unexpected data found at row {row}, column {col}")
-                            break
-                    if not is_clean:
-                        break
-                # Check columns after last_col
-                for col in range(last_col + 1, min(last_col + check_range + 1, max_col + 1)):
-                    for row in range(1, last_row + 1):
-                        if sheet.cell(row=row, column=col).value is not None:
-                            is_clean = False
-                            print(f"Unexpected data found at row {row}, column {col}")
-                            break
-                    if not is_clean:
-                        break
+                sheet = self.__worksheet(str_name_sheet)
+                if self.mode == "read":
+                    # Random access re-parses a read-only sheet, so scan it once instead
+                    last_row = last_col = used_col = 0
+                    for row, values in enumerate(sheet.iter_rows(min_row=1, values_only=True), start=1):
+                        cols = [col for col, value in enumerate(values, start=1) if value is not None]
+                        if cols:
+                            last_row, last_col = row, cols[-1]
+                            used_col = max(used_col, last_col)
+                    if last_row == 0:
+                        logger.info("No data found in the sheet.")
+                        return (0, 0, True)
+                    return (last_row, last_col, used_col == last_col)
 
+                last_row, last_col, is_clean = self.__used_range(str_name_sheet).last_data_cell()
+                if last_row == 0:
+                    logger.info("No data found in the sheet.")
+                elif not is_clean:
+                    logger.info("Unexpected data found after column %s", last_col)
                 return (last_row, last_col, is_clean)
             except Exception as e:
-                print(f"Error checking last data cell: {str(e)}")
-                return None
\ No newline at end of file
+                return report_exception(self.strict, "Error checking last data cell", e, None)
\ No newline at end of file
@@ -0,0 +1,600 @@
+import os
+import re
+import shutil
+import struct
+import warnings
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO
+from uuid import uuid4
+from xml.sax.saxutils import escape
+
+from openpyxl import Workbook
+from openpyxl.cell import MergedCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE, TIME_FORMATS
+from openpyxl.comments.comment_sheet import CommentSheet
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.packaging.manifest import Manifest
+from openpyxl.packaging.relationship import RelationshipList, get_dependents
+from openpyxl.pivot.table import TableDefinition
+from openpyxl.reader.drawings import find_images
+from openpyxl.reader.excel import ExcelReader, _find_workbook_part
+from openpyxl.reader.workbook import WorkbookParser
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+from openpyxl.styles.stylesheet import apply_stylesheet, write_stylesheet
+from openpyxl.worksheet._reader import WorksheetReader
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.worksheet.table import Table
+from openpyxl.xml.constants import ARC_CONTENT_TYPES, ARC_STYLE, COMMENTS_NS, STYLES_TYPE
+from openpyxl.xml.functions import fromstring, tostring
+from openpyxl.packaging.relationship import get_rels_path
+from openpyxl.utils.datetime import to_excel
+
+from Python_Excel_Formula import ExcelError
+from Python_Excel_Image import ImageEntry, SharedImage
+from Python_Excel_Reference import column_letter, parse_range, range_reference
+
+# The rows of a worksheet part, and its used range
+_SHEET_DATA_RE = re.compile(rb"<sheetData\s*/>|<sheetData>.*?</sheetData>", re.S)
+_DIMENSION_RE = re.compile(rb'<dimension ref="([^"]*)"\s*/>')
+# A formula cell as openpyxl writes it: no cached value
+_FORMULA_CELL_RE = re.compile(rb'<c r="([A-Z]{1,3}[0-9]+)"([^>]*)><f>([^<]*)</f>(?:<v\s*/>|<v></v>)')
+# Start of the rows of a worksheet part (group 1 is "/" when it holds none), the number of
+# a row, and what makes a cell hold data rather than only a style
+_SHEET_DATA_START_RE = re.compile(rb"<sheetData\s*(/?)>")
+_ROW_NUMBER_RE = re.compile(rb'<row\b[^>]*?\sr="([0-9]+)"')
+_CELL_DATA_RE = re.compile(rb"<(?:v|is|f)[\s/>]")
+# Local file header of a zip entry
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+def file_signature(path):
+    """Return (size, mtime) of a file, None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def write_atomic(path, write):
+    """
+    Call write(stream) on a temporary file next to path, fsync it and rename it over path.
+    A crash or an error leaves the previous file untouched.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(folder, f".~{os.path.basename(path)}.{uuid4().hex}.tmp")
+    try:
+        with open(temp_path, "xb") as stream:
+            write(stream)
+            stream.flush()
+            os.fsync(stream.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # Make the rename itself durable (directories cannot be opened on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        folder_fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(folder_fd)
+        finally:
+            os.close(folder_fd)
+
+
+def copy_atomic(source_path, path):
+    """Copy source_path to path byte for byte, atomically"""
+    def write(stream):
+        with open(source_path, "rb") as source:
+            shutil.copyfileobj(source, stream, 1024 * 1024)
+    write_atomic(path, write)
+
+
+def read_package(archive):
+    """
+    Return (workbook part, styles part, {sheet title: worksheet part}) of an open xlsx zip,
+    part names without the leading '/'
+    """
+    manifest = Manifest.from_tree(fromstring(archive.read(ARC_CONTENT_TYPES)))
+    workbook_part = _find_workbook_part(manifest).PartName[1:]
+    parser = WorkbookParser(archive, workbook_part)
+    parser.parse()
+    sheets = {sheet.name: rel.target.lstrip("/") for sheet, rel in parser.find_sheets()}
+    styles = manifest.find(STYLES_TYPE)
+    return workbook_part, styles.PartName[1:] if styles else None, sheets
+
+
+class LazyReader(ExcelReader):
+    """
+    Load a workbook without parsing its worksheets: each worksheet starts as an empty
+    placeholder (title, position and state only) and its XML is parsed by load() on first use.
+    The file is read into memory once, so it may be replaced on disk meanwhile.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as source:
+            self._buffer = BytesIO(source.read())
+        super().__init__(self._buffer)
+        # {sheet title: (placeholder worksheet, relationship)} of the sheets not parsed yet
+        self.pending = {}
+        # {content hash: ImageEntry} of the images read, shared by all their placements
+        self.images = {}
+
+    def read(self):
+        super().read()
+        # ExcelReader closes its archive, the buffer itself stays open for load()
+        self.archive = zipfile.ZipFile(self._buffer)
+
+    def read_worksheets(self):
+        for sheet, rel in self.parser.find_sheets():
+            if rel.target not in self.valid_files:
+                continue
+            if "chartsheet" in rel.Type:
+                self.read_chartsheet(sheet, rel)
+                continue
+            ws = self.wb.create_sheet(sheet.name)
+            ws.sheet_state = sheet.state
+            self.pending[sheet.name] = (ws, rel)
+
+    def load(self, title):
+        """Parse a placeholder worksheet, as openpyxl.load_workbook would have"""
+        entry = self.pending.pop(title, None)
+        if entry is None:
+            return
+        ws, rel = entry
+        rels_path = get_rels_path(rel.target)
+        rels = RelationshipList()
+        if rels_path in self.valid_files:
+            rels = get_dependents(self.archive, rels_path)
+        ws._rels = rels
+        with self.archive.open(rel.target) as source:
+            ws_parser = WorksheetReader(ws, source, self.shared_strings, self.data_only, self.rich_text)
+            ws_parser.bind_all()
+
+        for r in rels.find(COMMENTS_NS):
+            comment_sheet = CommentSheet.from_tree(fromstring(self.archive.read(r.target)))
+            for ref, comment in comment_sheet.comments:
+                # Merged cells cannot hold comments, openpyxl drops them too
+                if not isinstance(ws[ref], MergedCell):
+                    ws[ref].comment = comment
+        ws.legacy_drawing = None
+        for table in ws_parser.tables:
+            ws.add_table(Table.from_tree(fromstring(self.archive.read(table))))
+        for r in rels.find(SpreadsheetDrawing._rel_type):
+            charts, images = find_images(self.archive, r.target)
+            for chart in charts:
+                ws.add_chart(chart, chart.anchor)
+            for image in images:
+                ws.add_image(self.__shared_image(image), image.anchor)
+        for r in rels.find(TableDefinition.rel_type):
+            pivot = TableDefinition.from_tree(fromstring(self.archive.read(r.Target)))
+            pivot.cache = self.parser.pivot_caches[pivot.cacheId]
+            ws.add_pivot(pivot)
+
+    def __shared_image(self, image):
+        """The same image as a SharedImage, so the copies of one picture are saved as one part again"""
+        if image.format not in ("png", "jpeg", "gif") or not hasattr(image.ref, "getvalue"):
+            return image
+        entry = ImageEntry(image.ref.getvalue(), image.format, image.width, image.height)
+        return SharedImage(self.images.setdefault(entry.digest, entry))
+
+    def load_all(self):
+        """Parse every remaining placeholder worksheet"""
+        for title in list(self.pending):
+            self.load(title)
+
+    def discard(self, title):
+        """Forget a placeholder worksheet removed from the workbook"""
+        self.pending.pop(title, None)
+
+    def close(self):
+        self.archive.close()
+
+
+def load_workbook_lazy(path):
+    """Return (workbook, LazyReader) of an xlsx file whose worksheets are parsed on first use"""
+    reader = LazyReader(path)
+    reader.read()
+    return reader.wb, reader
+
+
+def _cached_value(value):
+    """Return (type attribute, <v> text) of a computed formula value"""
+    if isinstance(value, ExcelError):
+        return b' t="e"', value.code.encode("utf-8")
+    if isinstance(value, bool):
+        return b' t="b"', b"1" if value else b"0"
+    if isinstance(value, (datetime, date, time, timedelta)):
+        value = to_excel(value)
+    if isinstance(value, (int, float)):
+        return b"", repr(value).encode("utf-8")
+    return b' t="str"', escape(str(value)).encode("utf-8")
+
+
+def set_cached_values(xml, values):
+    """Fill the empty <v> of the formula cells of a worksheet part with {(row, col): value}"""
+    if not values:
+        return xml
+    cached = {f"{column_letter(col)}{row}".encode("ascii"): value for (row, col), value in values.items()}
+
+    def fill(match):
+        coordinate = match.group(1)
+        if coordinate not in cached:
+            return match.group(0)
+        data_type, text = _cached_value(cached[coordinate])
+        return b'<c r="%s"%s%s><f>%s</f><v>%s</v>' % (coordinate, match.group(2), data_type, match.group(3), text)
+    return _FORMULA_CELL_RE.sub(fill, xml)
+
+
+def cell_xml(reference, style, value):
+    """XML of a data cell with the style attribute style (' s="3"' or ""), None for an empty value"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, bool):
+        return f'<c r="{reference}"{style} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (datetime, date, time, timedelta)):
+        # The cell's number format decides how the serial number is shown
+        value = to_excel(value)
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{reference}"{style}><v>{value!r}</v></c>' if isinstance(value, float) else \
+            f'<c r="{reference}"{style}><v>{value}</v></c>'
+    value = str(value)
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise ValueError(f"Cell {reference} holds characters that cannot be used in worksheets.")
+    if value.startswith("=") and len(value) > 1:
+        return f'<c r="{reference}"{style}><f>{escape(value[1:])}</f><v></v></c>'
+    space = ' xml:space="preserve"' if value != value.strip() else ""
+    return f'<c r="{reference}"{style} t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>'
+
+
+def write_workbook(workbook, stream, formula_values=None, sheet_data=None):
+    """
+    Write a full openpyxl save of workbook to stream, with formula_values
+    ({sheet: {(row, col): value}}) stored as the cached values of the formula cells and
+    the <sheetData> of the sheets in sheet_data ({sheet: (dimension reference, binary file
+    holding the rows)}) copied from their file instead of what openpyxl wrote. Images placed
+    several times (SharedImage) are stored once.
+    """
+    shared_images = any(isinstance(image, SharedImage) for worksheet in workbook.worksheets
+                        for image in getattr(worksheet, "_images", ()))
+    if not formula_values and not sheet_data and not shared_images:
+        workbook.save(stream)
+        return
+    buffer = BytesIO()
+    with warnings.catch_warnings():
+        # openpyxl writes the media part of a SharedImage once per placement, the copies are dropped below
+        warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+        workbook.save(buffer)
+    # Worksheet paths are assigned while saving
+    patches = {workbook[name].path[1:]: values for name, values in (formula_values or {}).items()
+               if name in workbook.sheetnames and values}
+    rows = {workbook[name].path[1:]: data for name, data in (sheet_data or {}).items()}
+    written = set()
+    with zipfile.ZipFile(buffer) as source, \
+            zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as target:
+        for info in source.infolist():
+            if info.filename in written:
+                continue
+            written.add(info.filename)
+            data = source.read(info)
+            if info.filename in patches:
+                data = set_cached_values(data, patches[info.filename])
+            if info.filename in rows:
+                dimension, rows_file = rows[info.filename]
+                match = _SHEET_DATA_RE.search(data)
+                head = _DIMENSION_RE.sub(b'<dimension ref="%s"/>' % dimension.encode("ascii"), data[:match.start()], 1)
+                rows_file.seek(0)
+                part = zipfile.ZipInfo(info.filename, info.date_time)
+                part.compress_type = zipfile.ZIP_DEFLATED
+                with target.open(part, "w", force_zip64=True) as out:
+                    out.write(head + b"<sheetData>")
+                    shutil.copyfileobj(rows_file, out, 1024 * 1024)
+                    out.write(b"</sheetData>" + data[match.end():])
+                continue
+            target.writestr(info, data)
+
+
+def _serialize_sheet(worksheet):
+    """Serialize a worksheet, None if it needs relationships (images, links, comments, tables...)"""
+    if worksheet._images or worksheet._charts or worksheet.legacy_drawing is not None:
+        return None
+    writer = WorksheetWriter(worksheet, out=BytesIO())
+    writer.write()
+    if writer._rels or worksheet._comments:
+        return None
+    return writer.read()
+
+
+def reset_calculation(parts, workbook_part):
+    """
+    Remove the calculation chain, which may list formula cells of the rewritten sheets that
+    no longer exist, and ask Excel to recalculate on load (new formulas may have no cached value)
+    """
+    rels_part = get_rels_path(workbook_part)
+    rels = parts[rels_part].decode("utf-8")
+    match = re.search(r'<Relationship\b[^>]*?Target="([^"]*calcChain[^"]*)"[^>]*/>', rels)
+    if match:
+        parts[rels_part] = rels.replace(match.group(0), "").encode("utf-8")
+        target = match.group(1)
+        if target.startswith("/"):
+            calc_chain = target[1:]
+        else:
+            calc_chain = os.path.normpath(os.path.join(os.path.dirname(workbook_part), target)).replace(os.sep, "/")
+        parts[calc_chain] = None
+        content_types = parts[ARC_CONTENT_TYPES].decode("utf-8")
+        content_types = re.sub(r'<Override\b[^>]*?PartName="/%s"[^>]*/>' % re.escape(calc_chain), "", content_types)
+        parts[ARC_CONTENT_TYPES] = content_types.encode("utf-8")
+
+    workbook = parts[workbook_part].decode("utf-8")
+    calc_pr = re.search(r"<(\w+:)?calcPr\b[^>]*?(/?)>", workbook)
+    if calc_pr:
+        if "fullCalcOnLoad" not in calc_pr.group(0):
+            tag = calc_pr.group(0)
+            end = len(tag) - (2 if tag.endswith("/>") else 1)
+            workbook = workbook.replace(tag, tag[:end] + ' fullCalcOnLoad="1"' + tag[end:], 1)
+    else:
+        # calcPr follows sheets, externalReferences and definedNames
+        closing = [match for match in re.finditer(r"</(\w+:)?(sheets|externalReferences|definedNames)>", workbook)]
+        if closing:
+            prefix = closing[-1].group(1) or ""
+            position = closing[-1].end()
+            workbook = workbook[:position] + f'<{prefix}calcPr fullCalcOnLoad="1"/>' + workbook[position:]
+    parts[workbook_part] = workbook.encode("utf-8")
+
+
+def save_incremental(workbook, source_path, path, sheet_names, formula_values=None):
+    """
+    Save workbook to path by rewriting only the worksheet parts of sheet_names and the
+    stylesheet; every other part (unchanged sheets, images, charts...) is copied from
+    source_path, which must hold the workbook as it was loaded.
+    formula_values ({sheet: {(row, col): value}}) are stored as cached formula values.
+    Returns False, without writing anything, when the sheets cannot be rewritten in place
+    (new sheets, or sheets holding images, charts, comments, hyperlinks or tables).
+    """
+    with zipfile.ZipFile(source_path) as source:
+        workbook_part, styles_part, sheet_parts = read_package(source)
+        if styles_part is None or not set(sheet_names) <= set(sheet_parts):
+            return False
+
+        # Rewritten parts, None removes the part from the package
+        parts = {}
+        for name in sheet_names:
+            # The sheet's relationship part, if any, is kept: parts the new XML no longer
+            # refers to (printer settings...) are harmless
+            xml = _serialize_sheet(workbook[name])
+            if xml is None:
+                return False
+            parts[sheet_parts[name]] = set_cached_values(xml, (formula_values or {}).get(name))
+        # Written after the sheets, which may add new cell formats to the workbook tables
+        parts[styles_part] = tostring(write_stylesheet(workbook))
+        for part in (workbook_part, get_rels_path(workbook_part), ARC_CONTENT_TYPES):
+            parts[part] = source.read(part)
+        reset_calculation(parts, workbook_part)
+
+        def write(stream):
+            with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as target:
+                for info in source.infolist():
+                    if info.filename not in parts:
+                        _copy_compressed(source, info, target)
+                    elif parts[info.filename] is not None:
+                        target.writestr(info.filename, parts[info.filename])
+        write_atomic(path, write)
+    return True
+
+
+# ZipFile internals the raw copy of _copy_compressed writes to
+_RAW_COPY_ATTRIBUTES = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify")
+
+
+def _can_copy_raw(source, target):
+    """Whether _copy_compressed can copy stored bytes: zipfile keeps the internals it relies on"""
+    return (all(hasattr(target, name) for name in _RAW_COPY_ATTRIBUTES) and hasattr(source, "fp")
+            and not getattr(target, "_writing", False) and hasattr(zipfile.ZipInfo, "FileHeader"))
+
+
+def _copy_compressed(source, info, target):
+    """
+    Copy a part of the source zip to the target zip as it is stored, without inflating and
+    deflating it again. zipfile has no public API for this: the entry is written the way
+    ZipFile.write() writes one, from the sizes and CRC the source already records. Where
+    zipfile lacks those internals the part is streamed through ZipFile.open() instead
+    """
+    # A fresh ZipInfo: writing updates offsets the source still reads from
+    copied = zipfile.ZipInfo(info.filename, info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.file_size = info.file_size
+    if not _can_copy_raw(source, target):
+        with source.open(info) as part, target.open(copied, "w") as stream:
+            shutil.copyfileobj(part, stream, 1024 * 1024)
+        return
+
+    source.fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(source.fp.read(_LOCAL_HEADER.size))
+    # Skip the file name and extra field of the local header
+    source.fp.seek(header[10] + header[11], os.SEEK_CUR)
+    copied.CRC, copied.compress_size = info.CRC, info.compress_size
+    copied.header_offset = target.fp.tell()
+    target.fp.write(copied.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.fp.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated part {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+    target.filelist.append(copied)
+    target.NameToInfo[copied.filename] = copied
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+class _NotAppendable(Exception):
+    """The worksheet part cannot take new rows in place"""
+
+
+def _date_type(value):
+    """Type whose default number format a date, time or duration value gets, None for other values"""
+    for cls in (datetime, date, time, timedelta):
+        if isinstance(value, cls):
+            return cls
+    return None
+
+
+def _date_styles(archive, types):
+    """
+    Cell format ids giving values of types (datetime, date, time, timedelta) their default
+    number format, with the new stylesheet XML when formats had to be added (None otherwise)
+    """
+    workbook = Workbook()
+    apply_stylesheet(archive, workbook)
+    counts = (len(workbook._cell_styles), len(workbook._number_formats))
+    ids = {}
+    for cls in types:
+        number_format = TIME_FORMATS[cls]
+        style_array = StyleArray()
+        if number_format in BUILTIN_FORMATS_REVERSE:
+            style_array.numFmtId = BUILTIN_FORMATS_REVERSE[number_format]
+        else:
+            style_array.numFmtId = workbook._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+        ids[cls] = workbook._cell_styles.add(style_array)
+    if (len(workbook._cell_styles), len(workbook._number_formats)) == counts:
+        return ids, None
+    return ids, tostring(write_stylesheet(workbook))
+
+
+def _rows_xml(rows, first_row, start_column, date_ids):
+    """<row> elements of rows of values numbered from first_row, text as inline strings"""
+    width = max((len(values) for values in rows), default=0)
+    letters = [column_letter(col) for col in range(start_column, start_column + width)]
+    parts = []
+    for row, values in enumerate(rows, start=first_row):
+        cells = []
+        for letter, value in zip(letters, values):
+            cls = _date_type(value)
+            style = f' s="{date_ids[cls]}"' if cls is not None and date_ids[cls] else ""
+            cell = cell_xml(f"{letter}{row}", style, value)
+            if cell is not None:
+                cells.append(cell)
+        if cells:
+            parts.append(f'<row r="{row}">{"".join(cells)}</row>')
+    return "".join(parts).encode("utf-8")
+
+
+def _append_to_part(source, info, target, rows, start_column, date_ids):
+    """
+    Copy a worksheet part from source to target with rows added after its last row, updating
+    its dimension. The rows already there are copied as bytes, not parsed: only the last one
+    is looked at. Returns (first row, last row) written; raises _NotAppendable when the part
+    ends with rows holding no data (formatted empty rows) or does not look as expected
+    """
+    width = max((len(values) for values in rows), default=0)
+    part = zipfile.ZipInfo(info.filename, info.date_time)
+    part.compress_type = zipfile.ZIP_DEFLATED
+    with source.open(info) as data, target.open(part, "w", force_zip64=True) as out:
+        pending = b""
+        while True:
+            chunk = data.read(1024 * 1024)
+            pending += chunk
+            start = _SHEET_DATA_START_RE.search(pending)
+            if start is not None:
+                break
+            if not chunk:
+                raise _NotAppendable(f"No rows in {info.filename}")
+        head, pending = pending[:start.end()], pending[start.end():]
+        empty = bool(start.group(1))
+        dimension = _DIMENSION_RE.search(head)
+        expected_row = 0
+        if dimension is not None:
+            if empty:
+                ref = range_reference(1, start_column, len(rows), max(start_column + width - 1, start_column))
+            else:
+                _, min_row, min_col, expected_row, max_col = parse_range(dimension.group(1).decode("ascii"))
+                ref = range_reference(min_row, min(min_col, start_column), expected_row + len(rows),
+                                      max(max_col, start_column + width - 1))
+            head = head[:dimension.start()] + b'<dimension ref="%s"/>' % ref.encode("ascii") + head[dimension.end():]
+        if empty:
+            first_row = 1
+            out.write(head[:start.start()] + b"<sheetData>" + _rows_xml(rows, first_row, start_column, date_ids)
+                      + b"</sheetData>" + pending)
+            shutil.copyfileobj(data, out, 1024 * 1024)
+            return (first_row, len(rows))
+        out.write(head)
+        # Stream the rows through, holding back the last (possibly incomplete) row element
+        while True:
+            end = pending.find(b"</sheetData>")
+            if end != -1:
+                break
+            last = pending.rfind(b"<row")
+            keep = len(pending) - last if last != -1 else min(len(pending), 16)
+            out.write(pending[:len(pending) - keep])
+            pending = pending[len(pending) - keep:]
+            chunk = data.read(1024 * 1024)
+            if not chunk:
+                raise _NotAppendable(f"Unterminated rows in {info.filename}")
+            pending += chunk
+        last = pending.rfind(b"<row", 0, end)
+        last_row = 0
+        if last != -1:
+            element = pending[last:end]
+            number = _ROW_NUMBER_RE.match(element)
+            if number is None or not _CELL_DATA_RE.search(element):
+                raise _NotAppendable(f"The last row of {info.filename} holds no data")
+            last_row = int(number.group(1))
+        if dimension is not None and last_row != expected_row:
+            raise _NotAppendable(f"The dimension of {info.filename} does not end on its last row")
+        first_row = last_row + 1
+        out.write(pending[:end] + _rows_xml(rows, first_row, start_column, date_ids) + pending[end:])
+        shutil.copyfileobj(data, out, 1024 * 1024)
+    return (first_row, last_row + len(rows))
+
+
+def append_rows(path, sheet_name, rows, start_column=1):
+    """
+    Append rows (a list of sequences of values) below the last row of a sheet of the xlsx
+    file at path without loading the workbook. The sheet's part is copied as bytes with the
+    rows added at the end of its <sheetData> (text as inline strings, so the shared strings
+    are left alone) and every other part is copied still compressed: the cost follows the new
+    rows and the size of that one part, not the rows already parsed. The stylesheet is only
+    rewritten when dates need a number format it lacks, the workbook part when formulas are
+    appended. Returns (first row, last row) written, or None, without touching the file, when
+    the rows cannot be appended in place (no such sheet, formatted empty rows after the data...)
+    """
+    with zipfile.ZipFile(path) as source:
+        workbook_part, styles_part, sheet_parts = read_package(source)
+        sheet_part = sheet_parts.get(sheet_name)
+        if sheet_part is None or styles_part != ARC_STYLE:
+            return None
+        parts = {}
+        types = {_date_type(value) for values in rows for value in values} - {None}
+        date_ids = {}
+        if types:
+            date_ids, styles = _date_styles(source, types)
+            if styles is not None:
+                parts[styles_part] = styles
+        if any(isinstance(value, str) and value.startswith("=") and len(value) > 1 for values in rows for value in values):
+            # New formulas have no cached value: Excel must recalculate on load
+            for part in (workbook_part, get_rels_path(workbook_part), ARC_CONTENT_TYPES):
+                parts[part] = source.read(part)
+            reset_calculation(parts, workbook_part)
+        appended = []
+
+        def write(stream):
+            with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as target:
+                for info in source.infolist():
+                    if info.filename == sheet_part:
+                        appended.append(_append_to_part(source, info, target, rows, start_column, date_ids))
+                    elif info.filename not in parts:
+                        _copy_compressed(source, info, target)
+                    elif parts[info.filename] is not None:
+                        target.writestr(info.filename, parts[info.filename])
+        try:
+            write_atomic(path, write)
+        except _NotAppendable:
+            return None
+    return appended[0]
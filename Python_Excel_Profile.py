@@ -0,0 +1,324 @@
+import functools
+import inspect
+import json
+import os
+import pstats
+import threading
+import time
+
+import Python_Excel_Package
+from Python_Excel_Errors import logger
+from Python_Excel_Formula import FormulaEngine
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Reference import cell_coordinates, range_size
+from Python_Excel_Style import Excel_Style
+
+# Load/save phases below the Excel_WorkBook methods: (owner, attribute, phase name)
+PHASES = (
+    (Python_Excel_Package, "load_workbook_lazy", "load.workbook"),
+    (Python_Excel_Package.LazyReader, "load", "load.sheet"),
+    (FormulaEngine, "recalculate", "formulas.recalculate"),
+    (Python_Excel_Package, "save_incremental", "save.incremental"),
+    (Python_Excel_Package, "write_workbook", "save.full"),
+    (Python_Excel_Package, "copy_atomic", "save.copy"),
+    (Python_Excel_Package, "write_atomic", "save.write"),
+)
+
+
+def _argument(args, kwargs, index, name):
+    """Positional (after self) or keyword argument of an instrumented call, None if missing"""
+    if len(args) > index:
+        return args[index]
+    return kwargs.get(name)
+
+
+def _block_cells(start_cell, end_cell):
+    """Number of cells between two corners given as 'A1' or (row, column)"""
+    start, end = cell_coordinates(start_cell), cell_coordinates(end_cell)
+    if start is None or end is None:
+        return 0
+    return (abs(end[0] - start[0]) + 1) * (abs(end[1] - start[1]) + 1)
+
+
+def _sized(values):
+    return len(values) if hasattr(values, "__len__") else 0
+
+
+# Cells touched by a call: (args after self, kwargs, result) -> count. Cells are attributed to
+# the method doing the work: write_range/write_array/write_dataframe appear under write_rows,
+# format_cells under format_ranges.
+CELL_COUNTERS = {
+    "Excel_WorkBook.write_column": lambda args, kwargs, result: _sized(_argument(args, kwargs, 2, "list_content")),
+    "Excel_WorkBook.write_row": lambda args, kwargs, result: _sized(_argument(args, kwargs, 2, "list_content")),
+    "Excel_WorkBook.write_cell": lambda args, kwargs, result: 1,
+    "Excel_WorkBook.read_cell": lambda args, kwargs, result: 1,
+    "Excel_WorkBook.set_formula": lambda args, kwargs, result: 1,
+    "Excel_WorkBook.read_range": lambda args, kwargs, result: sum(map(_sized, result)) if result else 0,
+    "Excel_WorkBook.read_range_as_array": lambda args, kwargs, result: _block_cells(
+        _argument(args, kwargs, 1, "start_cell"), _argument(args, kwargs, 2, "end_cell")),
+    "Excel_WorkBook.format_ranges": lambda args, kwargs, result: sum(
+        range_size(cell_range) for cell_range, style in _argument(args, kwargs, 1, "operations") or ()),
+    "Excel_WorkBook.merge_cells": lambda args, kwargs, result: range_size(_argument(args, kwargs, 1, "cell_range")),
+    "Excel_Style.create_conditional_formatting": lambda args, kwargs, result: range_size(
+        _argument(args, kwargs, 1, "cell_range")),
+    "Excel_Style.get_cell_style": lambda args, kwargs, result: 1,
+}
+
+# File written by a call: (args, kwargs) -> path, whose size is measured after the call
+BYTE_COUNTERS = {
+    "Excel_WorkBook.save": lambda args, kwargs: _argument(args, kwargs, 1, "path_save") or args[0].str_path_file_excel,
+    "save.write": lambda args, kwargs: _argument(args, kwargs, 0, "path"),
+}
+
+
+class _CountingRows:
+    """Iterate over the rows given to write_rows, counting their cells on the way"""
+
+    def __init__(self, rows):
+        # NumPy arrays as write_rows converts them, which it no longer can once wrapped
+        self.rows = rows.tolist() if hasattr(rows, "tolist") else rows
+        self.cells = 0
+
+    def __iter__(self):
+        for values in self.rows:
+            if not hasattr(values, "__len__"):
+                values = list(values)
+            self.cells += len(values)
+            yield values
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of Excel_WorkBook, Excel_Style and the load/save phases.
+    While active, their public methods are wrapped to record call counts, cumulative and
+    own time, cells touched and bytes written; nothing is wrapped (no overhead) otherwise.
+
+        with Profiler() as profiler:
+            excel = Excel_WorkBook("report.xlsx", "DATA")
+            ...
+            excel.save()
+        profiler.print_stats()
+        profiler.to_json("profile.json")
+
+    Only one profiler can be active at a time. Calls made in other processes
+    (Python_Excel_Batch workers) are not recorded.
+    """
+
+    _active = None
+
+    def __init__(self, classes=(Excel_WorkBook, Excel_Style), phases=True):
+        self.classes = classes
+        self.phases = phases
+        # {name: [calls, own time, cumulative time, cells, bytes, {caller: [calls, own, cumulative]}]}
+        self.records = {}
+        # {name: (file, line, function)} for the cProfile-compatible summary
+        self._locations = {}
+        self._patched = []
+        self._lock = threading.Lock()
+        # Per-thread stack of [name, time spent in nested instrumented calls]
+        self._local = threading.local()
+        self.wall_time = 0.0
+        self._started = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    @property
+    def active(self):
+        return Profiler._active is self
+
+    def start(self):
+        """Wrap the instrumented methods; returns False if another profiler is active"""
+        if Profiler._active is not None:
+            logger.warning("Another profiler is already active.")
+            return Profiler._active is self
+        Profiler._active = self
+        for cls in self.classes:
+            for attribute, member in list(vars(cls).items()):
+                if attribute.startswith("_") and attribute != "__init__":
+                    continue
+                self.__patch(cls, attribute, member, f"{cls.__name__}.{attribute}")
+        if self.phases:
+            for owner, attribute, name in PHASES:
+                self.__patch(owner, attribute, vars(owner)[attribute], name)
+        self._started = time.perf_counter()
+        return True
+
+    def stop(self):
+        """Restore the original methods"""
+        if not self.active:
+            return False
+        for owner, attribute, member in reversed(self._patched):
+            setattr(owner, attribute, member)
+        self._patched.clear()
+        self.wall_time += time.perf_counter() - self._started
+        Profiler._active = None
+        return True
+
+    def reset(self):
+        """Drop the recorded statistics"""
+        with self._lock:
+            self.records.clear()
+        self.wall_time = 0.0
+
+    def __patch(self, owner, attribute, member, name):
+        """Replace owner.attribute by a recording wrapper"""
+        wrapper_type = None
+        function = member
+        if isinstance(member, (classmethod, staticmethod)):
+            wrapper_type, function = type(member), member.__func__
+        if not inspect.isfunction(function):
+            return
+        code = function.__code__
+        self._locations[name] = (code.co_filename, code.co_firstlineno, name)
+        wrapped = self.__wrap(function, name, bound=not inspect.ismodule(owner) and wrapper_type is not staticmethod)
+        self._patched.append((owner, attribute, member))
+        setattr(owner, attribute, wrapper_type(wrapped) if wrapper_type else wrapped)
+
+    def __wrap(self, function, name, bound):
+        cells = CELL_COUNTERS.get(name)
+        output = BYTE_COUNTERS.get(name)
+        enter, leave, record = self.__enter_call, self.__leave_call, self.__record
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                # Coroutines interleave on the event loop thread: no call stack, and the work
+                # itself is recorded by the blocking methods run in the executor
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    record(name, 0.0, time.perf_counter() - start, 0, 0, None, True)
+            return wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            counting = None
+            if name == "Excel_WorkBook.write_rows":
+                if len(args) > 3:
+                    counting = _CountingRows(args[3])
+                    args = args[:3] + (counting,) + args[4:]
+                elif "rows" in kwargs:
+                    counting = kwargs["rows"] = _CountingRows(kwargs["rows"])
+            frame = enter(name)
+            result = None
+            try:
+                result = function(*args, **kwargs)
+                return result
+            finally:
+                touched = 0
+                if counting is not None:
+                    touched = counting.cells
+                elif cells is not None:
+                    try:
+                        touched = cells(args[1:] if bound else args, kwargs, result)
+                    except Exception:
+                        touched = 0
+                path = None
+                if output is not None and result is not False:
+                    try:
+                        path = output(args, kwargs)
+                    except Exception:
+                        path = None
+                leave(frame, touched, path)
+        return wrapper
+
+    def __enter_call(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [name, 0.0, time.perf_counter()]
+        stack.append(frame)
+        return frame
+
+    def __leave_call(self, frame, cells, path):
+        elapsed = time.perf_counter() - frame[2]
+        stack = self._local.stack
+        stack.pop()
+        caller = stack[-1][0] if stack else None
+        if stack:
+            stack[-1][1] += elapsed
+        written = 0
+        if path is not None and isinstance(path, (str, os.PathLike)):
+            try:
+                written = os.path.getsize(path)
+            except OSError:
+                written = 0
+        # Recursive calls would count their time twice
+        outermost = all(outer[0] != frame[0] for outer in stack)
+        self.__record(frame[0], elapsed - frame[1], elapsed, cells, written, caller, outermost)
+
+    def __record(self, name, own, elapsed, cells, written, caller, outermost):
+        with self._lock:
+            record = self.records.get(name)
+            if record is None:
+                record = self.records[name] = [0, 0.0, 0.0, 0, 0, {}]
+            record[0] += 1
+            record[1] += own
+            if outermost:
+                record[2] += elapsed
+            record[3] += cells
+            record[4] += written
+            if caller is not None:
+                edge = record[5].setdefault(caller, [0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += own
+                edge[2] += elapsed
+
+    def get_stats(self):
+        """
+        Return {"wall_time", "methods": {name: stats}, "phases": {name: stats}} where stats holds
+        calls, cumulative_time, own_time, cells and bytes
+        """
+        phase_names = {name for owner, attribute, name in PHASES}
+        methods, phases = {}, {}
+        with self._lock:
+            for name, (calls, own, cumulative, cells, written, callers) in self.records.items():
+                target = phases if name in phase_names else methods
+                target[name] = {"calls": calls, "cumulative_time": cumulative, "own_time": own,
+                                "cells": cells, "bytes": written}
+        wall_time = self.wall_time
+        if self.active:
+            wall_time += time.perf_counter() - self._started
+        return {"wall_time": wall_time, "methods": methods, "phases": phases}
+
+    def to_json(self, path=None, indent=2):
+        """Return the statistics as JSON, also writing them to path if given"""
+        data = json.dumps(self.get_stats(), indent=indent)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as stream:
+                stream.write(data)
+        return data
+
+    def create_stats(self):
+        """Fill self.stats in the format of cProfile.Profile, for pstats.Stats(profiler)"""
+        self.stats = {}
+        with self._lock:
+            for name, (calls, own, cumulative, cells, written, callers) in self.records.items():
+                key = self._locations[name]
+                self.stats[key] = (calls, calls, own, cumulative,
+                                   {self._locations[caller]: tuple(edge[:1] * 2 + edge[1:])
+                                    for caller, edge in callers.items()})
+
+    def to_pstats(self):
+        """Return a pstats.Stats of the recorded calls (print_stats, sort_stats, dump_stats...)"""
+        return pstats.Stats(self)
+
+    def print_stats(self, sort="cumulative", limit=20):
+        """Print the busiest methods and phases, with cells touched and bytes written"""
+        stats = self.get_stats()
+        rows = list(stats["methods"].items()) + list(stats["phases"].items())
+        key = {"cumulative": "cumulative_time", "own": "own_time", "calls": "calls",
+               "cells": "cells", "bytes": "bytes"}.get(sort, "cumulative_time")
+        rows.sort(key=lambda item: item[1][key], reverse=True)
+        print(f"Wall time: {stats['wall_time']:.3f} s")
+        print(f"{'calls':>8} {'cumtime':>10} {'owntime':>10} {'cells':>12} {'bytes':>12}  name")
+        for name, row in rows[:limit]:
+            print(f"{row['calls']:>8} {row['cumulative_time']:>10.4f} {row['own_time']:>10.4f} "
+                  f"{row['cells']:>12} {row['bytes']:>12}  {name}")
@@ -0,0 +1,180 @@
+import re
+from functools import lru_cache
+from numbers import Integral
+
+from openpyxl.utils import get_column_letter
+
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+
+_A1_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?([1-9][0-9]*)$")
+_R1C1_RE = re.compile(r"^[Rr]([1-9][0-9]*)[Cc]([1-9][0-9]*)$")
+_COLUMN_RE = re.compile(r"^\$?([A-Za-z]{1,3})$")
+_ROW_RE = re.compile(r"^\$?([1-9][0-9]*)$")
+_SHEET_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^'!]+))!(.+)$")
+
+
+@lru_cache(maxsize=16384)
+def column_index(column):
+    """'A' -> 1, 'xfd' -> 16384"""
+    match = _COLUMN_RE.match(column)
+    if match is None:
+        raise ValueError(f"Invalid column '{column}'.")
+    index = 0
+    for letter in match.group(1).upper():
+        index = index * 26 + ord(letter) - 64
+    if index > MAX_COLUMN:
+        raise ValueError(f"Invalid column '{column}'.")
+    return index
+
+
+@lru_cache(maxsize=16384)
+def column_letter(index):
+    """1 -> 'A'"""
+    return get_column_letter(index)
+
+
+@lru_cache(maxsize=65536)
+def parse_cell(reference):
+    """'B3', '$B$3', 'b3' or 'R3C2' -> (3, 2), ValueError for anything else"""
+    match = _A1_RE.match(reference)
+    if match is not None:
+        row, col = int(match.group(2)), column_index(match.group(1))
+    else:
+        match = _R1C1_RE.match(reference)
+        if match is None:
+            raise ValueError(f"Invalid cell reference '{reference}'.")
+        row, col = int(match.group(1)), int(match.group(2))
+    if row > MAX_ROW or col > MAX_COLUMN:
+        raise ValueError(f"Invalid cell reference '{reference}'.")
+    return (row, col)
+
+
+def _parse_part(part):
+    """One side of a range: (row, col), (None, col) for a column, (row, None) for a row"""
+    try:
+        return parse_cell(part)
+    except ValueError:
+        pass
+    if _COLUMN_RE.match(part):
+        return (None, column_index(part))
+    match = _ROW_RE.match(part)
+    if match is not None and int(match.group(1)) <= MAX_ROW:
+        return (int(match.group(1)), None)
+    raise ValueError(f"Invalid range '{part}'.")
+
+
+@lru_cache(maxsize=16384)
+def parse_range(reference):
+    """
+    Parse 'A1:C3', 'B2', 'C:D', '3:5', 'R1C1:R3C3' or sheet-qualified "'My sheet'!A1:C3" into
+    (sheet or None, min_row, min_col, max_row, max_col); whole columns/rows have None row/col bounds
+    """
+    sheet = None
+    match = _SHEET_RE.match(reference)
+    if match is not None:
+        quoted, plain, reference = match.groups()
+        sheet = quoted.replace("''", "'") if quoted is not None else plain
+    parts = reference.split(":")
+    if len(parts) == 1:
+        (min_row, min_col) = (max_row, max_col) = parse_cell(parts[0])
+    elif len(parts) == 2:
+        (min_row, min_col), (max_row, max_col) = _parse_part(parts[0]), _parse_part(parts[1])
+        # Both sides must be of the same kind: cells, columns or rows
+        if (min_row is None) != (max_row is None) or (min_col is None) != (max_col is None):
+            raise ValueError(f"Invalid range '{reference}'.")
+        if min_row is not None and min_row > max_row:
+            min_row, max_row = max_row, min_row
+        if min_col is not None and min_col > max_col:
+            min_col, max_col = max_col, min_col
+    else:
+        raise ValueError(f"Invalid range '{reference}'.")
+    return (sheet, min_row, min_col, max_row, max_col)
+
+
+def range_reference(min_row, min_col, max_row, max_col):
+    """(min_row, min_col, max_row, max_col) -> 'A1:C3', 'B2', 'C:D' for whole columns or '3:5' for whole rows"""
+    if min_row == 1 and max_row == MAX_ROW:
+        return f"{column_letter(min_col)}:{column_letter(max_col)}"
+    if min_col == 1 and max_col == MAX_COLUMN:
+        return f"{min_row}:{max_row}"
+    start = f"{column_letter(min_col)}{min_row}"
+    if (min_row, min_col) == (max_row, max_col):
+        return start
+    return f"{start}:{column_letter(max_col)}{max_row}"
+
+
+def range_size(reference):
+    """Number of cells of a bounded range, 0 for whole columns/rows or invalid ranges"""
+    try:
+        _, min_row, min_col, max_row, max_col = parse_range(reference)
+    except (TypeError, ValueError):
+        return 0
+    if min_row is None or min_col is None:
+        return 0
+    return (max_row - min_row + 1) * (max_col - min_col + 1)
+
+
+def coalesce_ranges(references):
+    """
+    Merge ranges ('A1:C3', 'C:D', '3:5' or space-separated lists of them) into fewer rectangles:
+    ranges inside another are dropped, ranges spanning the same columns (rows) that touch or
+    overlap vertically (horizontally) are joined. Returns the ranges, top to bottom
+    """
+    boxes = set()
+    for reference in references:
+        for part in reference.split():
+            _, min_row, min_col, max_row, max_col = parse_range(part)
+            if min_row is None:
+                min_row, max_row = 1, MAX_ROW
+            if min_col is None:
+                min_col, max_col = 1, MAX_COLUMN
+            boxes.add((min_row, min_col, max_row, max_col))
+    while True:
+        count = None
+        while count != len(boxes):
+            count = len(boxes)
+            # Join along the rows within each column span, then along the columns within each row span
+            for span, start, end in ((1, 0, 2), (0, 1, 3)):
+                merged = []
+                for box in sorted(boxes, key=lambda box: (box[span], box[span + 2], box[start])):
+                    last = merged[-1] if merged else None
+                    if (last is not None and last[span] == box[span] and last[span + 2] == box[span + 2]
+                            and box[start] <= last[end] + 1):
+                        joined = list(last)
+                        joined[end] = max(last[end], box[end])
+                        merged[-1] = tuple(joined)
+                    else:
+                        merged.append(box)
+                boxes = merged
+        # Largest first, so a range is only checked against the ranges that may contain it
+        kept = []
+        for box in sorted(boxes, key=lambda box: (box[2] - box[0] + 1) * (box[3] - box[1] + 1), reverse=True):
+            if not any(other[0] <= box[0] and other[1] <= box[1] and box[2] <= other[2] and box[3] <= other[3]
+                       for other in kept):
+                kept.append(box)
+        if len(kept) == len(boxes):
+            break
+        boxes = kept
+    return [range_reference(*box) for box in sorted(boxes)]
+
+
+def cell_coordinates(cell_ref):
+    """(row, column) of a cell given as 'A1'/'R1C1' or as a (row, column) tuple, None if invalid"""
+    if isinstance(cell_ref, tuple):
+        if len(cell_ref) != 2 or not all(isinstance(index, Integral) and index >= 1 for index in cell_ref):
+            return None
+        return cell_ref
+    if isinstance(cell_ref, str):
+        try:
+            return parse_cell(cell_ref)
+        except ValueError:
+            return None
+    return None
+
+
+def get_cache_info():
+    """Hit/miss statistics of the reference caches"""
+    return {name: function.cache_info()._asdict() for name, function in
+            (("parse_cell", parse_cell), ("parse_range", parse_range),
+             ("column_index", column_index), ("column_letter", column_letter))}
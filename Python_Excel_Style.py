@@ -2,15 +2,81 @@ import openpyxl
 from openpyxl.styles import Font, PatternFill, GradientFill, Border, Side, Alignment, Protection, NamedStyle, colors
 from openpyxl.styles.differential import DifferentialStyle
 from openpyxl.formatting.rule import Rule, ColorScaleRule, IconSetRule, DataBarRule
+from openpyxl.xml.functions import tostring
+from collections import OrderedDict
 from uuid import uuid4
+from Python_Excel_Errors import logger, report_error, report_exception, SheetNotFoundError, StyleError
+from Python_Excel_Reference import coalesce_ranges
+
+
+def _rule_signature(rule):
+    """What makes two conditional formatting rules equivalent: their XML without priority, and their style"""
+    tree = rule.to_tree()
+    tree.attrib.pop("priority", None)
+    tree.attrib.pop("dxfId", None)
+    return (tostring(tree), rule.dxf)
+
 
 class Excel_Style:
-    def __init__(self):
+    def __init__(self, cache_size=1024, strict=False):
         """
         Initialize Excel_Style with a dictionary to store named styles
+
+        Font, fill, border, alignment and protection objects are interned: equal arguments
+        return the same shared instance. cache_size bounds the cache (LRU), 0 disables it.
+        Shared instances must be treated as read-only, derive variants with copy(obj, **changes).
+        strict=True makes methods raise Python_Excel_Errors exceptions instead of returning None/False.
         """
+        self.strict = strict
         self.named_styles = {}
-        print("Excel_Style initialized successfully.")
+        self.cache_size = cache_size
+        self._style_cache = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        logger.debug("Excel_Style initialized successfully.")
+
+    def __normalize_color(self, color):
+        """Normalize an RGB string the way openpyxl stores it ('ffffff' -> '00FFFFFF')"""
+        if isinstance(color, str):
+            color = color.upper()
+            if len(color) == 6:
+                color = "00" + color
+        return color
+
+    def __interned(self, key, factory):
+        """Return the cached style object for key, building it with factory on a miss"""
+        if not self.cache_size:
+            return factory()
+        style = self._style_cache.get(key)
+        if style is not None:
+            self._style_cache.move_to_end(key)
+            self._cache_hits += 1
+            return style
+        self._cache_misses += 1
+        style = factory()
+        self._style_cache[key] = style
+        if len(self._style_cache) > self.cache_size:
+            self._style_cache.popitem(last=False)
+        return style
+
+    def get_cache_info(self):
+        """
+        Return hit/miss statistics of the style cache
+        """
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'size': len(self._style_cache),
+            'max_size': self.cache_size
+        }
+
+    def clear_cache(self):
+        """
+        Drop all interned style objects and reset the statistics
+        """
+        self._style_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def create_font(self, name='Calibri', size=11, bold=False, italic=False, underline=None, color='FF000000', 
                     strikethrough=False, vert_align=None):
@@ -18,7 +84,10 @@ class Excel_Style:
         Create a Font object with specified properties
         """
         try:
-            font = Font(
+            color = self.__normalize_color(color)
+            size = float(size) if size is not None else None
+            key = ('font', name, size, bool(bold), bool(italic), underline, color, bool(strikethrough), vert_align)
+            font = self.__interned(key, lambda: Font(
                 name=name,
                 size=size,
                 bold=bold,
@@ -27,41 +96,43 @@ class Excel_Style:
                 color=color,         # RGB or theme color
                 strikethrough=strikethrough,
                 vertAlign=vert_align  # e.g., 'superscript', 'subscript'
-            )
+            ))
             return font
         except Exception as e:
-            print(f"Error creating font: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating font", e, None)
 
     def create_pattern_fill(self, fill_type='solid', start_color='FFFFFF', end_color='FFFFFF'):
         """
         Create a PatternFill object
         """
         try:
-            fill = PatternFill(
+            start_color = self.__normalize_color(start_color)
+            end_color = self.__normalize_color(end_color)
+            key = ('pattern_fill', fill_type, start_color, end_color)
+            fill = self.__interned(key, lambda: PatternFill(
                 fill_type=fill_type,  # e.g., 'solid', 'darkDown', 'lightGrid'
                 start_color=start_color,
                 end_color=end_color
-            )
+            ))
             return fill
         except Exception as e:
-            print(f"Error creating pattern fill: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating pattern fill", e, None)
 
     def create_gradient_fill(self, fill_type='linear', stop=('FFFFFF', '000000'), degree=0):
         """
         Create a GradientFill object
         """
         try:
-            fill = GradientFill(
+            stop = tuple(self.__normalize_color(color) for color in stop)
+            key = ('gradient_fill', fill_type, stop, float(degree))
+            fill = self.__interned(key, lambda: GradientFill(
                 type=fill_type,  # 'linear' or 'path'
                 stop=stop,       # List of colors
                 degree=degree    # Angle for linear gradient
-            )
+            ))
             return fill
         except Exception as e:
-            print(f"Error creating gradient fill: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating gradient fill", e, None)
 
     def create_border(self, left_style=None, right_style=None, top_style=None, bottom_style=None, 
                      left_color='FF000000', right_color='FF000000', top_color='FF000000', bottom_color='FF000000', 
@@ -70,7 +141,16 @@ class Excel_Style:
         Create a Border object
         """
         try:
-            border = Border(
+            # Colors of absent sides do not change the border, leave them out of the key
+            left_color = self.__normalize_color(left_color) if left_style else None
+            right_color = self.__normalize_color(right_color) if right_style else None
+            top_color = self.__normalize_color(top_color) if top_style else None
+            bottom_color = self.__normalize_color(bottom_color) if bottom_style else None
+            diagonal_color = self.__normalize_color(diagonal_color) if diagonal else None
+            diagonal_style = diagonal_style if diagonal else None
+            key = ('border', left_style, left_color, right_style, right_color, top_style, top_color,
+                   bottom_style, bottom_color, bool(diagonal), diagonal_style, diagonal_color)
+            border = self.__interned(key, lambda: Border(
                 left=Side(border_style=left_style, color=left_color) if left_style else None,
                 right=Side(border_style=right_style, color=right_color) if right_style else None,
                 top=Side(border_style=top_style, color=top_color) if top_style else None,
@@ -78,11 +158,10 @@ class Excel_Style:
                 diagonal=Side(border_style=diagonal_style, color=diagonal_color) if diagonal else None,
                 diagonalUp=diagonal,
                 diagonalDown=diagonal
-            )
+            ))
             return border
         except Exception as e:
-            print(f"Error creating border: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating border", e, None)
 
     def create_alignment(self, horizontal='general', vertical='bottom', text_rotation=0, wrap_text=False, 
                         shrink_to_fit=False, indent=0):
@@ -90,32 +169,32 @@ class Excel_Style:
         Create an Alignment object
         """
         try:
-            alignment = Alignment(
+            key = ('alignment', horizontal, vertical, int(text_rotation), bool(wrap_text), bool(shrink_to_fit), float(indent))
+            alignment = self.__interned(key, lambda: Alignment(
                 horizontal=horizontal,  # e.g., 'center', 'left', 'right'
                 vertical=vertical,      # e.g., 'center', 'top', 'bottom'
                 text_rotation=text_rotation,
                 wrap_text=wrap_text,
                 shrink_to_fit=shrink_to_fit,
                 indent=indent
-            )
+            ))
             return alignment
         except Exception as e:
-            print(f"Error creating alignment: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating alignment", e, None)
 
     def create_protection(self, locked=True, hidden=False):
         """
         Create a Protection object
         """
         try:
-            protection = Protection(
+            key = ('protection', bool(locked), bool(hidden))
+            protection = self.__interned(key, lambda: Protection(
                 locked=locked,
                 hidden=hidden
-            )
+            ))
             return protection
         except Exception as e:
-            print(f"Error creating protection: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating protection", e, None)
 
     def create_named_style(self, name, font=None, fill=None, border=None, alignment=None, number_format=None, 
                           protection=None):
@@ -139,8 +218,7 @@ class Excel_Style:
             self.named_styles[name] = style
             return style
         except Exception as e:
-            print(f"Error creating named style: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating named style", e, None)
 
     def apply_named_style(self, workbook, style_name):
         """
@@ -148,44 +226,97 @@ class Excel_Style:
         """
         try:
             if style_name not in self.named_styles:
-                print(f"Named style '{style_name}' does not exist.")
-                return False
+                return report_error(self.strict, StyleError(f"Named style '{style_name}' does not exist."), False)
             workbook.add_named_style(self.named_styles[style_name])
             return True
         except Exception as e:
-            print(f"Error applying named style: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error applying named style", e, False)
+
+    def __build_rule(self, condition_type, operator=None, value=None, font=None, fill=None,
+                     color_scale_colors=None, icon_set=None, data_bar_color=None):
+        """Build a conditional formatting Rule; cellIs rules share one DifferentialStyle per font/fill"""
+        if condition_type == 'cellIs':
+            dxf = self.__interned(('dxf', font, fill), lambda: DifferentialStyle(font=font, fill=fill))
+            return Rule(type=condition_type, operator=operator, formula=[value], dxf=dxf)
+        if condition_type == 'colorScale':
+            return ColorScaleRule(
+                start_type='min', start_color=color_scale_colors[0],
+                mid_type='percentile', mid_value=50, mid_color=color_scale_colors[1],
+                end_type='max', end_color=color_scale_colors[2]
+            )
+        if condition_type == 'iconSet':
+            return IconSetRule(icon_style=icon_set, type='3Arrows', showValue=False)
+        if condition_type == 'dataBar':
+            return DataBarRule(start_type='min', end_type='max', color=data_bar_color)
+        raise StyleError(f"Unsupported conditional formatting type: {condition_type}")
 
     def create_conditional_formatting(self, condition_type, cell_range, workbook, sheet_name, 
                                      operator=None, value=None, font=None, fill=None, 
                                      color_scale_colors=None, icon_set=None, data_bar_color=None):
         """
-        Create and apply conditional formatting
+        Create and apply conditional formatting (merged into an identical rule of the sheet if there
+        is one, see format_conditional_ranges)
+        """
+        return self.format_conditional_ranges(workbook, sheet_name, [(cell_range, {
+            'condition_type': condition_type, 'operator': operator, 'value': value, 'font': font, 'fill': fill,
+            'color_scale_colors': color_scale_colors, 'icon_set': icon_set, 'data_bar_color': data_bar_color})])
+
+    def format_conditional_ranges(self, workbook, sheet_name, operations):
+        """
+        Apply a batch of (cell_range, rule) conditional formats in one call, rule being a dict of
+        create_conditional_formatting keywords (condition_type, operator, value, font, fill...).
+        Identical cellIs rules, in the batch or already on the sheet, become one rule whose ranges
+        are merged into a multi-range sqref; rules over the same ranges share one block. Rules
+        computed over their range (colorScale, dataBar, iconSet) are only merged over the same range.
         """
         try:
-            sheet = workbook[sheet_name]
-            if condition_type == 'cellIs':
-                dxf = DifferentialStyle(font=font, fill=fill)
-                rule = Rule(type=condition_type, operator=operator, formula=[value], dxf=dxf)
-            elif condition_type == 'colorScale':
-                rule = ColorScaleRule(
-                    start_type='min', start_color=color_scale_colors[0],
-                    mid_type='percentile', mid_value=50, mid_color=color_scale_colors[1],
-                    end_type='max', end_color=color_scale_colors[2]
-                )
-            elif condition_type == 'iconSet':
-                rule = IconSetRule(icon_style=icon_set, type='3Arrows', showValue=False)
-            elif condition_type == 'dataBar':
-                rule = DataBarRule(start_type='min', end_type='max', color=data_bar_color)
-            else:
-                print(f"Unsupported conditional formatting type: {condition_type}")
-                return False
-            
-            sheet.conditional_formatting.add(cell_range, rule)
+            if sheet_name not in workbook.sheetnames:
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{sheet_name}' does not exist."), False)
+            formatting = workbook[sheet_name].conditional_formatting
+            # signature -> [rule, ranges], in order of first appearance (the order of priority)
+            groups = {}
+            # Operations repeat a handful of rules: build and serialize each one once
+            signatures = {}
+            for cell_range, spec in operations:
+                key = tuple((name, tuple(value) if isinstance(value, list) else value)
+                            for name, value in sorted(spec.items()))
+                built = signatures.get(key)
+                if built is None:
+                    rule = self.__build_rule(**spec)
+                    built = signatures[key] = (rule, _rule_signature(rule))
+                rule, signature = built
+                if rule.type != 'cellIs':
+                    # colorScale, dataBar and iconSet take their min, max and percentiles over all
+                    # the ranges of the rule: only the same range coalesces, with a rule of its own
+                    signature = (signature, tuple(coalesce_ranges([cell_range])))
+                    if signature not in groups:
+                        rule = self.__build_rule(**spec)
+                groups.setdefault(signature, [rule, []])[1].append(cell_range)
+            # A rule of the sheet equal to one of the batch absorbs it and keeps its priority
+            for block, rules in list(formatting._cf_rules.items()):
+                kept = []
+                for rule in rules:
+                    signature = _rule_signature(rule)
+                    if rule.type != 'cellIs':
+                        signature = (signature, tuple(coalesce_ranges([str(block.sqref)])))
+                    group = groups.get(signature)
+                    if group is None:
+                        kept.append(rule)
+                        continue
+                    if not group[0].priority:
+                        group[0] = rule
+                    group[1].append(str(block.sqref))
+                if len(kept) < len(rules):
+                    if kept:
+                        formatting._cf_rules[block] = kept
+                    else:
+                        del formatting._cf_rules[block]
+            for rule, ranges in groups.values():
+                formatting.add(" ".join(coalesce_ranges(ranges)), rule)
+            logger.debug("Applied %s conditional formats as %s rules.", len(operations), len(groups))
             return True
         except Exception as e:
-            print(f"Error creating conditional formatting: {str(e)}")
-            return False
+            return report_exception(self.strict, "Error creating conditional formatting", e, False)
 
     def get_color(self, color_type='rgb', value='FF000000'):
         """
@@ -198,11 +329,9 @@ class Excel_Style:
                 return getattr(colors, value.upper(), colors.BLACK)
             elif color_type == 'indexed':
                 return colors.Color(indexed=int(value))
-            print(f"Unsupported color type: {color_type}")
-            return None
+            return report_error(self.strict, StyleError(f"Unsupported color type: {color_type}"), None)
         except Exception as e:
-            print(f"Error creating color: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error creating color", e, None)
         
     def get_cell_style(self, workbook, sheet_name, cell_ref):
         """
@@ -210,8 +339,7 @@ class Excel_Style:
         """
         try:
             if sheet_name not in workbook.sheetnames:
-                print(f"Sheet '{sheet_name}' does not exist.")
-                return None
+                return report_error(self.strict, SheetNotFoundError(f"Sheet '{sheet_name}' does not exist."), None)
             
             sheet = workbook[sheet_name]
             cell = sheet[cell_ref] if isinstance(cell_ref, str) else sheet.cell(row=cell_ref[0], column=cell_ref[1])
@@ -261,8 +389,7 @@ class Excel_Style:
             }
             return style_info
         except Exception as e:
-            print(f"Error retrieving cell style: {str(e)}")
-            return None
+            return report_exception(self.strict, "Error retrieving cell style", e, None)
 
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,309 @@
+import copy
+import json
+import os
+import re
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+
+from openpyxl.packaging.relationship import get_rels_path
+from openpyxl.xml.constants import ARC_CONTENT_TYPES
+
+import Python_Excel_Package
+from Python_Excel_Errors import (logger, report_error, report_exception, InvalidReferenceError, SheetNotFoundError,
+                                 UnsupportedOperationError)
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Reference import cell_coordinates, column_index, column_letter, parse_range
+
+_SHEET_DATA_RE = re.compile(r"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", re.S)
+_ROW_RE = re.compile(r'<row r="([0-9]+)"((?:\s+[\w:]+="[^"]*")*)\s*(?:/>|>(.*?)</row>)', re.S)
+_CELL_RE = re.compile(r'<c r="([A-Z]+)([0-9]+)"((?:\s+[\w:]+="[^"]*")*)\s*(?:/>|>.*?</c>)', re.S)
+_STYLE_RE = re.compile(r'\ss="([0-9]+)"')
+_DIMENSION_RE = re.compile(r'<dimension ref="([^"]*)"\s*/>')
+
+
+class _CompiledSheet:
+    """
+    A worksheet part split for stamping: XML before and after <sheetData>, and its rows.
+    Rows crossing a data range are kept as {column: cell XML} with the data cells emptied
+    (styles kept), all other rows as ready-made XML
+    """
+
+    def __init__(self, xml, data_ranges):
+        self.data_ranges = data_ranges
+        match = _SHEET_DATA_RE.search(xml)
+        if match is None:
+            raise ValueError("Worksheet part without sheetData.")
+        self.head = xml[:match.start()]
+        self.tail = xml[match.end():]
+        dimension = _DIMENSION_RE.search(self.head)
+        self.bounds = parse_range(dimension.group(1))[1:] if dimension else (1, 1, 1, 1)
+        self.has_formulas = "<f>" in xml or "<f " in xml
+        # [(row, static XML or None, row attributes, {column: cell XML} or None)]
+        self.rows = []
+        # {(row, column): ' s="N"'} of the data cells
+        self.styles = {}
+        for row_match in _ROW_RE.finditer(match.group(1) or ""):
+            row = int(row_match.group(1))
+            if not any(min_row <= row <= max_row for min_row, min_col, max_row, max_col in data_ranges):
+                self.rows.append((row, row_match.group(0), None, None))
+                continue
+            cells = {}
+            for cell_match in _CELL_RE.finditer(row_match.group(3) or ""):
+                col = column_index(cell_match.group(1))
+                if self.in_data_range(row, col):
+                    style = _STYLE_RE.search(cell_match.group(3))
+                    style = style.group(0) if style else ""
+                    if style:
+                        self.styles[(row, col)] = style
+                    cells[col] = f'<c r="{cell_match.group(1)}{row}"{style}/>'
+                else:
+                    cells[col] = cell_match.group(0)
+            self.rows.append((row, None, row_match.group(2), cells))
+
+    def in_data_range(self, row, col):
+        for min_row, min_col, max_row, max_col in self.data_ranges:
+            if min_row <= row <= max_row and min_col <= col <= max_col:
+                return True
+        return False
+
+    def render(self, blocks):
+        """Worksheet XML with blocks [(top row, left column, rows of values)] filled in"""
+        styles = self.styles
+        values = {}
+        has_formulas = self.has_formulas
+        min_row, min_col, max_row, max_col = self.bounds
+        for top, left, rows in blocks:
+            if hasattr(rows, "tolist"):
+                rows = rows.tolist()
+            for row, row_values in enumerate(rows, start=top):
+                filled = values.get(row)
+                for col, value in enumerate(row_values, start=left):
+                    if value is None:
+                        continue
+                    if not self.in_data_range(row, col):
+                        raise InvalidReferenceError(f"Cell {column_letter(col)}{row} is outside the data ranges.")
+                    xml = Python_Excel_Package.cell_xml(f"{column_letter(col)}{row}", styles.get((row, col), ""), value)
+                    if xml is None:
+                        continue
+                    if filled is None:
+                        filled = values[row] = {}
+                    filled[col] = xml
+                    has_formulas = has_formulas or "<f>" in xml
+                    min_row, max_row = min(min_row, row), max(max_row, row)
+                    min_col, max_col = min(min_col, col), max(max_col, col)
+
+        parts = []
+        pending = sorted(values)
+        index = 0
+        for row, static, attributes, cells in self.rows:
+            while index < len(pending) and pending[index] < row:
+                parts.append(self.__row_xml(pending[index], "", {}, values[pending[index]]))
+                index += 1
+            if static is not None:
+                parts.append(static)
+            else:
+                filled = values.get(row, {})
+                if index < len(pending) and pending[index] == row:
+                    index += 1
+                parts.append(self.__row_xml(row, attributes, cells, filled))
+        for row in pending[index:]:
+            parts.append(self.__row_xml(row, "", {}, values[row]))
+
+        head = _DIMENSION_RE.sub(
+            f'<dimension ref="{column_letter(min_col)}{min_row}:{column_letter(max_col)}{max_row}" />', self.head, 1)
+        return head + "<sheetData>" + "".join(parts) + "</sheetData>" + self.tail, has_formulas
+
+    @staticmethod
+    def __row_xml(row, attributes, cells, filled):
+        columns = sorted(set(cells) | set(filled)) if filled else sorted(cells)
+        body = "".join(filled[col] if col in filled else cells[col] for col in columns)
+        return f'<row r="{row}"{attributes}>{body}</row>' if body else f'<row r="{row}"{attributes}/>'
+
+
+class ExcelTemplate:
+    """
+    A workbook layout (styles, widths, merged cells, filters, conditional formatting, static
+    text) compiled once and stamped into new workbooks by filling its data ranges.
+
+    Stamping never goes through openpyxl: static parts are reused as they are and only the
+    rows of the data ranges are generated, so styles and layout XML are built once.
+
+        template = ExcelTemplate.from_workbook(excel, {"ASPHALT": ["A3:W69", "I70:O70"]})
+        template.save("asphalt.template.xlsx")        # optional, reload with ExcelTemplate.load
+        template.stamp("report.xlsx", {"ASPHALT": data_rows})
+        template.stamp("report2.xlsx", {"ASPHALT": {"A3": data_rows, "I70": [[374.1]]}})
+
+    Values already in the data ranges are cleared, their styles kept; text, numbers, booleans,
+    dates (shown with the cell's number format) and formulas ('=SUM(...)') can be filled in.
+    """
+
+    # Templates loaded from disk, {absolute path: (file signature, template)}, least recently
+    # used first and bounded by cache_size (0 disables the cache)
+    _cache = OrderedDict()
+    cache_size = 32
+
+    def __init__(self, data, data_ranges, strict=False):
+        """Compile xlsx bytes; data_ranges is {sheet: range or [ranges]} of the cells to fill"""
+        self.strict = strict
+        self.data_ranges = self._normalize_ranges(data_ranges)
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            self.workbook_part, _, sheet_parts = Python_Excel_Package.read_package(archive)
+            missing = set(self.data_ranges) - set(sheet_parts)
+            if missing:
+                raise SheetNotFoundError(f"Sheet '{sorted(missing)[0]}' does not exist in the template.")
+            # [(ZipInfo, bytes)] of the parts copied as they are, in archive order
+            self.parts = []
+            self.sheets = {}
+            self.sheet_parts = {}
+            for info in archive.infolist():
+                self.parts.append((info.filename, archive.read(info)))
+            for sheet, ranges in self.data_ranges.items():
+                bounds = []
+                for cell_range in ranges:
+                    _, min_row, min_col, max_row, max_col = parse_range(cell_range)
+                    if min_row is None or min_col is None:
+                        raise InvalidReferenceError(f"Data range '{cell_range}' must be bounded.")
+                    bounds.append((min_row, min_col, max_row, max_col))
+                part = sheet_parts[sheet]
+                self.sheet_parts[sheet] = part
+                self.sheets[sheet] = _CompiledSheet(archive.read(part).decode("utf-8"), bounds)
+            # Parts for workbooks holding formulas: no calculation chain, recalculated on open
+            recalculated = {part: archive.read(part) for part in
+                            (self.workbook_part, get_rels_path(self.workbook_part), ARC_CONTENT_TYPES)}
+            Python_Excel_Package.reset_calculation(recalculated, self.workbook_part)
+            self.recalculated_parts = recalculated
+
+    @staticmethod
+    def _normalize_ranges(data_ranges):
+        """{sheet: [ranges]} of data_ranges given as {sheet: range or [ranges]}"""
+        return {sheet: [ranges] if isinstance(ranges, str) else list(ranges) for sheet, ranges in data_ranges.items()}
+
+    @classmethod
+    def from_workbook(cls, excel, data_ranges, strict=False):
+        """Compile the current state of an Excel_WorkBook (normal mode)"""
+        if excel.mode != "normal":
+            raise UnsupportedOperationError(f"Templates cannot be built in {excel.mode} mode.")
+        buffer = BytesIO()
+        Python_Excel_Package.write_workbook(excel.workbook, buffer)
+        return cls(buffer.getvalue(), data_ranges, strict=strict)
+
+    @classmethod
+    def from_file(cls, path, data_ranges, strict=False):
+        """Compile an xlsx file (e.g. designed in Excel), normalized by an openpyxl round trip"""
+        excel = Excel_WorkBook(path, next(iter(data_ranges)), strict=True)
+        try:
+            return cls.from_workbook(excel, data_ranges, strict=strict)
+        finally:
+            excel.close()
+
+    def save(self, path):
+        """
+        Write the template as an xlsx file (the blank layout, openable in Excel), the data
+        ranges stored in the zip comment for load()
+        """
+        try:
+            def write(stream):
+                with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+                    for name, data in self.parts:
+                        if name in self.sheet_parts.values():
+                            sheet = next(title for title, part in self.sheet_parts.items() if part == name)
+                            data = self.sheets[sheet].render(())[0].encode("utf-8")
+                        archive.writestr(name, data)
+                    archive.comment = json.dumps({"data_ranges": self.data_ranges}).encode("utf-8")
+            Python_Excel_Package.write_atomic(path, write)
+            logger.info("Template saved to %s", path)
+            return True
+        except Exception as e:
+            return report_exception(self.strict, "Error saving template", e, False)
+
+    @classmethod
+    def load(cls, path, data_ranges=None, strict=False):
+        """
+        Load a template written by save() (or any xlsx file with data_ranges), reusing the
+        compiled template while the file is unchanged
+        """
+        key = os.path.abspath(path)
+        signature = Python_Excel_Package.file_signature(path)
+        cached = cls._cache.get(key)
+        if (cached is not None and cached[0] == signature
+                and (data_ranges is None or cls._normalize_ranges(data_ranges) == cached[1].data_ranges)):
+            cls._cache.move_to_end(key)
+            template = cached[1]
+            if template.strict != strict:
+                # Same compiled sheets, this caller's error handling
+                template = copy.copy(template)
+                template.strict = strict
+            return template
+        with open(path, "rb") as source:
+            data = source.read()
+        if data_ranges is None:
+            with zipfile.ZipFile(BytesIO(data)) as archive:
+                data_ranges = json.loads(archive.comment.decode("utf-8"))["data_ranges"]
+        template = cls(data, data_ranges, strict=strict)
+        if cls.cache_size:
+            cls._cache[key] = (signature, template)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.cache_size:
+                cls._cache.popitem(last=False)
+        return template
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop the templates kept by load()"""
+        cls._cache.clear()
+
+    def __blocks(self, sheet, data):
+        """[(top row, left column, rows)] of the data given for a sheet"""
+        if isinstance(data, dict):
+            blocks = []
+            for top_left, rows in data.items():
+                coordinates = cell_coordinates(top_left)
+                if coordinates is None:
+                    raise InvalidReferenceError(f"Invalid cell reference '{top_left}'.")
+                blocks.append(coordinates + (rows,))
+            return blocks
+        min_row, min_col, max_row, max_col = self.sheets[sheet].data_ranges[0]
+        return [(min_row, min_col, data)]
+
+    def render(self, data):
+        """
+        Return the xlsx bytes of a workbook stamped with data: {sheet: rows} fills the first
+        data range of the sheet from its top-left cell, {sheet: {top_left: rows}} fills several
+        blocks; every value must fall in a data range
+        """
+        parts = {}
+        has_formulas = False
+        for sheet, sheet_data in data.items():
+            if sheet not in self.sheets:
+                raise SheetNotFoundError(f"Sheet '{sheet}' has no data ranges in the template.")
+            xml, formulas = self.sheets[sheet].render(self.__blocks(sheet, sheet_data))
+            parts[self.sheet_parts[sheet]] = xml.encode("utf-8")
+            has_formulas = has_formulas or formulas
+        for sheet, compiled in self.sheets.items():
+            # Blank data ranges of the sheets without data
+            if sheet not in data:
+                parts[self.sheet_parts[sheet]] = compiled.render(())[0].encode("utf-8")
+            has_formulas = has_formulas or compiled.has_formulas
+        if has_formulas:
+            parts.update(self.recalculated_parts)
+
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, static in self.parts:
+                content = parts.get(name, static)
+                if content is not None:
+                    archive.writestr(name, content)
+        return buffer.getvalue()
+
+    def stamp(self, path, data):
+        """Write a new workbook to path from the template filled with data (see render)"""
+        try:
+            content = self.render(data)
+            Python_Excel_Package.write_atomic(path, lambda stream: stream.write(content))
+            logger.info("Workbook stamped to %s", path)
+            return True
+        except (InvalidReferenceError, SheetNotFoundError) as e:
+            return report_error(self.strict, e, False)
+        except Exception as e:
+            return report_exception(self.strict, "Error stamping workbook", e, False)
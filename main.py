@@ -31,21 +31,18 @@ excel.add_sort_filter("ASPHALT", "A1:W1")
 for i, row in enumerate(data_rows, start=3):
     excel.write_row("ASPHALT", i, row)
 
-# Write totals (simplified, you can calculate dynamically if needed)
+# Write totals of the volume (m³) column of each material, computed from the data rows 3-69
+volume_columns = {"Excavation": "K", "Sand": "M", "Subbase": "O", "Gravel": "Q", "Old Material": "S"}
 excel.write_cell("ASPHALT", "H70", "TOTAL")
-excel.write_cell("ASPHALT", "I70", "374.145")
-excel.write_cell("ASPHALT", "K70", "121.517")
-excel.write_cell("ASPHALT", "M70", "241.928")
-excel.write_cell("ASPHALT", "O70", "11.3")
+totals = excel.write_aggregates(
+    "ASPHALT", {f"{column}70": (column, "sum") for column in volume_columns.values()},
+    header_row=None, min_row=3, max_row=69
+)
 
 # Write summary table
-summary_data = [
-    ["Excavation", "374.145"], ["Sand", "121.517"], ["Subbase", "241.928"], 
-    ["Gravel", "11.3"], ["Old Material", "0"]
-]
-for i, (label, value) in enumerate(summary_data, start=72):
+for i, (label, column) in enumerate(volume_columns.items(), start=72):
     excel.write_cell("ASPHALT", f"I{i}", label)
-    excel.write_cell("ASPHALT", f"J{i}", value)
+    excel.write_cell("ASPHALT", f"J{i}", totals[f"{column}70"])
 
 # Create styles using Excel_Style
 # Header style
@@ -87,9 +84,13 @@ excel.format_cells("ASPHALT", "M3:M69", number_format=number_format)
 excel.format_cells("ASPHALT", "O3:O69", number_format=number_format)
 excel.format_cells("ASPHALT", "Q3:Q69", number_format=number_format)
 
-# Total row
+# Total row: the totals sit under the m³ columns (K, M, O, Q, S)
+# Earlier versions of this report wrote a hard-coded total to I70 and formatted I70:O70 as totals:
+# clear the total and its formatting from the cells the new layout no longer covers
+excel.write_cell("ASPHALT", "I70", None)
+excel.format_cells("ASPHALT", "I70:J70", font=style_manager.create_font(), number_format="General")
 excel.format_cells("ASPHALT", "H70", font=total_font)
-excel.format_cells("ASPHALT", "I70:O70", font=total_value_font, number_format=number_format)
+excel.format_cells("ASPHALT", "K70:S70", font=total_value_font, number_format=number_format)
 
 # Summary table
 for i, fill in enumerate(summary_fills, start=72):
@@ -98,24 +99,10 @@ for i, fill in enumerate(summary_fills, start=72):
 # Conditional formatting for "DONE" column (S)
 yes_fill = style_manager.create_pattern_fill(fill_type="solid", start_color="92D050")
 no_fill = style_manager.create_pattern_fill(fill_type="solid", start_color="FF6666")
-style_manager.create_conditional_formatting(
-    condition_type="cellIs",
-    cell_range="S3:S69",
-    workbook=excel.workbook,
-    sheet_name="ASPHALT",
-    operator="equal",
-    value='"YES"',
-    fill=yes_fill  # Sửa từ font thành fill
-)
-style_manager.create_conditional_formatting(
-    condition_type="cellIs",
-    cell_range="S3:S69",
-    workbook=excel.workbook,
-    sheet_name="ASPHALT",
-    operator="equal",
-    value='"NO"',
-    fill=no_fill  # Sửa từ font thành fill
-)
+excel.format_conditional_ranges("ASPHALT", [
+    ("S3:S69", {"condition_type": "cellIs", "operator": "equal", "value": '"YES"', "fill": yes_fill}),
+    ("S3:S69", {"condition_type": "cellIs", "operator": "equal", "value": '"NO"', "fill": no_fill}),
+], style_manager)
 
 # Adjust column widths for better visibility
 for col in range(1, 24):  # Columns A to W
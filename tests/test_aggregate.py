@@ -0,0 +1,27 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.write_rows("S", 1, [["N"], [1], [2], [3]])
+    yield excel
+    excel.close()
+
+
+def test_write_aggregates_default_range_stops_above_target(excel):
+    assert excel.write_aggregates("S", {"A6": ("N", "sum")}) == {"A6": 6}
+    # Run again: the used range now reaches A6, which must stay out of its own formula
+    assert excel.write_aggregates("S", {"A6": ("N", "sum")}) == {"A6": 6}
+    assert excel.read_cell("S", "A6") == "=SUM(A2:A5)"
+    assert excel.read_cell("S", "A6", evaluate=True) == 6
+
+
+def test_write_aggregates_rejects_target_inside_range(excel):
+    assert excel.write_aggregates("S", {"A3": ("N", "sum")}, max_row=4) is None
+    assert excel.read_cell("S", "A3") == 2
+    # Targets in other columns do not limit the range
+    assert excel.write_aggregates("S", {"B2": ("N", "max")}) == {"B2": 3}
+    assert excel.read_cell("S", "B2") == "=MAX(A2:A4)"
@@ -0,0 +1,44 @@
+import datetime
+import os
+
+import openpyxl
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+def _log(path, rows=4):
+    workbook = Excel_WorkBook(str(path), "S")
+    workbook.write_rows("S", 1, [["TIME", "MSG"]] + [[datetime.datetime(2026, 1, 1, row), f"m{row}"]
+                                                      for row in range(rows)])
+    workbook.save()
+    workbook.close()
+
+
+def test_append_rows_in_place(tmp_path):
+    path = tmp_path / "log.xlsx"
+    _log(path)
+    assert Excel_WorkBook.append_rows(str(path), "S", [[datetime.datetime(2026, 2, 1), "new", "=1+1"]]) == (6, 6)
+    sheet = openpyxl.load_workbook(path)["S"]
+    assert sheet.dimensions == "A1:C6"
+    assert [cell.value for cell in sheet[6]] == [datetime.datetime(2026, 2, 1), "new", "=1+1"]
+    assert sheet["A6"].number_format == sheet["A5"].number_format
+
+
+def test_append_no_rows_leaves_file_untouched(tmp_path):
+    path = tmp_path / "log.xlsx"
+    _log(path)
+    before = (path.read_bytes(), os.stat(path).st_mtime_ns)
+    assert Excel_WorkBook.append_rows(str(path), "S", []) is None
+    assert (path.read_bytes(), os.stat(path).st_mtime_ns) == before
+    assert Excel_WorkBook.append_rows(str(tmp_path / "new.xlsx"), "S", []) is None
+    assert not (tmp_path / "new.xlsx").exists()
+
+
+def test_append_falls_back_for_new_files_and_sheets(tmp_path):
+    path = tmp_path / "new.xlsx"
+    assert Excel_WorkBook.append_rows(str(path), "S", [[1, 2]]) == (1, 1)
+    assert Excel_WorkBook.append_rows(str(path), "S", [[3, 4]]) == (2, 2)
+    assert Excel_WorkBook.append_rows(str(path), "T", [[5]]) == (1, 1)
+    workbook = openpyxl.load_workbook(path)
+    assert [[cell.value for cell in row] for row in workbook["S"].iter_rows()] == [[1, 2], [3, 4]]
+    assert workbook["T"]["A1"].value == 5
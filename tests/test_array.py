@@ -0,0 +1,28 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    yield excel
+    excel.close()
+
+
+def test_read_range_as_array_creates_no_cells(excel):
+    excel.write_cell("S", "A1", 1.5)
+    excel.write_cell("S", "B2", "x")
+    arrays = excel.read_range_as_array("S", "A1", "Z300")
+    assert len(arrays) == 26 and len(arrays["A"]) == 300
+    assert arrays["A"][0] == 1.5 and arrays["B"][1] == "x"
+    assert len(excel.get_sheet("S")._cells) == 2
+
+
+def test_array_round_trip(excel):
+    assert excel.write_array("S", "A1", {"N": np.array([1, 2, 3]), "X": np.array([0.5, 1.5, 2.5])})
+    arrays = excel.read_range_as_array("S", "A1", "B4", header=True)
+    assert list(arrays) == ["N", "X"]
+    assert arrays["N"].tolist() == [1, 2, 3] and arrays["X"].tolist() == [0.5, 1.5, 2.5]
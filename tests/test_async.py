@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from Python_Excel_Errors import SheetNotFoundError
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    excel.write_rows("S", 1, [["a", 1], ["b", 2]])
+    excel.save()
+    excel.close()
+    return path
+
+
+def test_aopen_aread_range_asave(path, tmp_path):
+    async def run():
+        excel = await Excel_WorkBook.aopen(path, "S", strict=True)
+        assert await excel.aread_range("S", "A1", "B2") == [["a", 1], ["b", 2]]
+        excel.write_cell("S", "B2", 5)
+        copy = str(tmp_path / "copy.xlsx")
+        assert await excel.asave(copy)
+        excel.close()
+        reopened = await Excel_WorkBook.aopen(copy, "S", mode="read")
+        values = await reopened.aread_range("S", "A1", "B2")
+        reopened.close()
+        return values
+    assert asyncio.run(run()) == [["a", 1], ["b", 5]]
+
+
+def test_async_calls_on_one_workbook_run_one_at_a_time(path, monkeypatch):
+    excel = Excel_WorkBook(path, "S")
+    running = []
+    overlaps = []
+    read_range = excel.read_range
+
+    def tracked(*args):
+        overlaps.append(bool(running))
+        running.append(True)
+        try:
+            return read_range(*args)
+        finally:
+            running.pop()
+    monkeypatch.setattr(excel, "read_range", tracked)
+
+    async def run():
+        return await asyncio.gather(*(excel.aread_range("S", "A1", "B2") for _ in range(8)))
+    assert asyncio.run(run()) == [[["a", 1], ["b", 2]]] * 8
+    assert overlaps == [False] * 8
+    excel.close()
+
+
+def test_aopen_missing_sheet_in_read_mode_raises_in_strict(path):
+    with pytest.raises(SheetNotFoundError):
+        asyncio.run(Excel_WorkBook.aopen(path, "Missing", mode="read", strict=True))
@@ -0,0 +1,42 @@
+import openpyxl
+
+from Python_Excel_Batch import generate_reports
+
+
+def numbered_rows(count):
+    return ([row, f"R{row}"] for row in range(1, count + 1))
+
+
+def _job(path, **sheet):
+    return {"path": str(path), "sheets": [dict({"name": "S"}, **sheet)]}
+
+
+def test_job_results_in_job_order(tmp_path):
+    jobs = [_job(tmp_path / "a.xlsx", rows=[["x", 1], ["y", 2]], formats=[("A1:B1", {"font": {"bold": True}})]),
+            _job(tmp_path / "b.xlsx", source=(numbered_rows, 5), column_widths={"A": 20})]
+    results = generate_reports(jobs, workers=2)
+    assert [(result["path"], result["ok"], result["rows"]) for result in results] == \
+        [(str(tmp_path / "a.xlsx"), True, 2), (str(tmp_path / "b.xlsx"), True, 5)]
+    assert all(result["error"] is None and result["seconds"] > 0 and result["pid"] for result in results)
+    sheet = openpyxl.load_workbook(tmp_path / "a.xlsx")["S"]
+    assert sheet["A1"].font.b and sheet["B2"].value == 2
+    sheet = openpyxl.load_workbook(tmp_path / "b.xlsx")["S"]
+    assert sheet.max_row == 5 and sheet.column_dimensions["A"].width == 20
+
+
+def test_errors_are_captured_per_job(tmp_path):
+    jobs = [_job(tmp_path / "bad.xlsx", rows=[[1]], start_row=0),
+            _job(tmp_path / "good.xlsx", rows=[[1]])]
+    bad, good = generate_reports(jobs, workers=2)
+    assert not bad["ok"] and bad["error_type"] == "InvalidReferenceError"
+    assert "InvalidReferenceError" in bad["error"]
+    assert good["ok"] and good["rows"] == 1
+
+
+def test_unpicklable_spec_is_reported(tmp_path):
+    jobs = [_job(tmp_path / "lambda.xlsx", source=lambda: [[1]]), _job(tmp_path / "good.xlsx", rows=[[1]])]
+    unpicklable, good = generate_reports(jobs, workers=2)
+    assert not unpicklable["ok"] and unpicklable["pid"] is None and unpicklable["error_type"]
+    assert good["ok"]
+    # In the current process the same spec needs no pickling
+    assert generate_reports(jobs[:1], workers=1)[0]["ok"]
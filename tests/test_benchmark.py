@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import Python_Excel_Benchmark
+from Python_Excel_Benchmark import build_report, measure, run_scenario
+
+
+def test_measure_returns_result_of_child(tmp_path):
+    measurement = measure(build_report, str(tmp_path / "report.xlsx"), 10, 3)
+    assert measurement["result"] == os.path.getsize(tmp_path / "report.xlsx")
+    assert measurement["seconds"] > 0
+
+
+def test_measure_raises_when_child_fails(tmp_path):
+    missing = str(tmp_path / "missing" / "x.xlsx")
+    with pytest.raises(RuntimeError, match="run_scenario failed in the measured process"):
+        measure(run_scenario, missing, {"rows": 5, "cols": 2})
+
+
+def test_run_suite_records_failed_scenarios(tmp_path, monkeypatch):
+    measured = Python_Excel_Benchmark.measure
+
+    def measure_or_fail(func, path, spec, seed):
+        if os.path.basename(path).startswith("narrow-styled"):
+            raise RuntimeError("run_scenario failed in the measured process:\nboom")
+        return measured(func, path, spec, seed)
+    monkeypatch.setattr(Python_Excel_Benchmark, "measure", measure_or_fail)
+    output = tmp_path / "results.json"
+    results = Python_Excel_Benchmark.run_suite(scale=0.001, names=["narrow", "narrow-styled"], output=str(output))
+    assert "boom" in results["scenarios"]["narrow-styled"]["error"]
+    assert results["scenarios"]["narrow"]["phases"]["save"]["seconds"] >= 0
+    assert json.loads(output.read_text())["scenarios"]["narrow-styled"]["spec"]["styled"]
+    assert Python_Excel_Benchmark.compare_results(results, results)
+
+
+def test_help_does_not_crash():
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Python_Excel_Benchmark.py")
+    for args in (["--help"], ["suite", "--help"]):
+        completed = subprocess.run([sys.executable, script] + args, capture_output=True, text=True, timeout=60)
+        assert completed.returncode == 0, completed.stderr
+        assert "usage:" in completed.stdout
+
+
+def test_write_rows_beats_write_row_loop():
+    results = Python_Excel_Benchmark.benchmark_bulk_write(rows=4000, cols=25)
+    assert results["write_rows"] > results["write_row loop"]
@@ -0,0 +1,45 @@
+import pytest
+
+from Python_Excel_Compact import CompactSheet
+from Python_Excel_Errors import InvalidReferenceError
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture(params=[True, False], ids=["compact", "normal"])
+def workbook(request, tmp_path):
+    workbook = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S", compact=request.param)
+    workbook.write_rows("S", 1, [[1, 2, 3], [4, 5, 6]])
+    yield workbook
+    workbook.close()
+
+
+def test_row_and_column_zero_are_rejected(workbook):
+    assert workbook.write_row("S", 0, [9, 9, 9]) is False
+    assert workbook.write_row("S", 1, [9], start_column=0) is False
+    assert workbook.write_cell("S", (0, 1), 7) is False
+    assert workbook.write_cell("S", (1, 0), 7) is False
+    assert workbook.write_column("S", 0, [7]) is False
+    assert workbook.write_column("S", "A", [7], start_row=0) is False
+    assert workbook.write_rows("S", 0, [[7]]) is False
+    assert workbook.write_rows("S", 1, [[7]], start_column=0) is False
+    assert workbook.read_range("S", "A1", "C2") == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_row_zero_raises_in_strict_mode(tmp_path):
+    workbook = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S", strict=True, compact=True)
+    workbook.write_row("S", 1, [1])
+    with pytest.raises(InvalidReferenceError):
+        workbook.write_row("S", 0, [9])
+    with pytest.raises(InvalidReferenceError):
+        workbook.write_cell("S", (0, 1), 9)
+    assert workbook.read_range("S", "A1", "A1") == [[1]]
+
+
+def test_compact_sheet_set_rejects_row_and_column_zero():
+    store = CompactSheet()
+    store.set(1, 1, "a")
+    store.set(2, 1, "b")
+    for row, col in ((0, 1), (1, 0), (-1, 1)):
+        with pytest.raises(ValueError):
+            store.set(row, col, "x")
+    assert [store.get(1, 1), store.get(2, 1)] == ["a", "b"]
@@ -0,0 +1,91 @@
+import pytest
+from openpyxl.formatting.rule import DataBarRule
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from Python_Excel_Errors import UnsupportedOperationError
+from Python_Excel_Lib import Excel_WorkBook
+
+ROWS = [["K", "V"], ["a", 1], ["b", 2], ["c", 3], ["d", 4], ["e", 5]]
+
+
+def _book(path, rows, strict=False):
+    excel = Excel_WorkBook(str(path), "S", strict=strict)
+    excel.write_rows("S", 1, rows)
+    return excel
+
+
+def _values(excel):
+    return [[cell.value for cell in row] for row in excel.get_sheet("S").iter_rows()]
+
+
+@pytest.fixture
+def books(tmp_path):
+    old = _book(tmp_path / "old.xlsx", ROWS)
+    new = _book(tmp_path / "new.xlsx", ROWS[:3] + [["x", 9], ["y", 8]] + ROWS[3:])
+    yield old, new
+    old.close()
+    new.close()
+
+
+def test_insert_moves_rows_and_hyperlinks(books):
+    old, new = books
+    diff = old.diff_sheet("S", new, keys="K")
+    sheet = old.get_sheet("S")
+    sheet.merge_cells("A1:B1")
+    sheet["A6"].hyperlink = "https://example.com"
+    assert old.apply_diff("S", diff) == {"changed": 0, "inserted": 2, "deleted": 0, "missing": 0, "conflicts": 0}
+    assert [row[0] for row in _values(old)[1:]] == ["a", "b", "x", "y", "c", "d", "e"]
+    assert sheet["A8"].hyperlink.ref == "A8"
+
+
+def test_insert_above_merged_cells_and_formula_is_refused(books, tmp_path):
+    old, new = books
+    diff = old.diff_sheet("S", new, keys="K")
+    target = _book(tmp_path / "target.xlsx", ROWS + [[None], ["TOTAL", "=SUM(B2:B6)"], [None], ["merged"]])
+    target.get_sheet("S").merge_cells("A10:B10")
+    before = _values(target)
+    assert target.apply_diff("S", diff) is None
+    assert _values(target) == before
+    assert [merged.coord for merged in target.get_sheet("S").merged_cells.ranges] == ["A10:B10"]
+    target.close()
+
+
+@pytest.mark.parametrize("structure", ["merged", "formatting", "validation", "formula", "other sheet", "name"])
+def test_delete_with_structures_below_is_refused(tmp_path, structure):
+    target = _book(tmp_path / "target.xlsx", ROWS, strict=True)
+    new = _book(tmp_path / "new.xlsx", ROWS[:2] + ROWS[3:])
+    diff = target.diff_sheet("S", new)
+    sheet = target.get_sheet("S")
+    if structure == "merged":
+        sheet.merge_cells("C5:D5")
+    elif structure == "formatting":
+        sheet.conditional_formatting.add("B2:B6", DataBarRule(start_type="min", end_type="max", color="638EC6"))
+    elif structure == "validation":
+        validation = DataValidation(type="whole")
+        validation.add("B6")
+        sheet.add_data_validation(validation)
+    elif structure == "formula":
+        sheet["C1"] = "=MAX(B2:B6)"
+    elif structure == "other sheet":
+        target.create_sheet("R")
+        target.write_cell("R", "A1", "=S!B6")
+    else:
+        sheet.defined_names["LAST"] = DefinedName("LAST", attr_text="S!$B$6")
+    with pytest.raises(UnsupportedOperationError):
+        target.apply_diff("S", diff)
+    assert [row[:2] for row in _values(target)] == ROWS
+    target.close()
+    new.close()
+
+
+def test_delete_below_structures_is_applied(tmp_path):
+    target = _book(tmp_path / "target.xlsx", ROWS, strict=True)
+    new = _book(tmp_path / "new.xlsx", ROWS[:5])
+    diff = target.diff_sheet("S", new)
+    target.get_sheet("S").merge_cells("C2:D2")
+    target.write_cell("S", "C3", "=SUM(B2:B5)")
+    assert target.apply_diff("S", diff)["deleted"] == 1
+    assert _values(target)[-1][:2] == ["d", 4]
+    target.close()
+    new.close()
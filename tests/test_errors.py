@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from Python_Excel_Errors import (ExcelWorkbookError, InvalidReferenceError, OperationError, SheetExistsError,
+                                 SheetNotFoundError, StyleError, UnsupportedOperationError)
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Style import Excel_Style
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    excel.write_rows("S", 1, [[1, 2]])
+    excel.save()
+    excel.close()
+    return path
+
+
+def test_quiet_mode_emits_nothing(path):
+    # A fresh interpreter: pytest installs logging handlers of its own
+    script = textwrap.dedent(f"""
+        from Python_Excel_Lib import Excel_WorkBook
+        from Python_Excel_Style import Excel_Style
+
+        excel = Excel_WorkBook({path!r}, "S")
+        results = [excel.write_cell("Missing", "A1", 1), excel.create_sheet("S"), excel.write_cell("S", "ZZZZ1", 1),
+                   excel.set_column_width("S", "A", "wide"), excel.read_range("S", "T!A1", "B1"),
+                   Excel_Style().apply_named_style(excel.workbook, "Missing")]
+        excel.close()
+        read = Excel_WorkBook({path!r}, "S", mode="read")
+        results.append(read.write_cell("S", "A1", 1))
+        read.close()
+        assert results == [False, False, False, False, None, False, False], results
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "" and result.stderr == ""
+
+
+@pytest.mark.parametrize("call, error", [
+    (lambda excel: excel.write_cell("Missing", "A1", 1), SheetNotFoundError),
+    (lambda excel: excel.create_sheet("S"), SheetExistsError),
+    (lambda excel: excel.write_cell("S", "ZZZZ1", 1), InvalidReferenceError),
+    (lambda excel: excel.read_range("S", "A1:B", "C1"), InvalidReferenceError),
+    (lambda excel: Excel_Style(strict=True).apply_named_style(excel.workbook, "Missing"), StyleError),
+])
+def test_strict_mode_raises_typed_errors(path, call, error):
+    excel = Excel_WorkBook(path, "S", strict=True)
+    with pytest.raises(error):
+        call(excel)
+    excel.close()
+
+
+def test_strict_mode_wraps_other_failures(path):
+    excel = Excel_WorkBook(path, "S", strict=True)
+    with pytest.raises(OperationError) as info:
+        excel.set_column_width("S", "A", "wide")
+    assert info.value.__cause__ is not None
+    assert not isinstance(info.value.__cause__, ExcelWorkbookError)
+    excel.close()
+
+
+def test_strict_read_mode_refuses_writes(path):
+    excel = Excel_WorkBook(path, "S", mode="read", strict=True)
+    with pytest.raises(UnsupportedOperationError):
+        excel.write_cell("S", "A1", 1)
+    excel.close()
@@ -0,0 +1,89 @@
+import zipfile
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font, PatternFill
+
+from Python_Excel_Errors import InvalidReferenceError, StyleError
+from Python_Excel_Lib import Excel_WorkBook
+
+BOLD = Font(bold=True)
+ITALIC = Font(italic=True)
+RED = PatternFill(fill_type="solid", start_color="FF0000")
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.write_rows("S", 1, [[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    yield excel
+    excel.close()
+
+
+def test_overlapping_ranges_later_attributes_win(excel):
+    assert excel.format_ranges("S", [("A1:B2", {"font": BOLD, "pattern_fill": RED}),
+                                     ("B2:C3", {"font": ITALIC, "number_format": "0.00"})])
+    sheet = excel.get_sheet("S")
+    assert sheet["A1"].font.b and sheet["A1"].fill.fgColor.rgb == "00FF0000"
+    assert sheet["B2"].font.i and not sheet["B2"].font.b
+    assert sheet["B2"].fill.fgColor.rgb == "00FF0000" and sheet["B2"].number_format == "0.00"
+    assert sheet["C3"].font.i and sheet["C3"].fill.fill_type is None
+    assert not sheet["A3"].has_style
+
+
+def test_whole_columns_and_rows(excel):
+    assert excel.format_ranges("S", [("B:B", {"font": BOLD}), ("3:3", {"pattern_fill": RED})])
+    sheet = excel.get_sheet("S")
+    assert sheet.column_dimensions["B"].font.b
+    assert sheet.row_dimensions[3].fill.fgColor.rgb == "00FF0000"
+    assert sheet["B1"].font.b and sheet["B3"].font.b
+    assert sheet["A3"].fill.fgColor.rgb == "00FF0000" and not sheet["A3"].font.b
+    # Only the existing cells were styled, no cell was created down the column
+    assert len(sheet._cells) == 9
+
+
+def test_single_cell_range(excel):
+    assert excel.format_cells("S", "H70", font=BOLD)
+    sheet = excel.get_sheet("S")
+    assert sheet["H70"].font.b
+    assert not sheet["H69"].font.b and not sheet["G70"].font.b
+
+
+def test_conditional_formats_of_one_sheet(tmp_path):
+    path = str(tmp_path / "report.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    excel.create_sheet("T")
+    excel.write_rows("S", 1, [["YES"], ["NO"], ["YES"]])
+    excel.write_rows("T", 1, [[1]])
+    excel.save()
+    excel.close()
+    with zipfile.ZipFile(path) as archive:
+        other = archive.read("xl/worksheets/sheet2.xml")
+
+    excel = Excel_WorkBook(path, "S")
+    yes = {"condition_type": "cellIs", "operator": "equal", "value": '"YES"', "fill": RED}
+    assert excel.format_conditional_ranges("S", [("A1:A2", yes), ("S!A3", yes)])
+    # Same rule again: it is merged into the rule already on the sheet
+    assert excel.format_conditional_ranges("S", [("A1:A3", yes)])
+    assert excel._sheet_loader.pending.keys() == {"T"} and not excel._workbook_shared
+    assert excel.save()
+    excel.close()
+
+    sheet = openpyxl.load_workbook(path)["S"]
+    blocks = [(str(block.sqref), [rule.dxf.fill.fgColor.rgb for rule in rules])
+              for block, rules in sheet.conditional_formatting._cf_rules.items()]
+    assert blocks == [("A1:A3", ["00FF0000"])]
+    with zipfile.ZipFile(path) as archive:
+        assert archive.read("xl/worksheets/sheet2.xml") == other
+
+
+def test_conditional_formats_refuse_other_sheets(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S", strict=True)
+    excel.create_sheet("T")
+    yes = {"condition_type": "cellIs", "operator": "equal", "value": '"YES"', "fill": RED}
+    with pytest.raises(InvalidReferenceError):
+        excel.format_conditional_ranges("S", [("T!A1:A3", yes)])
+    with pytest.raises(StyleError):
+        excel.format_conditional_ranges("S", [("A1:A3", {"condition_type": "unknown"})])
+    assert not excel.get_sheet("S").conditional_formatting
+    excel.close()
@@ -0,0 +1,52 @@
+import openpyxl
+import pytest
+
+from Python_Excel_Formula import CircularReferenceError, ExcelError, FormulaEngine
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def engine():
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "S"
+    sheet["A1"] = 2
+    sheet["E29"] = "=E29+1"
+    sheet["B1"] = "=C1*2"
+    sheet["C1"] = "=B1+A1"
+    sheet["D1"] = "=B1+1"
+    sheet["F1"] = "=IFERROR(E29,0)"
+    sheet["G1"] = "=A1/0"
+    return FormulaEngine(workbook)
+
+
+def test_circular_references_are_errors(engine):
+    assert engine.value("S", 29, 5) == ExcelError("#REF!")
+    assert engine.value("S", 1, 2) == ExcelError("#REF!")
+    assert engine.value("S", 1, 3) == ExcelError("#REF!")
+    # Downstream of a cycle
+    assert engine.value("S", 1, 4) == ExcelError("#REF!")
+    assert engine.value("S", 1, 6) == 0
+
+
+def test_circular_references_are_not_cached(engine):
+    engine.recalculate()
+    assert engine.cached_values() == {"S": {(1, 6): 0, (1, 7): ExcelError("#DIV/0!")}}
+
+
+def test_cycle_broken_by_a_write(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.set_formula("S", "A1", "=B1+1")
+    excel.set_formula("S", "B1", "=A1")
+    assert excel.read_cell("S", "A1", evaluate=True) == ExcelError("#REF!")
+    excel.write_cell("S", "B1", 4)
+    assert excel.read_cell("S", "A1", evaluate=True) == 5
+    excel.close()
+
+
+def test_circular_reference_errors_are_fresh_instances(engine):
+    first = engine.value("S", 29, 5)
+    second = engine.value("S", 1, 2)
+    assert isinstance(first, CircularReferenceError) and isinstance(second, CircularReferenceError)
+    assert first is not second
+    assert second.__traceback__ is None and second.__context__ is None
@@ -0,0 +1,69 @@
+import shutil
+import zipfile
+
+import pytest
+
+PILImage = pytest.importorskip("PIL.Image")
+
+from Python_Excel_Errors import OperationError
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.create_sheet("T")
+    excel.save()
+    yield excel
+    excel.close()
+
+
+@pytest.fixture
+def picture(tmp_path):
+    path = str(tmp_path / "picture.png")
+    PILImage.new("RGB", (400, 200), "red").save(path)
+    return path
+
+
+def media(path):
+    with zipfile.ZipFile(path) as archive:
+        return [name for name in archive.namelist() if name.startswith("xl/media/")]
+
+
+def test_file_is_read_once(excel, picture):
+    assert excel.insert_image("S", "A1", picture)
+    assert excel.insert_image("S", "D1", picture)
+    assert excel.insert_image("T", "A1", picture, scale_width=0.5, scale_height=0.5)
+    info = excel.get_image_cache_info()
+    assert (info["misses"], info["hits"], info["images"]) == (1, 2, 1)
+
+
+def test_same_image_is_stored_once(excel, picture, tmp_path):
+    copy = str(tmp_path / "copy.png")
+    shutil.copy(picture, copy)
+    for sheet, cell_ref, path in (("S", "A1", picture), ("S", "D1", copy), ("T", "A1", picture)):
+        assert excel.insert_image(sheet, cell_ref, path)
+    assert excel.save()
+    # Two files with the same content: one image held, one media part for three placements
+    assert excel.get_image_cache_info()["images"] == 1
+    assert len(media(excel.str_path_file_excel)) == 1
+
+
+def test_downscale_stores_the_displayed_size(excel, picture):
+    assert excel.insert_image("S", "A1", picture, scale_width=0.25, scale_height=0.25, downscale=True)
+    assert excel.insert_image("S", "D1", picture, scale_width=2, scale_height=2, downscale=True)
+    images = excel.get_sheet("S")._images
+    assert (images[0].width, images[0].height) == (100, 50)
+    assert (images[0].entry.width, images[0].entry.height) == (100, 50)
+    # Enlarged images keep their pixels
+    assert (images[1].width, images[1].height) == (800, 400)
+    assert (images[1].entry.width, images[1].entry.height) == (400, 200)
+
+
+def test_missing_file_leaves_the_sheet_unchanged(excel, tmp_path):
+    assert excel.insert_image("S", "A1", str(tmp_path / "missing.png")) is False
+    assert not excel.has_changes()
+    excel.strict = True
+    with pytest.raises(OperationError):
+        excel.insert_image("S", "A1", str(tmp_path / "missing.png"))
+    assert not excel.has_changes()
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.create_sheet("T")
+    yield excel
+    excel.close()
+
+
+def values(excel, sheet):
+    return [[cell.value for cell in row] for row in excel.get_sheet(sheet).iter_rows()]
+
+
+def test_csv_round_trip(excel, tmp_path):
+    rows = [["NAME", "COUNT", "PRICE", "DATE", "OK"],
+            ["a", 1, 1.5, datetime(2024, 1, 2), True],
+            ["b", 2, None, datetime(2024, 3, 4), False]]
+    excel.write_rows("S", 1, rows)
+    path = str(tmp_path / "data.csv")
+    assert excel.export_csv("S", path)
+    assert excel.import_csv("T", path)
+    assert values(excel, "T") == rows
+
+
+def test_parquet_round_trip_promotes_types_across_batches(excel, tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = [["ID", "AMOUNT", "NOTE", "MIXED"],
+            [1, 1, None, 1],
+            [2, 2, None, "x"],
+            [3, 2.5, "late", 2],
+            [4, 3, None, None],
+            [5, None, "last", 3.5]]
+    excel.write_rows("S", 1, rows)
+    path = str(tmp_path / "data.parquet")
+    assert excel.export_parquet("S", path, batch_size=2)
+    import pyarrow.parquet as pq
+    schema = pq.read_schema(path)
+    assert [str(field.type) for field in schema] == ["int64", "double", "string", "string"]
+    assert excel.import_parquet("T", path)
+    assert values(excel, "T") == [rows[0],
+                                  [1, 1.0, None, "1"],
+                                  [2, 2.0, None, "x"],
+                                  [3, 2.5, "late", "2"],
+                                  [4, 3.0, None, None],
+                                  [5, None, "last", "3.5"]]
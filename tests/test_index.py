@@ -0,0 +1,55 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.write_rows("S", 1, [["NAME", "FLAG", "SCORE"],
+                              ["a", True, 3],
+                              ["B", 1, 1.5],
+                              ["c", 1.0, 7],
+                              ["A", False, 3],
+                              ["d", 0, None]])
+    yield excel
+    excel.close()
+
+
+def test_find_rows_tells_booleans_from_numbers(excel):
+    assert excel.find_rows("S", "FLAG", True) == [2]
+    assert excel.find_rows("S", "FLAG", 1) == [3, 4]
+    assert excel.find_rows("S", "FLAG", 1.0) == [3, 4]
+    assert excel.find_rows("S", "FLAG", False) == [5]
+    assert excel.find_rows("S", "FLAG", 0) == [6]
+
+
+def test_find_rows_ignore_case(excel):
+    assert excel.find_rows("S", "NAME", "a") == [2]
+    assert excel.create_index("S", "NAME", ignore_case=True)
+    assert excel.find_rows("S", "NAME", "a") == [2, 5]
+
+
+def test_find_range(excel):
+    assert excel.find_range("S", "SCORE", 2, 7) == [2, 5, 4]
+    assert excel.find_range("S", "SCORE", 3, include_low=False) == [4]
+    assert excel.find_range("S", "FLAG", 0, 1) == [6, 3, 4]
+    assert excel.find_range("S", "FLAG", False, True) == [5, 2]
+
+
+def test_query(excel):
+    assert excel.query("S", {"FLAG": 1, "SCORE": slice(1, 5)}) == [3]
+    assert excel.query("S", {"SCORE": 3}, columns=["NAME", "C"]) == [("a", 3), ("A", 3)]
+    assert excel.query("S", {"SCORE": lambda value: value is None}) == [6]
+
+
+def test_index_follows_writes(excel):
+    assert excel.find_rows("S", "FLAG", True) == [2]
+    assert excel.find_range("S", "FLAG", False, True) == [5, 2]
+    excel.write_cell("S", "B3", True)
+    excel.write_rows("S", 7, [["e", True, 2]])
+    excel.write_cell("S", "B2", None)
+    assert excel.find_rows("S", "FLAG", True) == [3, 7]
+    assert excel.find_rows("S", "FLAG", 1) == [4]
+    assert excel.find_range("S", "FLAG", False, True) == [5, 3, 7]
+    assert excel.find_rows("S", "SCORE", 2) == [7]
@@ -0,0 +1,68 @@
+import zipfile
+
+import pytest
+
+import Python_Excel_Package
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    for name in ("T", "U"):
+        excel.create_sheet(name)
+    for name, first in (("S", 1), ("T", 10), ("U", 100)):
+        excel.write_rows(name, 1, [[first, first + 1], [f"{name}-text", None]])
+    excel.format_cells("U", "A1:B1", number_format="0.00")
+    assert excel.save()
+    excel.close()
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Titles of the worksheets whose XML was parsed"""
+    titles = []
+
+    class CountingReader(Python_Excel_Package.WorksheetReader):
+        def bind_all(self):
+            titles.append(self.ws.title)
+            super().bind_all()
+
+    monkeypatch.setattr(Python_Excel_Package, "WorksheetReader", CountingReader)
+    return titles
+
+
+def sheet_parts(path):
+    """{sheet title: worksheet part bytes} of an xlsx file"""
+    with zipfile.ZipFile(path) as archive:
+        return {title: archive.read(part) for title, part in Python_Excel_Package.read_package(archive)[2].items()}
+
+
+def test_sheet_names_do_not_parse_sheets(path, parsed):
+    excel = Excel_WorkBook(path, "S")
+    assert excel.get_sheet_names() == ["S", "T", "U"]
+    assert parsed == []
+    assert excel.read_cell("T", "A1") == 10
+    assert parsed == ["T"]
+    excel.close()
+
+
+def test_untouched_sheets_pass_through_byte_for_byte(path, parsed):
+    before = sheet_parts(path)
+    excel = Excel_WorkBook(path, "S")
+    assert excel.read_range("T", "A1", "B2") == [[10, 11], ["T-text", None]]
+    assert excel.write_cell("S", "B2", "new")
+    assert excel.save()
+    excel.close()
+    # Only the sheets used were parsed, saving parsed no other
+    assert sorted(parsed) == ["S", "T"]
+
+    after = sheet_parts(path)
+    assert after["S"] != before["S"]
+    assert after["T"] == before["T"] and after["U"] == before["U"]
+    excel = Excel_WorkBook(path, "S", mode="read")
+    assert excel.read_range("S", "A1", "B2") == [[1, 2], ["S-text", "new"]]
+    assert excel.read_range("U", "A1", "B2") == [[100, 101], ["U-text", None]]
+    excel.close()
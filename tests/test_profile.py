@@ -0,0 +1,29 @@
+import numpy
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Profile import Profiler
+from Python_Excel_Reference import range_size
+
+
+@pytest.mark.parametrize("write", ["write_rows", "write_range"])
+def test_numpy_rows_are_written_as_python_values(tmp_path, write):
+    array = numpy.array([[1.5, 2.5], [3.5, 4.5]])
+    with Profiler() as profiler:
+        excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+        if write == "write_rows":
+            assert excel.write_rows("S", 1, array)
+        else:
+            assert excel.write_range("S", "A1", array)
+    assert profiler.get_stats()["methods"]["Excel_WorkBook.write_rows"]["cells"] == 4
+    values = [[cell.value for cell in row] for row in excel.get_sheet("S").iter_rows()]
+    assert values == [[1.5, 2.5], [3.5, 4.5]]
+    assert all(type(value) is float for row in values for value in row)
+    excel.close()
+
+
+def test_range_size():
+    assert range_size("A1:C3") == 9
+    assert range_size("B2") == 1
+    assert range_size("C:D") == 0
+    assert range_size("not a range") == 0
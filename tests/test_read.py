@@ -0,0 +1,34 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.write_cell("S", "A1", "a")
+    excel.write_cell("S", "C2", 3)
+    yield excel
+    excel.close()
+
+
+def test_iter_rows_creates_no_cells(excel):
+    rows = list(excel.iter_rows("S", max_row=200, max_col=50))
+    assert len(rows) == 200 and all(len(row) == 50 for row in rows)
+    assert rows[0][0] == "a" and rows[1][2] == 3
+    assert len(excel.get_sheet("S")._cells) == 2
+
+
+def test_iter_rows_defaults_to_the_used_cells(excel):
+    assert list(excel.iter_rows("S")) == [("a", None, None), (None, None, 3)]
+    assert list(excel.iter_rows("S", min_row=2, min_col=2)) == [(None, 3)]
+    excel.create_sheet("Empty")
+    assert list(excel.iter_rows("Empty")) == []
+
+
+def test_iter_rows_in_read_mode(excel):
+    excel.save()
+    reader = Excel_WorkBook(excel.str_path_file_excel, "S", mode="read")
+    assert list(reader.iter_rows("S")) == [("a", None, None), (None, None, 3)]
+    assert next(reader.iter_rows("S", min_row=2)) == (None, None, 3)
+    reader.close()
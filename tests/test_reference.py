@@ -0,0 +1,56 @@
+import pytest
+from openpyxl.styles import Font
+
+from Python_Excel_Errors import InvalidReferenceError
+from Python_Excel_Lib import Excel_WorkBook
+
+BOLD = Font(bold=True)
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S", strict=True)
+    excel.create_sheet("My sheet")
+    excel.write_rows("S", 1, [[1, 2], [3, 4]])
+    excel.write_rows("My sheet", 1, [[5, 6], [7, 8]])
+    excel.save()
+    yield excel
+    excel.close()
+
+
+def test_qualifier_naming_the_sheet_is_accepted(excel):
+    assert excel.read_range("S", "S!A1", "B2") == [[1, 2], [3, 4]]
+    assert excel.read_range("My sheet", "'My sheet'!A1", "B1") == [[5, 6]]
+    assert excel.format_ranges("My sheet", [("'My sheet'!A1:B1", {"font": BOLD})])
+    assert excel.format_cells("S", "S!A2", font=BOLD)
+    assert excel.merge_cells("S", "S!A1:B1")
+    assert excel.add_sort_filter("S", "S!A1:B2")
+    sheet = excel.get_sheet("S")
+    assert sheet["A2"].font.b and str(sheet.merged_cells) == "A1:B1"
+    assert sheet.auto_filter.ref == "A1:B2"
+    assert excel.get_sheet("My sheet")["B1"].font.b
+
+
+@pytest.mark.parametrize("call", [
+    lambda excel: excel.read_range("S", "'My sheet'!A1", "B2"),
+    lambda excel: excel.format_ranges("S", [("A1", {"font": BOLD}), ("'My sheet'!A1:B1", {"font": BOLD})]),
+    lambda excel: excel.format_cells("My sheet", "S!A1", font=BOLD),
+    lambda excel: excel.merge_cells("S", "'My sheet'!A1:B1"),
+    lambda excel: excel.add_sort_filter("S", "'My sheet'!A1:B2"),
+    lambda excel: excel.write_cell("S", "'My sheet'!A1", 0),
+])
+def test_qualifier_naming_another_sheet_is_refused(excel, call):
+    with pytest.raises(InvalidReferenceError):
+        call(excel)
+    # Nothing was applied to either sheet
+    assert not excel.has_changes()
+    assert not excel.get_sheet("S")["A1"].font.b
+    assert not excel.get_sheet("S").merged_cells.ranges
+
+
+def test_qualifier_mismatch_returns_false_in_quiet_mode(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.create_sheet("T")
+    assert excel.format_ranges("S", [("T!A1", {"font": BOLD})]) is False
+    assert excel.read_range("S", "T!A1", "A1") is None
+    excel.close()
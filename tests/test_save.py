@@ -0,0 +1,111 @@
+import os
+import zipfile
+
+import pytest
+
+import Python_Excel_Package
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    excel.create_sheet("T")
+    excel.write_rows("S", 1, [["a", 1], ["b", 2]])
+    excel.write_rows("T", 1, [["c", 3], ["d", 4]])
+    assert excel.save()
+    excel.close()
+    return path
+
+
+def read_bytes(path):
+    with open(path, "rb") as stream:
+        return stream.read()
+
+
+def parts(path):
+    """Stored (compressed) bytes of every part of an xlsx file"""
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        stored = {}
+        for info in archive.infolist():
+            with open(path, "rb") as stream:
+                stream.seek(info.header_offset + 26)
+                name_size, extra_size = int.from_bytes(stream.read(2), "little"), int.from_bytes(stream.read(2), "little")
+                stream.seek(name_size + extra_size, os.SEEK_CUR)
+                stored[info.filename] = stream.read(info.compress_size)
+        return stored
+
+
+def sheet_part(path, title):
+    with zipfile.ZipFile(path) as archive:
+        return Python_Excel_Package.read_package(archive)[2][title]
+
+
+def test_save_without_changes_writes_nothing(path, tmp_path):
+    before = read_bytes(path), os.stat(path).st_mtime_ns
+    excel = Excel_WorkBook(path, "S")
+    excel.read_range("S", "A1", "B2")
+    assert excel.save()
+    excel.close()
+    assert (read_bytes(path), os.stat(path).st_mtime_ns) == before
+
+    # Save-as of an unchanged workbook copies the source byte for byte
+    copy = str(tmp_path / "copy.xlsx")
+    excel = Excel_WorkBook(path, "S")
+    assert excel.save(copy)
+    excel.close()
+    assert read_bytes(copy) == before[0]
+
+
+def test_incremental_save_copies_untouched_parts(path, monkeypatch):
+    before = parts(path)
+    # Only the changed parts are regenerated, never the whole workbook
+    monkeypatch.setattr(Python_Excel_Package, "write_workbook", None)
+    excel = Excel_WorkBook(path, "S")
+    assert excel.write_cell("S", "A3", "e")
+    assert excel.save()
+    excel.close()
+
+    after = parts(path)
+    assert sorted(after) == sorted(before)
+    changed = {name for name in before if before[name] != after[name]}
+    assert sheet_part(path, "S") in changed
+    assert sheet_part(path, "T") not in changed
+    excel = Excel_WorkBook(path, "S", mode="read")
+    assert excel.read_range("S", "A1", "B3") == [["a", 1], ["b", 2], ["e", None]]
+    assert excel.read_range("T", "A1", "B2") == [["c", 3], ["d", 4]]
+    excel.close()
+
+
+def test_incremental_save_streams_parts_without_zip_internals(path, monkeypatch):
+    streamed = []
+    monkeypatch.setattr(Python_Excel_Package, "_can_copy_raw", lambda source, target: streamed.append(1))
+    excel = Excel_WorkBook(path, "S")
+    assert excel.write_cell("S", "A3", "e")
+    assert excel.save()
+    excel.close()
+
+    assert streamed
+    parts(path)
+    excel = Excel_WorkBook(path, "S", mode="read")
+    assert excel.read_range("S", "A1", "A3") == [["a"], ["b"], ["e"]]
+    assert excel.read_range("T", "A1", "B2") == [["c", 3], ["d", 4]]
+    excel.close()
+
+
+def test_failed_save_leaves_previous_file(path, monkeypatch):
+    before = read_bytes(path)
+
+    def broken(workbook, stream, **kwargs):
+        stream.write(b"PK partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Python_Excel_Package, "write_workbook", broken)
+    excel = Excel_WorkBook(path, "S")
+    assert excel.write_cell("S", "A3", "e")
+    assert excel.save(incremental=False) is False
+    excel.close()
+    assert read_bytes(path) == before
+    assert os.listdir(os.path.dirname(path)) == ["book.xlsx"]
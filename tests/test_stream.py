@@ -0,0 +1,66 @@
+import openpyxl
+import pytest
+from openpyxl.styles import Font
+
+from Python_Excel_Errors import UnsupportedOperationError
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def stream(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "report.xlsx"), "S", mode="stream")
+    yield excel
+    excel.close()
+
+
+def test_rows_must_be_written_in_ascending_order(stream):
+    assert stream.write_row("S", 2, ["b"])
+    # The pending row may still be extended
+    assert stream.write_row("S", 2, ["c", "d"], start_column=2)
+    assert stream.write_row("S", 3, ["e"])
+    assert not stream.write_row("S", 2, ["late"])
+    stream.strict = True
+    with pytest.raises(UnsupportedOperationError):
+        stream.write_row("S", 1, ["late"])
+    assert stream.save()
+    sheet = openpyxl.load_workbook(stream.str_path_file_excel)["S"]
+    assert [[cell.value for cell in row] for row in sheet.iter_rows()] == [[None, None, None], ["b", "c", "d"],
+                                                                          ["e", None, None]]
+
+
+def test_widths_and_freeze_panes_before_the_first_row(stream):
+    assert stream.set_column_width("S", "B", 30)
+    assert stream.freeze_panes("S", "A2")
+    assert stream.write_row("S", 1, ["a", "b"])
+    # Row 1 is only buffered: the sheet XML has not started yet
+    assert stream.set_column_width("S", "C", 12)
+    assert stream.write_row("S", 2, ["c"])
+    assert not stream.set_column_width("S", "D", 10)
+    assert not stream.freeze_panes("S", "B2")
+    assert stream.save()
+    sheet = openpyxl.load_workbook(stream.str_path_file_excel)["S"]
+    assert sheet.column_dimensions["B"].width == 30 and sheet.column_dimensions["C"].width == 12
+    assert sheet.column_dimensions["D"].width != 10
+    assert sheet.freeze_panes == "A2"
+
+
+def test_styled_rows(stream):
+    assert stream.format_cells("S", "A1:B3", font=Font(bold=True))
+    assert stream.write_row("S", 1, ["a", "b", "c"])
+    assert stream.write_row("S", 2, ["d"])
+    assert not stream.format_cells("S", "A1:A2", font=Font(italic=True))
+    assert stream.save()
+    sheet = openpyxl.load_workbook(stream.str_path_file_excel)["S"]
+    assert [[cell.font.b for cell in row] for row in sheet.iter_rows(max_col=3)] == \
+        [[True, True, False], [True, True, False], [True, True, False]]
+    assert sheet["C1"].value == "c" and sheet.max_row == 3
+
+
+def test_stream_is_saved_once(stream):
+    assert stream.write_row("S", 1, ["a"])
+    assert stream.save()
+    assert not stream.save()
+    assert not stream.write_row("S", 2, ["b"])
+    stream.strict = True
+    with pytest.raises(UnsupportedOperationError):
+        stream.save()
@@ -0,0 +1,73 @@
+import openpyxl
+from openpyxl.styles import PatternFill
+
+from Python_Excel_Style import Excel_Style
+
+
+def _rules(sheet):
+    return sorted((str(block.sqref), rule.type) for block, rules in sheet.conditional_formatting._cf_rules.items()
+                  for rule in rules)
+
+
+def test_cell_is_rules_are_coalesced():
+    workbook = openpyxl.Workbook()
+    fill = PatternFill(fill_type="solid", start_color="FF6666")
+    rule = {"condition_type": "cellIs", "operator": "equal", "value": '"NO"', "fill": fill}
+    assert Excel_Style().format_conditional_ranges(workbook, "Sheet", [("S3:S30", rule), ("S31:S69", rule),
+                                                                       ("U3:U9", rule)])
+    assert _rules(workbook["Sheet"]) == [("S3:S69 U3:U9", "cellIs")]
+
+
+def test_range_statistic_rules_keep_one_rule_per_range():
+    workbook = openpyxl.Workbook()
+    style = Excel_Style()
+    scale = {"condition_type": "colorScale", "color_scale_colors": ["FF0000", "FFFF00", "00FF00"]}
+    assert style.format_conditional_ranges(workbook, "Sheet", [("A1:A10", scale), ("B1:B10", scale),
+                                                               ("C1:C10", scale), ("A1:A10", scale)])
+    for column in "EG":
+        assert style.create_conditional_formatting("dataBar", f"{column}1:{column}5", workbook, "Sheet",
+                                                   data_bar_color="638EC6")
+    assert style.create_conditional_formatting("dataBar", "E1:E5", workbook, "Sheet", data_bar_color="638EC6")
+    assert _rules(workbook["Sheet"]) == [("A1:A10", "colorScale"), ("B1:B10", "colorScale"),
+                                         ("C1:C10", "colorScale"), ("E1:E5", "dataBar"), ("G1:G5", "dataBar")]
+    priorities = [rule.priority for rules in workbook["Sheet"].conditional_formatting._cf_rules.values()
+                  for rule in rules]
+    assert len(set(priorities)) == len(priorities)
+
+
+def test_colors_are_normalized_before_interning():
+    style = Excel_Style()
+    fill = style.create_pattern_fill(start_color="ffffff", end_color="FFFFFF")
+    assert style.create_pattern_fill(start_color="00FFFFFF", end_color="00ffffff") is fill
+    assert fill.start_color.rgb == "00FFFFFF"
+    assert style.create_font(color="ff0000") is style.create_font(color="00FF0000")
+    assert style.create_font(color="ff0000") is not style.create_font(color="FFFF0000")
+
+
+def test_cache_statistics():
+    style = Excel_Style()
+    font = style.create_font(bold=True)
+    assert style.create_font(bold=True) is font
+    style.create_font(bold=True, size=12)
+    assert style.get_cache_info() == {"hits": 1, "misses": 2, "size": 2, "max_size": 1024}
+    style.clear_cache()
+    assert style.get_cache_info() == {"hits": 0, "misses": 0, "size": 0, "max_size": 1024}
+    assert style.create_font(bold=True) is not font
+
+
+def test_cache_evicts_least_recently_used():
+    style = Excel_Style(cache_size=2)
+    first = style.create_font(size=10)
+    second = style.create_font(size=11)
+    # first becomes the most recently used: second is evicted to make room
+    assert style.create_font(size=10) is first
+    style.create_font(size=12)
+    assert style.get_cache_info()["size"] == 2
+    assert style.create_font(size=10) is first
+    assert style.create_font(size=11) is not second
+
+
+def test_cache_disabled():
+    style = Excel_Style(cache_size=0)
+    assert style.create_font(bold=True) is not style.create_font(bold=True)
+    assert style.get_cache_info()["size"] == 0
@@ -0,0 +1,64 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+from Python_Excel_Template import ExcelTemplate
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExcelTemplate, "cache_size", 2)
+    ExcelTemplate.clear_cache()
+    excel = Excel_WorkBook(str(tmp_path / "layout.xlsx"), "S")
+    excel.write_rows("S", 1, [["NAME", "VALUE"]])
+    template = ExcelTemplate.from_workbook(excel, {"S": "A2:B10"})
+    excel.close()
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"t{index}.template.xlsx")
+        assert template.save(path)
+        paths.append(path)
+    yield paths
+    ExcelTemplate.clear_cache()
+
+
+def test_load_cache_is_bounded(templates):
+    first = ExcelTemplate.load(templates[0])
+    assert ExcelTemplate.load(templates[0]) is first
+    ExcelTemplate.load(templates[1])
+    # templates[0] was used last: templates[1] is dropped to make room for templates[2]
+    assert ExcelTemplate.load(templates[0]) is first
+    ExcelTemplate.load(templates[2])
+    assert len(ExcelTemplate._cache) == 2
+    assert ExcelTemplate.load(templates[0]) is first
+
+
+def test_clear_cache(templates):
+    first = ExcelTemplate.load(templates[0])
+    ExcelTemplate.clear_cache()
+    assert not ExcelTemplate._cache
+    assert ExcelTemplate.load(templates[0]) is not first
+
+
+def test_stamp_after_load(templates, tmp_path):
+    template = ExcelTemplate.load(templates[0])
+    path = str(tmp_path / "report.xlsx")
+    assert template.stamp(path, {"S": [["a", 1], ["b", 2]]})
+    excel = Excel_WorkBook(path, "S")
+    assert [[cell.value for cell in row] for row in excel.get_sheet("S").iter_rows()] == \
+        [["NAME", "VALUE"], ["a", 1], ["b", 2]]
+    excel.close()
+
+
+def test_load_cache_hit_with_unnormalized_ranges(templates):
+    first = ExcelTemplate.load(templates[0], {"S": "A2:B10"})
+    assert ExcelTemplate.load(templates[0], {"S": "A2:B10"}) is first
+    assert ExcelTemplate.load(templates[0], {"S": ["A2:B10"]}) is first
+    assert ExcelTemplate.load(templates[0], {"S": "A2:B5"}) is not first
+
+
+def test_load_cache_hit_uses_callers_strict(templates):
+    lenient = ExcelTemplate.load(templates[0])
+    strict = ExcelTemplate.load(templates[0], strict=True)
+    assert strict.strict and not lenient.strict
+    assert strict.sheets is lenient.sheets
+    assert not ExcelTemplate.load(templates[0]).strict
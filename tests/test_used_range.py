@@ -0,0 +1,36 @@
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.write_rows("S", 1, [["A", "B", "Z"], [1, 2, 3]])
+    yield excel
+    excel.close()
+
+
+def test_last_data_cell_follows_writes_without_scanning(excel):
+    assert excel.check_last_data_cell("S") == (2, 3, True)
+    excel.write_cell("S", "E1", "x")
+    assert excel.check_last_data_cell("S") == (2, 3, False)
+    excel.write_cell("S", "E1", None)
+    excel.write_cell("S", "C2", None)
+    assert excel.check_last_data_cell("S") == (2, 2, False)
+    # Reading never creates cells, the index is unchanged
+    excel.read_range("S", "A1", "K40")
+    assert excel.check_last_data_cell("S") == (2, 2, False)
+
+
+def test_edits_through_the_workbook_are_seen(excel):
+    assert excel.check_last_data_cell("S") == (2, 3, True)
+    excel.workbook["S"]["Z50"] = 5
+    assert excel.check_last_data_cell("S") == (50, 26, True)
+    assert excel.aggregate("S", "Z", header_row=None) == {"Z": 5}
+
+
+def test_edits_through_get_sheet_are_seen(excel):
+    assert excel.check_last_data_cell("S") == (2, 3, True)
+    excel.get_sheet("S")["D3"] = 1
+    assert excel.check_last_data_cell("S") == (3, 4, True)
@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+from Python_Excel_Lib import Excel_WorkBook
+
+
+@pytest.fixture
+def excel(tmp_path):
+    excel = Excel_WorkBook(str(tmp_path / "book.xlsx"), "S")
+    excel.save()
+    yield excel
+    excel.close()
+
+
+def test_write_rows_rejects_row_zero_without_marking_dirty(excel):
+    assert not excel.has_changes()
+    assert not excel.write_rows("S", 0, [[1]])
+    assert not excel.write_rows("S", 1, [[1]], start_column=0)
+    assert not excel.has_changes()
+
+
+def test_write_rows_types(excel):
+    rows = [[1, 2.5, "text", "=A1+1", "#N/A", True, datetime.date(2024, 1, 2), None],
+            (value for value in ["gen", 3])]
+    assert excel.write_rows("S", 1, rows)
+    sheet = excel.get_sheet("S")
+    assert [sheet.cell(row=1, column=col).data_type for col in range(1, 8)] == ["n", "n", "s", "f", "e", "b", "d"]
+    assert sheet["G1"].is_date
+    assert [sheet["A2"].value, sheet["B2"].value] == ["gen", 3]
+    assert excel.check_last_data_cell("S") == (2, 2, False)